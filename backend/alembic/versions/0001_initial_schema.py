@@ -0,0 +1,85 @@
+"""Initial schema
+
+Baseline: the users, orders and transactions tables as init_db() created
+them before migrations were introduced. Databases created that way are
+already at this revision; mark them with `alembic stamp 0001` before the
+first `alembic upgrade head`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 02:50:55.462115
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'users',
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('premium', sa.Boolean(), nullable=False),
+        sa.PrimaryKeyConstraint('email'),
+        sa.UniqueConstraint('email')
+    )
+    op.create_table(
+        'orders',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('user_email', sa.String(), nullable=False),
+        sa.Column('amount', sa.Integer(), nullable=False),
+        sa.Column('currency', sa.String(), nullable=False),
+        sa.Column('receipt', sa.String(), nullable=True),
+        sa.Column('status', sa.Enum('CREATED', 'PAID', 'FAILED', 'CANCELLED', name='orderstatus'), nullable=False),
+        sa.Column('razorpay_order_id', sa.String(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_email'], ['users.email']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('razorpay_order_id')
+    )
+    op.create_table(
+        'transactions',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('order_id', sa.String(), nullable=False),
+        sa.Column('user_email', sa.String(), nullable=False),
+        sa.Column('amount', sa.Integer(), nullable=False),
+        sa.Column('currency', sa.String(), nullable=False),
+        sa.Column(
+            'status',
+            sa.Enum('PENDING', 'AUTHORIZED', 'CAPTURED', 'REFUNDED', 'FAILED', name='transactionstatus'),
+            nullable=False
+        ),
+        sa.Column('razorpay_payment_id', sa.String(), nullable=False),
+        sa.Column('razorpay_order_id', sa.String(), nullable=False),
+        sa.Column('razorpay_signature', sa.String(), nullable=True),
+        sa.Column('method', sa.String(), nullable=True),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('verified', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['order_id'], ['orders.id']),
+        sa.ForeignKeyConstraint(['user_email'], ['users.email']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('razorpay_payment_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('transactions')
+    op.drop_table('orders')
+    op.drop_table('users')
+    # PostgreSQL keeps enum types after their tables are dropped
+    sa.Enum(name='transactionstatus').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='orderstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,46 @@
+"""Order and transaction indexes
+
+Indexes for per-user payment history (user_email, created_at), the
+transactions of an order, and refund reconciliation by Razorpay order ID.
+On PostgreSQL they are built with CREATE INDEX CONCURRENTLY so writes to
+the tables are not blocked while the index builds. Indexes that already
+exist (databases created by init_db() after this revision) are skipped.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 02:51:13.205069
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns)
+INDEXES = [
+    ('ix_orders_user_email_created_at', 'orders', ['user_email', 'created_at']),
+    ('ix_transactions_user_email_created_at', 'transactions', ['user_email', 'created_at']),
+    ('ix_transactions_order_id', 'transactions', ['order_id']),
+    ('ix_transactions_razorpay_order_id', 'transactions', ['razorpay_order_id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY can't run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
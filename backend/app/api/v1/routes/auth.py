@@ -3,7 +3,6 @@ Authentication route handlers.
 """
 import logging
 from fastapi import APIRouter, HTTPException, status, Depends
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 logger = logging.getLogger(__name__)
 from app.api.v1.schemas.auth import (
@@ -16,6 +15,7 @@ from app.api.v1.schemas.auth import (
     UserResponse
 )
 from app.services.auth_service import get_auth_service
+from app.services.user_service import get_user_service
 from app.core.exceptions import (
     TestinoException,
     ValidationError,
@@ -23,12 +23,8 @@ from app.core.exceptions import (
     SMSException,
     UserNotFoundError
 )
-from app.database import get_db
-from sqlalchemy.orm import Session
-from app.core.security import verify_token
-
-# Security scheme for Bearer token authentication
-security = HTTPBearer()
+from app.database import DBSession, get_db_session
+from app.dependencies import get_current_user, rate_limit_otp_send
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
@@ -38,11 +34,12 @@ router = APIRouter(prefix="/auth", tags=["authentication"])
     response_model=SendEmailOTPResponse,
     status_code=status.HTTP_200_OK,
     summary="Send OTP to email",
-    description="Generate and send a 6-digit OTP to the provided email address. For login, checks if user exists first."
+    description="Generate and send a 6-digit OTP to the provided email address. For login, checks if user exists first.",
+    dependencies=[Depends(rate_limit_otp_send)]
 )
 async def send_email_otp(
     request: SendEmailOTPRequest,
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db_session)
 ) -> SendEmailOTPResponse:
     """
     Send OTP to the provided email address.
@@ -54,7 +51,7 @@ async def send_email_otp(
     """
     try:
         auth_service = get_auth_service()
-        result = auth_service.send_email_otp(email=request.email, db=db)
+        result = await auth_service.send_email_otp(email=request.email, db=db)
         return SendEmailOTPResponse(**result)
     except ValidationError as e:
         raise HTTPException(
@@ -87,7 +84,7 @@ async def send_email_otp(
 )
 async def verify_email_otp(
     request: VerifyEmailOTPRequest,
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db_session)
 ) -> VerifyEmailOTPResponse:
     """
     Verify OTP and generate access token.
@@ -99,7 +96,7 @@ async def verify_email_otp(
     """
     try:
         auth_service = get_auth_service()
-        result = auth_service.verify_email_otp(
+        result = await auth_service.verify_email_otp(
             email=request.email,
             otp=request.otp,
             db=db
@@ -132,11 +129,12 @@ async def verify_email_otp(
     response_model=SignupResponse,
     status_code=status.HTTP_200_OK,
     summary="Sign up with email",
-    description="Create a new account and send verification OTP to email."
+    description="Create a new account and send verification OTP to email.",
+    dependencies=[Depends(rate_limit_otp_send)]
 )
 async def signup(
     request: SignupRequest,
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db_session)
 ) -> SignupResponse:
     """
     Sign up a new user.
@@ -148,7 +146,7 @@ async def signup(
     """
     try:
         auth_service = get_auth_service()
-        result = auth_service.signup_with_email_otp(
+        result = await auth_service.signup_with_email_otp(
             name=request.name,
             email=request.email,
             db=db
@@ -187,7 +185,7 @@ async def signup(
 )
 async def verify_signup(
     request: VerifyEmailOTPRequest,
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db_session)
 ) -> VerifyEmailOTPResponse:
     """
     Verify signup OTP and create account.
@@ -205,7 +203,7 @@ async def verify_signup(
                 detail="Name is required for signup"
             )
         auth_service = get_auth_service()
-        result = auth_service.verify_signup_otp(
+        result = await auth_service.verify_signup_otp(
             name=request.name,
             email=request.email,
             otp=request.otp,
@@ -230,32 +228,6 @@ async def verify_signup(
         )
 
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
-    """
-    Dependency to get current authenticated user from JWT token.
-    
-    Args:
-        credentials: HTTP Bearer token credentials
-    
-    Returns:
-        Decoded token payload with user information
-    
-    Raises:
-        HTTPException: If token is invalid or expired
-    """
-    token = credentials.credentials
-    payload = verify_token(token)
-    
-    if payload is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    return payload
-
-
 @router.get(
     "/me",
     response_model=UserResponse,
@@ -265,18 +237,17 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
 )
 async def get_current_user_info(
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db_session)
 ) -> UserResponse:
     """
     Get current user information from JWT token.
     
     Returns user email, name, and premium status from the authenticated token.
     """
-    # Get user from database to ensure we have the latest data
+    # Get the user's profile (cached briefly; invalidated when it changes)
     user_email = current_user.get("sub") or current_user.get("email")
     if user_email:
-        from app.models.user import User
-        user = db.query(User).filter(User.email == user_email).first()
+        user = await get_user_service().get_profile(db, user_email)
         if user:
             return UserResponse(
                 email=user.email,
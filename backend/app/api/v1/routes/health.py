@@ -1,9 +1,21 @@
 """
 Health check route handlers.
 """
-from fastapi import APIRouter
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
 from datetime import datetime
 from app.config import get_settings
+from app.core.executors import executor_stats
+from app.core.security import get_token_cache
+from app.database import database_pool_stats
+from app.services.test_document_cache import get_test_document_cache
+from app.services.asset_url_cache import get_asset_url_cache
+from app.services.email_dispatcher import get_email_dispatcher
+from app.services.email_router import EmailRouter
+from app.services.email_service import get_email_service
+from app.services.s3_fetch_service import get_s3_fetch_service
+from app.services.test_warmup_service import get_test_warmup_service
+from app.services.user_profile_cache import get_user_profile_cache
 
 router = APIRouter(tags=["health"])
 settings = get_settings()
@@ -26,3 +38,51 @@ async def health_check():
 
 
 
+
+
+@router.get("/health/ready")
+async def readiness_check():
+    """
+    Readiness check endpoint.
+    
+    Returns 503 until the startup warm-up (test catalog and popular tests)
+    has completed, so load balancers only route traffic to warm instances.
+    """
+    warmup_status = get_test_warmup_service().status()
+    content = {
+        "status": "ready" if warmup_status["ready"] else "warming_up",
+        "warmup": warmup_status,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+    
+    if not warmup_status["ready"]:
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content=content)
+    
+    return content
+
+
+@router.get("/health/metrics")
+async def metrics():
+    """
+    Metrics endpoint.
+    
+    Returns hit/miss/eviction counters used to size in-process caches
+    (including the JWT verification and user profile caches), the outbound email queue depth
+    and delivery counters, email provider health when failover is
+    configured, queue depth of the thread pools for blocking work, and
+    database connection pool usage and checkout times.
+    """
+    email_service = get_email_service()
+    token_cache = get_token_cache()
+    user_profile_cache = get_user_profile_cache()
+    return {
+        "test_document_cache": get_test_document_cache().stats(),
+        "asset_url_cache": get_asset_url_cache().stats(),
+        "email_dispatcher": get_email_dispatcher().stats(),
+        "email_providers": email_service.stats() if isinstance(email_service, EmailRouter) else None,
+        "jwt_verify_cache": token_cache.stats() if token_cache is not None else None,
+        "user_profile_cache": user_profile_cache.stats() if user_profile_cache is not None else None,
+        "executors": {**executor_stats(), "s3-fetch": get_s3_fetch_service().stats()},
+        "database_pool": database_pool_stats(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
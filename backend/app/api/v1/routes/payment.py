@@ -3,8 +3,6 @@ Payment route handlers.
 """
 import logging
 from fastapi import APIRouter, HTTPException, status, Depends
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
 
 logger = logging.getLogger(__name__)
 from app.api.v1.schemas.payment import (
@@ -15,45 +13,12 @@ from app.api.v1.schemas.payment import (
 )
 from app.services.payment_service import get_payment_service
 from app.core.exceptions import ValidationError
-from app.database import get_db
-from app.core.security import verify_token
-
-# Security scheme for Bearer token authentication
-security = HTTPBearer()
+from app.database import DBSession, get_db_session
+from app.dependencies import get_current_user_email
 
 router = APIRouter(prefix="/payments", tags=["payments"])
 
 
-async def get_current_user_email(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
-    """
-    Get current user email from JWT token.
-    
-    Args:
-        credentials: HTTP Bearer token credentials
-    
-    Returns:
-        User email from token
-    
-    Raises:
-        HTTPException: If token is invalid or missing
-    """
-    token = credentials.credentials
-    payload = verify_token(token)
-    if payload is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    email = payload.get("sub") or payload.get("email")
-    if not email:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token: email not found"
-        )
-    return email
-
-
 @router.post(
     "/create-order",
     response_model=CreateOrderResponse,
@@ -64,7 +29,7 @@ async def get_current_user_email(credentials: HTTPAuthorizationCredentials = Dep
 async def create_order(
     request: CreateOrderRequest,
     user_email: str = Depends(get_current_user_email),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db_session)
 ) -> CreateOrderResponse:
     """
     Create a payment order.
@@ -76,7 +41,7 @@ async def create_order(
     """
     try:
         payment_service = get_payment_service()
-        result = payment_service.create_order(
+        result = await payment_service.create_order(
             user_email=user_email,
             amount=request.amount,
             currency=request.currency,
@@ -106,7 +71,7 @@ async def create_order(
 async def verify_payment(
     request: VerifyPaymentRequest,
     user_email: str = Depends(get_current_user_email),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db_session)
 ) -> VerifyPaymentResponse:
     """
     Verify payment signature and upgrade user to premium.
@@ -119,7 +84,7 @@ async def verify_payment(
     """
     try:
         payment_service = get_payment_service()
-        result = payment_service.verify_payment(
+        result = await payment_service.verify_payment(
             user_email=user_email,
             razorpay_payment_id=request.razorpay_payment_id,
             razorpay_order_id=request.razorpay_order_id,
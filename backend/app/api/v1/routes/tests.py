@@ -3,33 +3,34 @@ Test data route handlers.
 """
 import logging
 import json
-from pathlib import Path
-from fastapi import APIRouter, HTTPException, status, Depends
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi import APIRouter, HTTPException, status, Depends, Header, Response
 from typing import Dict, Any, List, Optional
 from pydantic import BaseModel
 
-from app.core.security import verify_token
-from app.database import get_db
-from sqlalchemy.orm import Session
+from app.dependencies import get_current_user
+from app.database import DBSession, get_db_session
 from app.models.user import User
 from app.config import get_settings
+from app.core.aws_clients import get_aws_client
+from app.core.compression import negotiate_encoding
+from app.core.executors import run_cpu
+from app.services.test_catalog_service import get_test_catalog_service
+from app.services.s3_fetch_service import get_s3_fetch_service
+from app.services.test_document_cache import CachedTestDocument, get_test_document_cache
+from app.services.asset_url_cache import get_asset_url_cache
+from app.services.user_service import get_user_service
 
 logger = logging.getLogger(__name__)
 
-# Security scheme for Bearer token authentication
-security = HTTPBearer()
-
 router = APIRouter(prefix="/tests", tags=["tests"])
 
 # S3 bucket name for tests
-TESTS_S3_BUCKET = "testino-tests"
+TESTS_S3_BUCKET = get_settings().TESTS_S3_BUCKET
 # S3 bucket name for test responses
 TEST_RESPONSES_S3_BUCKET = "testino-test-responses"
 
 # Check if boto3 is available
 try:
-    import boto3
     from botocore.exceptions import ClientError
     BOTO3_AVAILABLE = True
 except ImportError:
@@ -46,7 +47,7 @@ class TestListItem(BaseModel):
 
 def get_s3_client():
     """
-    Get S3 client configured with AWS credentials from settings.
+    Get the shared S3 client configured with AWS credentials from settings.
     
     Returns:
         boto3 S3 client
@@ -71,13 +72,8 @@ def get_s3_client():
         )
     
     try:
-        s3_client = boto3.client(
-            's3',
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.AWS_REGION
-        )
-        return s3_client
+        # Shared client created at startup; safe to use across threads
+        return get_aws_client('s3')
     except Exception as e:
         logger.error(f"Failed to create S3 client: {e}")
         raise HTTPException(
@@ -86,15 +82,18 @@ def get_s3_client():
         )
 
 
-def get_test_from_s3(test_id: int) -> Dict[str, Any]:
+def get_test_document(test_id: int) -> CachedTestDocument:
     """
-    Fetch test JSON data from S3.
+    Fetch a test document from S3.
+    
+    Served from the parsed test document cache; S3 is only contacted on a
+    miss or to revalidate an entry whose TTL has run out.
     
     Args:
         test_id: The test ID (e.g., 1 for test-1.json)
     
     Returns:
-        Test data as dictionary
+        Cached test document (shared with the cache - do not mutate)
     
     Raises:
         HTTPException: If test not found or error accessing S3
@@ -103,10 +102,8 @@ def get_test_from_s3(test_id: int) -> Dict[str, Any]:
     test_key = f"test-{test_id}.json"
     
     try:
-        # Fetch object from S3
-        response = s3_client.get_object(Bucket=TESTS_S3_BUCKET, Key=test_key)
-        test_data = json.loads(response['Body'].read().decode('utf-8'))
-        return test_data
+        # Fetch object from S3 (or the document cache)
+        return get_test_document_cache().fetch(s3_client, TESTS_S3_BUCKET, test_id)
     except ClientError as e:
         error_code = e.response.get('Error', {}).get('Code', '')
         if error_code == 'NoSuchKey' or error_code == '404':
@@ -135,62 +132,43 @@ def get_test_from_s3(test_id: int) -> Dict[str, Any]:
         )
 
 
-def list_tests_from_s3() -> List[Dict[str, Any]]:
+def get_test_from_s3(test_id: int) -> Dict[str, Any]:
+    """
+    Fetch test JSON data from S3.
+    
+    Args:
+        test_id: The test ID (e.g., 1 for test-1.json)
+    
+    Returns:
+        Test data as dictionary (shared with the cache - do not mutate)
+    
+    Raises:
+        HTTPException: If test not found or error accessing S3
+    """
+    return get_test_document(test_id).data
+
+
+async def list_tests_from_s3() -> List[Dict[str, Any]]:
     """
     List all test files from S3 bucket.
     
+    Served from the in-process test catalog index, which re-lists the bucket
+    at most once per refresh interval and only downloads tests whose ETag changed.
+    
     Returns:
         List of test data dictionaries with id, name, and test_authorization
     """
+    catalog_service = get_test_catalog_service()
+    
+    # Answer from memory while the index is fresh
+    if not catalog_service.is_stale():
+        return [entry.to_dict() for entry in catalog_service.list_entries()]
+    
     s3_client = get_s3_client()
-    tests_list = []
     
     try:
-        # List all objects with prefix "test-" in the bucket
-        paginator = s3_client.get_paginator('list_objects_v2')
-        pages = paginator.paginate(Bucket=TESTS_S3_BUCKET, Prefix="test-")
-        
-        for page in pages:
-            if 'Contents' not in page:
-                continue
-            
-            for obj in page['Contents']:
-                key = obj['Key']
-                
-                # Only process files matching test-*.json pattern
-                if not key.endswith('.json') or not key.startswith('test-'):
-                    continue
-                
-                # Extract test ID from filename (e.g., "test-1.json" -> 1)
-                filename = Path(key).stem  # "test-1"
-                test_id_str = filename.replace("test-", "")
-                
-                try:
-                    test_id = int(test_id_str)
-                except ValueError:
-                    logger.warning(f"Invalid test filename format in S3: {key}")
-                    continue
-                
-                # Fetch test data to get name and authorization
-                try:
-                    test_data = get_test_from_s3(test_id)
-                    test_name = test_data.get("testName", f"Test {test_id}")
-                    test_authorization = test_data.get("test_authorization", "")
-                    
-                    tests_list.append({
-                        "id": test_id,
-                        "name": test_name,
-                        "test_authorization": test_authorization
-                    })
-                except HTTPException:
-                    # Skip tests that can't be read
-                    logger.warning(f"Skipping test {test_id} due to read error")
-                    continue
-                except Exception as e:
-                    logger.error(f"Error processing test {test_id} from S3: {e}")
-                    continue
-        
-        return tests_list
+        entries = await catalog_service.refresh(s3_client, TESTS_S3_BUCKET)
+        return [entry.to_dict() for entry in entries]
     except ClientError as e:
         error_code = e.response.get('Error', {}).get('Code', '')
         logger.error(f"Error listing tests from S3: {e}")
@@ -212,32 +190,6 @@ def list_tests_from_s3() -> List[Dict[str, Any]]:
         )
 
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
-    """
-    Dependency to get current authenticated user from JWT token.
-    
-    Args:
-        credentials: HTTP Bearer token credentials
-    
-    Returns:
-        Decoded token payload with user information
-    
-    Raises:
-        HTTPException: If token is invalid or expired
-    """
-    token = credentials.credentials
-    payload = verify_token(token)
-    
-    if payload is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    return payload
-
-
 def check_user_can_access_test(test_authorization: str, user_premium: bool) -> bool:
     """
     Check if user can access a test based on authorization level.
@@ -263,7 +215,32 @@ def check_user_can_access_test(test_authorization: str, user_premium: bool) -> b
     return True
 
 
-def resolve_asset_references(asset_references: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag.
+    
+    Args:
+        if_none_match: Raw If-None-Match header value (may list several ETags)
+        etag: Current strong ETag (quoted)
+    
+    Returns:
+        True if the client's cached copy is current
+    """
+    if not if_none_match:
+        return False
+    
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        # If-None-Match uses weak comparison
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == "*" or candidate == etag:
+            return True
+    
+    return False
+
+
+async def resolve_asset_references(asset_references: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
     Resolve asset references by generating presigned URLs for S3 objects.
     
@@ -271,6 +248,10 @@ def resolve_asset_references(asset_references: List[Dict[str, Any]]) -> List[Dic
     - If type is "s3_object", generates a presigned URL
     - Other types are passed through as-is (for future extension)
     
+    Presigned URLs and existence checks are cached per (bucket, key), so a
+    warm load makes no S3 calls. Remaining existence checks run concurrently
+    through the S3 fetch pool; resolved references keep the input order.
+    
     Args:
         asset_references: List of asset reference dictionaries from test JSON
     
@@ -281,14 +262,19 @@ def resolve_asset_references(asset_references: List[Dict[str, Any]]) -> List[Dic
         HTTPException: If any required asset is missing or cannot be resolved
     """
     settings = get_settings()
-    resolved_references = []
+    # Resolved references by position in asset_references, to preserve order
+    resolved_by_index: Dict[int, Dict[str, Any]] = {}
     missing_assets = []
+    # (index, asset_id, bucket, key) for s3_object entries to check in one batch
+    s3_assets = []
+    
+    url_cache = get_asset_url_cache()
     
     # Get S3 client
     s3_client = get_s3_client()
     
     # Process each asset reference
-    for asset_ref in asset_references:
+    for index, asset_ref in enumerate(asset_references):
         asset_id = asset_ref.get("id")
         asset_type = asset_ref.get("type")
         
@@ -306,11 +292,11 @@ def resolve_asset_references(asset_references: List[Dict[str, Any]]) -> List[Dic
                 continue
             
             # For url type, directly use the URL without any processing
-            resolved_references.append({
+            resolved_by_index[index] = {
                 "id": asset_id,
                 "type": "url",
                 "reference": url
-            })
+            }
             
             logger.debug(f"Resolved URL reference for {asset_id}: {url}")
         
@@ -324,42 +310,72 @@ def resolve_asset_references(asset_references: List[Dict[str, Any]]) -> List[Dic
                 missing_assets.append(f"{asset_id} (missing bucket/key)")
                 continue
             
-            try:
-                # Check if object exists before generating presigned URL
-                try:
-                    s3_client.head_object(Bucket=bucket, Key=key)
-                except ClientError as e:
-                    error_code = e.response.get('Error', {}).get('Code', '')
-                    if error_code == '404' or error_code == 'NoSuchKey':
-                        logger.error(f"S3 object does not exist: {bucket}/{key} for asset {asset_id}")
-                        missing_assets.append(f"{asset_id} ({bucket}/{key})")
-                    else:
-                        logger.error(f"Error checking S3 object existence for {asset_id}: {e}")
-                        missing_assets.append(f"{asset_id} (error: {error_code})")
-                    continue
-                
-                # Generate presigned URL
-                presigned_url = s3_client.generate_presigned_url(
-                    'get_object',
-                    Params={'Bucket': bucket, 'Key': key},
-                    ExpiresIn=settings.S3_PRESIGNED_URL_EXPIRY_SECONDS
-                )
-                
-                resolved_references.append({
+            # Reuse a cached presigned URL when the asset was checked recently
+            cached_url = url_cache.get(bucket, key)
+            if cached_url:
+                resolved_by_index[index] = {
                     "id": asset_id,
                     "type": "url",
-                    "reference": presigned_url
-                })
-                
-                logger.debug(f"Generated presigned URL for {asset_id}: {bucket}/{key}")
-            except Exception as e:
-                logger.error(f"Failed to generate presigned URL for {asset_id}: {e}")
-                missing_assets.append(f"{asset_id} (generation failed)")
+                    "reference": cached_url
+                }
                 continue
+            
+            s3_assets.append((index, asset_id, bucket, key))
         else:
             # For other types, log a warning but continue
             logger.debug(f"Skipping asset reference type '{asset_type}' for {asset_id} (not yet implemented)")
     
+    # Check if objects exist before generating presigned URLs
+    # (only for assets not served from the URL cache)
+    head_results = await get_s3_fetch_service().map(
+        lambda asset: s3_client.head_object(Bucket=asset[2], Key=asset[3]),
+        s3_assets
+    )
+    
+    for result in head_results:
+        index, asset_id, bucket, key = result.item
+        
+        if not result.ok:
+            if isinstance(result.error, ClientError):
+                error_code = result.error.response.get('Error', {}).get('Code', '')
+                if error_code == '404' or error_code == 'NoSuchKey':
+                    url_cache.invalidate(bucket, key)
+                    logger.error(f"S3 object does not exist: {bucket}/{key} for asset {asset_id}")
+                    missing_assets.append(f"{asset_id} ({bucket}/{key})")
+                else:
+                    logger.error(f"Error checking S3 object existence for {asset_id}: {result.error}")
+                    missing_assets.append(f"{asset_id} (error: {error_code})")
+            else:
+                logger.error(f"Failed to generate presigned URL for {asset_id}: {result.error}")
+                missing_assets.append(f"{asset_id} (generation failed)")
+            continue
+        
+        try:
+            # Keep a still-usable URL; only the existence check had expired
+            presigned_url = url_cache.get_usable_url(bucket, key)
+            if presigned_url:
+                url_cache.mark_verified(bucket, key)
+            else:
+                # Generate presigned URL (signed locally, no S3 round trip)
+                presigned_url = s3_client.generate_presigned_url(
+                    'get_object',
+                    Params={'Bucket': bucket, 'Key': key},
+                    ExpiresIn=settings.S3_PRESIGNED_URL_EXPIRY_SECONDS
+                )
+                url_cache.put(bucket, key, presigned_url, settings.S3_PRESIGNED_URL_EXPIRY_SECONDS)
+            
+            resolved_by_index[index] = {
+                "id": asset_id,
+                "type": "url",
+                "reference": presigned_url
+            }
+            
+            logger.debug(f"Generated presigned URL for {asset_id}: {bucket}/{key}")
+        except Exception as e:
+            logger.error(f"Failed to generate presigned URL for {asset_id}: {e}")
+            missing_assets.append(f"{asset_id} (generation failed)")
+            continue
+    
     # If any assets are missing, raise an error
     if missing_assets:
         logger.error(f"Missing assets detected: {', '.join(missing_assets)}")
@@ -368,7 +384,7 @@ def resolve_asset_references(asset_references: List[Dict[str, Any]]) -> List[Dic
             detail="One or more test assets are missing or unavailable"
         )
     
-    return resolved_references
+    return [resolved_by_index[index] for index in sorted(resolved_by_index)]
 
 
 @router.get(
@@ -380,7 +396,7 @@ def resolve_asset_references(asset_references: List[Dict[str, Any]]) -> List[Dic
 )
 async def list_tests(
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db_session)
 ) -> List[TestListItem]:
     """
     List all available tests with their unlock status.
@@ -401,7 +417,7 @@ async def list_tests(
     user_premium = False
     
     if user_email:
-        user = db.query(User).filter(User.email == user_email).first()
+        user = await get_user_service().get_profile(db, user_email)
         if user:
             user_premium = user.premium
         else:
@@ -415,7 +431,7 @@ async def list_tests(
     
     # List all tests from S3
     try:
-        s3_tests = list_tests_from_s3()
+        s3_tests = await list_tests_from_s3()
         
         for test_info in s3_tests:
             test_id = test_info["id"]
@@ -453,8 +469,10 @@ async def list_tests(
 async def get_test(
     test_id: int,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
-) -> Dict[str, Any]:
+    db: DBSession = Depends(get_db_session),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None)
+) -> Response:
     """
     Get test data for a specific test ID.
     
@@ -462,20 +480,26 @@ async def get_test(
     - If test_authorization is null/standard/empty: all logged-in users can access
     - If test_authorization is premium/paid: only users with premium=True can access
     
+    The response body is pre-serialized (and precompressed per accepted
+    encoding) once per test version and carries a strong ETag; a matching
+    If-None-Match header gets a 304 with no body.
+    
     Args:
         test_id: The test ID (e.g., 1 for test-1.json)
         current_user: Current authenticated user from JWT token
         db: Database session
+        if_none_match: ETag(s) of the client's cached copy
+        accept_encoding: Content encodings accepted by the client
     
     Returns:
-        Test data JSON (without test_authorization field)
+        Test data JSON (without test_authorization field), or 304 Not Modified
     
     Raises:
         HTTPException: If test not found, unauthorized, or access denied
     """
-    # Fetch test data from S3
+    # Fetch test data from S3 without blocking the event loop
     try:
-        test_data = get_test_from_s3(test_id)
+        document = await get_s3_fetch_service().run(get_test_document, test_id)
     except HTTPException:
         # Re-raise HTTP exceptions (404, 500, etc.)
         raise
@@ -486,6 +510,8 @@ async def get_test(
             detail="Error reading test data"
         )
     
+    test_data = document.data
+    
     # Check authorization
     test_authorization = test_data.get("test_authorization", "").lower() if test_data.get("test_authorization") else ""
     
@@ -494,7 +520,7 @@ async def get_test(
         # Get user from database to check premium status
         user_email = current_user.get("sub") or current_user.get("email")
         if user_email:
-            user = db.query(User).filter(User.email == user_email).first()
+            user = await get_user_service().get_profile(db, user_email)
             if not user or not user.premium:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
@@ -508,16 +534,42 @@ async def get_test(
                     detail="This test requires premium access"
                 )
     
-    # Remove test_authorization field from response for security
-    response_data = {k: v for k, v in test_data.items() if k != "test_authorization"}
-    
     # Process assetReferences and add assetReferencesResolved
     asset_references = test_data.get("assetReferences", [])
+    asset_references_resolved = None
     if asset_references:
-        asset_references_resolved = resolve_asset_references(asset_references)
-        response_data["assetReferencesResolved"] = asset_references_resolved
+        asset_references_resolved = await resolve_asset_references(asset_references)
+    
+    # Serialized body without test_authorization field (removed for security)
+    prepared = document.prepare_response(asset_references_resolved)
+    
+    # Small bodies aren't worth compressing
+    settings = get_settings()
+    encoding = None
+    if len(prepared.body) >= settings.COMPRESSION_MINIMUM_SIZE:
+        encoding = negotiate_encoding(accept_encoding)
+    
+    etag = prepared.get_etag(encoding)
+    headers = {
+        "ETag": etag,
+        # Let the browser keep the body but revalidate on every load
+        "Cache-Control": "private, no-cache",
+        "Vary": "Accept-Encoding"
+    }
+    
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    if encoding is None:
+        body = prepared.body
+    else:
+        headers["Content-Encoding"] = encoding
+        body = prepared.encoded_bodies.get(encoding)
+        if body is None:
+            # First request for this version and encoding: compress off the event loop
+            body = await run_cpu(prepared.get_body, encoding)
     
-    return response_data
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 class UploadUrlRequest(BaseModel):
@@ -536,7 +588,7 @@ async def get_upload_url(
     test_id: int,
     request: UploadUrlRequest,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db_session)
 ) -> Dict[str, Any]:
     """
     Get a presigned URL for uploading test response files to S3.
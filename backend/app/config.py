@@ -3,10 +3,49 @@ Application configuration management.
 Loads configuration from environment variables with sensible defaults.
 """
 import os
-from typing import List
+from typing import List, Optional
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 
+# Database connection pool defaults by environment (DATABASE_POOL_PRESET).
+# Sizes are per worker process; pool_recycle=-1 never recycles.
+DATABASE_POOL_PRESETS = {
+    "development": {
+        "pool_size": 5,
+        "max_overflow": 10,
+        "pool_timeout": 30,
+        "pool_recycle": -1,
+        "pool_pre_ping": False,
+    },
+    "production": {
+        "pool_size": 10,
+        "max_overflow": 20,
+        "pool_timeout": 10,  # Fail fast instead of queueing requests for long
+        "pool_recycle": 1800,  # Below typical server and load balancer idle timeouts
+        "pool_pre_ping": True,  # Replace connections dropped while idle
+    },
+    "test": {
+        "pool_size": 2,
+        "max_overflow": 0,
+        "pool_timeout": 5,
+        "pool_recycle": -1,
+        "pool_pre_ping": False,
+    },
+}
+
+
+def get_database_pool_preset(name: str) -> dict:
+    """
+    Get the pool settings of a DATABASE_POOL_PRESETS entry.
+
+    Raises:
+        ValueError: If the preset name is unknown
+    """
+    if name not in DATABASE_POOL_PRESETS:
+        raise ValueError(f"Unknown DATABASE_POOL_PRESET: {name} (expected one of {', '.join(DATABASE_POOL_PRESETS)})")
+    return DATABASE_POOL_PRESETS[name]
+
 
 class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
@@ -20,6 +59,11 @@ class Settings(BaseSettings):
     HOST: str = os.getenv("HOST", "0.0.0.0")
     PORT: int = int(os.getenv("PORT", 8000))
     
+    # Response compression (brotli is used when installed, gzip otherwise)
+    COMPRESSION_MINIMUM_SIZE: int = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))  # bytes
+    GZIP_COMPRESSION_LEVEL: int = int(os.getenv("GZIP_COMPRESSION_LEVEL", "6"))
+    BROTLI_COMPRESSION_QUALITY: int = int(os.getenv("BROTLI_COMPRESSION_QUALITY", "4"))
+    
     # CORS
     ALLOWED_ORIGINS: str = os.getenv(
         "ALLOWED_ORIGINS", 
@@ -30,16 +74,67 @@ class Settings(BaseSettings):
     OTP_LENGTH: int = 6
     OTP_EXPIRY_SECONDS: int = int(os.getenv("OTP_EXPIRY_SECONDS", "300"))  # 5 minutes
     OTP_MAX_ATTEMPTS: int = int(os.getenv("OTP_MAX_ATTEMPTS", "5"))
+    # OTP send rate limits (token buckets: limit requests, refilled over the window)
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "True").lower() == "true"
+    RATE_LIMIT_BACKEND: str = os.getenv("RATE_LIMIT_BACKEND", "memory")  # memory or redis
+    RATE_LIMIT_MAX_KEYS: int = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))  # In-memory buckets kept
+    RATE_LIMIT_TRUST_PROXY_HEADERS: bool = os.getenv("RATE_LIMIT_TRUST_PROXY_HEADERS", "False").lower() == "true"
+    # Proxies in front of the app that append to X-Forwarded-For (e.g., 1 for a single load balancer)
+    RATE_LIMIT_TRUSTED_PROXY_HOPS: int = int(os.getenv("RATE_LIMIT_TRUSTED_PROXY_HOPS", "1"))
+    OTP_SEND_EMAIL_LIMIT: int = int(os.getenv("OTP_SEND_EMAIL_LIMIT", "5"))
+    OTP_SEND_EMAIL_WINDOW_SECONDS: int = int(os.getenv("OTP_SEND_EMAIL_WINDOW_SECONDS", "900"))
+    OTP_SEND_IP_LIMIT: int = int(os.getenv("OTP_SEND_IP_LIMIT", "20"))
+    OTP_SEND_IP_WINDOW_SECONDS: int = int(os.getenv("OTP_SEND_IP_WINDOW_SECONDS", "900"))
+    # OTP storage: "memory" (single worker, dev) or "redis" (shared between workers)
+    OTP_STORAGE_BACKEND: str = os.getenv("OTP_STORAGE_BACKEND", "memory")
+    # How often the in-memory store evicts expired OTPs (0 disables the sweeper)
+    OTP_CLEANUP_INTERVAL_SECONDS: int = int(os.getenv("OTP_CLEANUP_INTERVAL_SECONDS", "30"))
     
     # Email Service Configuration
-    EMAIL_PROVIDER: str = os.getenv("EMAIL_PROVIDER", "console")  # console, resend, aws_ses, sendgrid
+    EMAIL_PROVIDER: str = os.getenv("EMAIL_PROVIDER", "console")  # console, resend, aws_ses, sendgrid, stub
+    
+    # Outbound email queue (OTP emails are sent by background workers)
+    EMAIL_QUEUE_ENABLED: bool = os.getenv("EMAIL_QUEUE_ENABLED", "True").lower() == "true"
+    EMAIL_QUEUE_MAX_SIZE: int = int(os.getenv("EMAIL_QUEUE_MAX_SIZE", "1000"))
+    EMAIL_QUEUE_WORKERS: int = int(os.getenv("EMAIL_QUEUE_WORKERS", "4"))
+    EMAIL_SEND_MAX_RETRIES: int = int(os.getenv("EMAIL_SEND_MAX_RETRIES", "3"))  # Retries when throttled
+    EMAIL_RETRY_BACKOFF_SECONDS: float = float(os.getenv("EMAIL_RETRY_BACKOFF_SECONDS", "1.0"))
+    EMAIL_RETRY_BACKOFF_MAX_SECONDS: float = float(os.getenv("EMAIL_RETRY_BACKOFF_MAX_SECONDS", "30.0"))
+    EMAIL_QUEUE_SHUTDOWN_TIMEOUT_SECONDS: float = float(os.getenv("EMAIL_QUEUE_SHUTDOWN_TIMEOUT_SECONDS", "10.0"))
+    # JSONL file taking overflow and undelivered emails, replayed at startup (empty disables).
+    # It contains OTPs, so keep it on a private volume.
+    EMAIL_SPOOL_PATH: str = os.getenv("EMAIL_SPOOL_PATH", "")
+    
+    # Micro-batching: queued emails are collected for up to EMAIL_BATCH_MAX_WAIT_MS
+    # and sent in one bulk provider call (resend, aws_ses, stub)
+    EMAIL_BATCH_ENABLED: bool = os.getenv("EMAIL_BATCH_ENABLED", "False").lower() == "true"
+    EMAIL_BATCH_MAX_WAIT_MS: float = float(os.getenv("EMAIL_BATCH_MAX_WAIT_MS", "5"))
+    EMAIL_BATCH_MAX_SIZE: int = int(os.getenv("EMAIL_BATCH_MAX_SIZE", "0"))  # 0 = provider limit
+    
+    # Stub provider (offline testing): simulated latency per API call; recipients
+    # on the .invalid TLD are rejected
+    EMAIL_STUB_LATENCY_MS: float = float(os.getenv("EMAIL_STUB_LATENCY_MS", "50"))
+    
+    # Provider failover: comma-separated providers in priority order (e.g., "aws_ses,resend").
+    # Empty uses EMAIL_PROVIDER alone.
+    EMAIL_FAILOVER_PROVIDERS: str = os.getenv("EMAIL_FAILOVER_PROVIDERS", "")
+    EMAIL_HEALTH_EWMA_ALPHA: float = float(os.getenv("EMAIL_HEALTH_EWMA_ALPHA", "0.2"))  # Weight of the latest send
+    EMAIL_CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv("EMAIL_CIRCUIT_FAILURE_THRESHOLD", "5"))  # Consecutive failures
+    # Also the idle time before a provider is probed and the half-life of its error rate
+    EMAIL_CIRCUIT_RESET_SECONDS: float = float(os.getenv("EMAIL_CIRCUIT_RESET_SECONDS", "30"))
+    EMAIL_HEDGE_AFTER_MS: float = float(os.getenv("EMAIL_HEDGE_AFTER_MS", "0"))  # 0 disables hedged sends
+    EMAIL_HEDGE_MAX_WORKERS: int = int(os.getenv("EMAIL_HEDGE_MAX_WORKERS", "16"))
     
     # Resend Configuration (Recommended - free tier available)
     RESEND_API_KEY: str = os.getenv("RESEND_API_KEY", "")
     RESEND_FROM_EMAIL: str = os.getenv("RESEND_FROM_EMAIL", "noreply@testino.space")
+    RESEND_BASE_URL: str = os.getenv("RESEND_BASE_URL", "https://api.resend.com")
     
     # AWS SES Configuration
     AWS_SES_FROM_EMAIL: str = os.getenv("AWS_SES_FROM_EMAIL", "")
+    # Prefix of the SES stored templates used for bulk sends (scripts/sync_ses_templates.py).
+    # Empty sends batches as individual SendEmail calls.
+    AWS_SES_TEMPLATE_PREFIX: str = os.getenv("AWS_SES_TEMPLATE_PREFIX", "")
     
     # SendGrid Configuration
     SENDGRID_API_KEY: str = os.getenv("SENDGRID_API_KEY", "")
@@ -59,6 +154,7 @@ class Settings(BaseSettings):
     PLIVO_PHONE_NUMBER: str = os.getenv("PLIVO_PHONE_NUMBER", "")
     
     # MSG91 Configuration (very cheap for India)
+    MSG91_BASE_URL: str = os.getenv("MSG91_BASE_URL", "https://control.msg91.com")
     MSG91_AUTH_KEY: str = os.getenv("MSG91_AUTH_KEY", "")
     MSG91_SENDER_ID: str = os.getenv("MSG91_SENDER_ID", "")
     MSG91_TEMPLATE_ID: str = os.getenv("MSG91_TEMPLATE_ID", "")  # Optional
@@ -68,16 +164,75 @@ class Settings(BaseSettings):
     AWS_SECRET_ACCESS_KEY: str = os.getenv("AWS_SECRET_ACCESS_KEY", "")
     AWS_REGION: str = os.getenv("AWS_REGION", "us-east-1")
     
+    # AWS client connection pooling (shared S3/SES clients)
+    AWS_MAX_POOL_CONNECTIONS: int = int(os.getenv("AWS_MAX_POOL_CONNECTIONS", "32"))
+    AWS_TCP_KEEPALIVE: bool = os.getenv("AWS_TCP_KEEPALIVE", "True").lower() == "true"
+    
+    # Shared async HTTP client for HTTP-based providers (Resend, MSG91)
+    HTTP_CLIENT_HTTP2: bool = os.getenv("HTTP_CLIENT_HTTP2", "False").lower() == "true"  # Needs httpx[http2]
+    HTTP_CLIENT_MAX_CONNECTIONS: int = int(os.getenv("HTTP_CLIENT_MAX_CONNECTIONS", "100"))
+    HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    HTTP_CLIENT_KEEPALIVE_EXPIRY_SECONDS: float = float(os.getenv("HTTP_CLIENT_KEEPALIVE_EXPIRY_SECONDS", "30"))
+    HTTP_CLIENT_CONNECT_TIMEOUT_SECONDS: float = float(os.getenv("HTTP_CLIENT_CONNECT_TIMEOUT_SECONDS", "5"))
+    HTTP_CLIENT_TIMEOUT_SECONDS: float = float(os.getenv("HTTP_CLIENT_TIMEOUT_SECONDS", "10"))
+    
     # S3 Presigned URL Configuration
     S3_PRESIGNED_URL_EXPIRY_SECONDS: int = int(os.getenv("S3_PRESIGNED_URL_EXPIRY_SECONDS", "7200"))  # 2 hours default
+    # Cached presigned URLs are reused until this much validity is left
+    S3_PRESIGNED_URL_REFRESH_MARGIN_SECONDS: int = int(os.getenv("S3_PRESIGNED_URL_REFRESH_MARGIN_SECONDS", "3600"))  # 1 hour
+    ASSET_EXISTENCE_TTL_SECONDS: int = int(os.getenv("ASSET_EXISTENCE_TTL_SECONDS", "3600"))  # 1 hour
+    ASSET_URL_CACHE_MAX_ENTRIES: int = int(os.getenv("ASSET_URL_CACHE_MAX_ENTRIES", "10000"))
+    
+    # S3 fetch pool size (concurrent boto3 calls per worker process)
+    S3_FETCH_MAX_WORKERS: int = int(os.getenv("S3_FETCH_MAX_WORKERS", "16"))
+    
+    # Executor pools for blocking work called from async routes (per worker process)
+    EXECUTOR_IO_MAX_WORKERS: int = int(os.getenv("EXECUTOR_IO_MAX_WORKERS", "32"))  # Database, Razorpay, Redis
+    EXECUTOR_CPU_MAX_WORKERS: int = int(os.getenv("EXECUTOR_CPU_MAX_WORKERS", "0"))  # Compression; 0 = CPU count
+    
+    # Bytes read per chunk when parsing S3 object bodies incrementally
+    S3_READ_CHUNK_SIZE: int = int(os.getenv("S3_READ_CHUNK_SIZE", str(64 * 1024)))
+    
+    # Test Catalog Configuration
+    TESTS_S3_BUCKET: str = os.getenv("TESTS_S3_BUCKET", "testino-tests")
+    TEST_CATALOG_REFRESH_INTERVAL_SECONDS: int = int(os.getenv("TEST_CATALOG_REFRESH_INTERVAL_SECONDS", "60"))
+    # Sidecar manifest (built by scripts/build_test_catalog.py); empty disables it
+    TEST_CATALOG_MANIFEST_KEY: str = os.getenv("TEST_CATALOG_MANIFEST_KEY", "catalog.json")
+    
+    # Startup warm-up and background bucket polling
+    TEST_WARMUP_ENABLED: bool = os.getenv("TEST_WARMUP_ENABLED", "True").lower() == "true"
+    TEST_WARMUP_COUNT: int = int(os.getenv("TEST_WARMUP_COUNT", "10"))  # Tests preloaded at startup
+    TEST_WARMUP_IDS: str = os.getenv("TEST_WARMUP_IDS", "")  # Comma-separated most-requested test IDs
+    TEST_CATALOG_POLL_INTERVAL_SECONDS: int = int(os.getenv("TEST_CATALOG_POLL_INTERVAL_SECONDS", "60"))  # 0 disables polling
+    
+    # Parsed test document cache (size counts the test JSON and the response bodies built from it)
+    TEST_CACHE_MAX_BYTES: int = int(os.getenv("TEST_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))  # 64 MB
+    TEST_CACHE_TTL_SECONDS: int = int(os.getenv("TEST_CACHE_TTL_SECONDS", "300"))  # 5 minutes
+    
+    # User profile cache for premium checks (per worker process; 0 disables)
+    USER_CACHE_TTL_SECONDS: int = int(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+    USER_CACHE_MAX_ENTRIES: int = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
     
     # Database Configuration (for future use)
     DATABASE_URL: str = os.getenv("DATABASE_URL", "")
+    # Async mode: routes use an AsyncSession (asyncpg for PostgreSQL, aiosqlite for SQLite)
+    DATABASE_ASYNC: bool = os.getenv("DATABASE_ASYNC", "False").lower() == "true"
+    
+    # Connection pool: the preset (development if DEBUG, else production) sets the
+    # defaults, each setting below overrides its value. Filled in by apply_pool_preset()
+    # once the environment and .env are loaded.
+    DATABASE_POOL_PRESET: Optional[str] = None
+    DATABASE_POOL_SIZE: Optional[int] = None
+    DATABASE_MAX_OVERFLOW: Optional[int] = None
+    DATABASE_POOL_TIMEOUT_SECONDS: Optional[float] = None
+    DATABASE_POOL_RECYCLE_SECONDS: Optional[int] = None
+    DATABASE_POOL_PRE_PING: Optional[bool] = None
     
     # JWT Configuration (for future use)
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", "change-this-secret-key-in-production")
     JWT_ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("JWT_ACCESS_TOKEN_EXPIRE_MINUTES", "1440"))  # 24 hours
+    JWT_VERIFY_CACHE_SIZE: int = int(os.getenv("JWT_VERIFY_CACHE_SIZE", "10000"))  # Verified tokens kept (0 disables)
     
     # Redis Configuration (for production OTP storage)
     REDIS_URL: str = os.getenv("REDIS_URL", "")
@@ -93,6 +248,23 @@ class Settings(BaseSettings):
         env_file = ".env"
         case_sensitive = True
 
+    @model_validator(mode="after")
+    def apply_pool_preset(self) -> "Settings":
+        """Fill the pool settings that weren't set explicitly from DATABASE_POOL_PRESET."""
+        if self.DATABASE_POOL_PRESET is None:
+            self.DATABASE_POOL_PRESET = "development" if self.DEBUG else "production"
+        preset = get_database_pool_preset(self.DATABASE_POOL_PRESET)
+        for field, option in (
+            ("DATABASE_POOL_SIZE", "pool_size"),
+            ("DATABASE_MAX_OVERFLOW", "max_overflow"),
+            ("DATABASE_POOL_TIMEOUT_SECONDS", "pool_timeout"),
+            ("DATABASE_POOL_RECYCLE_SECONDS", "pool_recycle"),
+            ("DATABASE_POOL_PRE_PING", "pool_pre_ping"),
+        ):
+            if getattr(self, field) is None:
+                setattr(self, field, preset[option])
+        return self
+
 
 @lru_cache()
 def get_settings() -> Settings:
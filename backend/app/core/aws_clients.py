@@ -0,0 +1,126 @@
+"""
+Shared AWS client registry.
+boto3 clients are thread-safe but expensive to build, so each service client
+(S3, SES, ...) is created once per process with a tuned connection pool and
+reused by every request and worker thread.
+"""
+import logging
+import threading
+from typing import Any, Dict, Optional
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Check if boto3 is available
+try:
+    import boto3
+    from botocore.config import Config
+    BOTO3_AVAILABLE = True
+except ImportError:
+    BOTO3_AVAILABLE = False
+
+
+class AWSClientRegistry:
+    """
+    Registry of process-wide boto3 clients keyed by service name.
+
+    Clients share one boto3 session and a botocore Config with
+    AWS_MAX_POOL_CONNECTIONS pooled connections and TCP keep-alive enabled.
+    """
+
+    def __init__(self):
+        if not BOTO3_AVAILABLE:
+            raise RuntimeError("boto3 is not installed")
+
+        self._session = boto3.session.Session(
+            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+            region_name=settings.AWS_REGION
+        )
+        self._config = Config(
+            max_pool_connections=settings.AWS_MAX_POOL_CONNECTIONS,
+            tcp_keepalive=settings.AWS_TCP_KEEPALIVE
+        )
+        self._clients: Dict[str, Any] = {}
+        # boto3 sessions are not thread-safe, so client creation is serialized
+        self._lock = threading.Lock()
+
+    def get_client(self, service_name: str):
+        """
+        Get the shared client for an AWS service, creating it on first use.
+
+        Args:
+            service_name: AWS service name (e.g., 's3', 'ses')
+
+        Returns:
+            boto3 client for the service
+        """
+        client = self._clients.get(service_name)
+        if client is not None:
+            return client
+
+        with self._lock:
+            client = self._clients.get(service_name)
+            if client is None:
+                client = self._session.client(service_name, config=self._config)
+                self._clients[service_name] = client
+                logger.info(
+                    f"AWS {service_name} client created "
+                    f"(pool size: {settings.AWS_MAX_POOL_CONNECTIONS}, region: {settings.AWS_REGION})"
+                )
+            return client
+
+    def close(self) -> None:
+        """Close all clients and their connection pools."""
+        with self._lock:
+            for client in self._clients.values():
+                try:
+                    client.close()
+                except Exception as e:
+                    logger.warning(f"Error closing AWS client: {e}")
+            self._clients.clear()
+
+
+# Singleton instance
+_aws_client_registry: Optional[AWSClientRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_aws_client_registry() -> AWSClientRegistry:
+    """Get AWS client registry singleton instance."""
+    global _aws_client_registry
+    if _aws_client_registry is None:
+        with _registry_lock:
+            if _aws_client_registry is None:
+                _aws_client_registry = AWSClientRegistry()
+    return _aws_client_registry
+
+
+def get_aws_client(service_name: str):
+    """Get the shared boto3 client for an AWS service."""
+    return get_aws_client_registry().get_client(service_name)
+
+
+def init_aws_clients() -> None:
+    """
+    Create the shared AWS clients.
+    Call this on application startup so the first request doesn't pay for it.
+    """
+    if not BOTO3_AVAILABLE:
+        logger.warning("boto3 not installed. AWS clients not initialized.")
+        return
+
+    if not settings.AWS_ACCESS_KEY_ID or not settings.AWS_SECRET_ACCESS_KEY:
+        logger.warning("AWS credentials not configured. AWS clients not initialized.")
+        return
+
+    get_aws_client('s3')
+
+
+def close_aws_clients() -> None:
+    """Close the shared AWS clients. Call this on application shutdown."""
+    global _aws_client_registry
+    if _aws_client_registry is not None:
+        _aws_client_registry.close()
+        _aws_client_registry = None
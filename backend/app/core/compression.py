@@ -0,0 +1,229 @@
+"""
+HTTP response compression.
+Negotiates brotli or gzip from Accept-Encoding and compresses responses
+above a size threshold. Responses that already carry a Content-Encoding
+(e.g., precompressed test bodies) are passed through untouched.
+"""
+import zlib
+from typing import Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Check if brotli is available
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# Content types worth compressing (test JSON, HTML, text)
+COMPRESSIBLE_CONTENT_TYPES = ("text/", "application/json", "application/javascript", "application/xml", "image/svg+xml")
+
+# Levels used for bodies compressed once and cached (e.g., test documents)
+PRECOMPRESSION_GZIP_LEVEL = 9
+PRECOMPRESSION_BROTLI_QUALITY = 9
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Pick the best supported content encoding from an Accept-Encoding header.
+    The acceptable encoding with the highest q-value wins; brotli is
+    preferred over gzip only when their q-values are equal.
+
+    Args:
+        accept_encoding: Raw Accept-Encoding header value
+
+    Returns:
+        "br", "gzip", or None if the client accepts neither
+    """
+    if not accept_encoding:
+        return None
+
+    # coding -> q-value; "*" covers codings not listed explicitly
+    qvalues = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qvalues[coding] = q
+
+    # Highest q wins; server preference (brotli first) only breaks ties
+    supported = ("br", "gzip") if BROTLI_AVAILABLE else ("gzip",)
+    best, best_q = None, 0.0
+    for coding in supported:
+        q = qvalues.get(coding, qvalues.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(body: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """
+    Compress a complete body.
+
+    Args:
+        body: Uncompressed bytes
+        encoding: "br" or "gzip"
+        level: Brotli quality or gzip level (defaults to the precompression levels)
+
+    Returns:
+        Compressed bytes
+    """
+    if encoding == "br":
+        quality = PRECOMPRESSION_BROTLI_QUALITY if level is None else level
+        return brotli.compress(body, quality=quality)
+    if encoding == "gzip":
+        gzip_level = PRECOMPRESSION_GZIP_LEVEL if level is None else level
+        compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+        return compressor.compress(body) + compressor.flush()
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+def is_compressible(content_type: str) -> bool:
+    """Check if a content type benefits from compression."""
+    content_type = content_type.lower()
+    return any(
+        content_type.startswith(prefix) if prefix.endswith("/") else prefix in content_type
+        for prefix in COMPRESSIBLE_CONTENT_TYPES
+    )
+
+
+class _StreamCompressor:
+    """Incremental compressor for streamed response bodies."""
+
+    def __init__(self, encoding: str, level: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=level)
+        else:
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data)
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses with brotli or gzip.
+
+    Responses smaller than minimum_size, non-text content types, and
+    responses that already set Content-Encoding are sent as-is.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        level = self.brotli_quality if encoding == "br" else self.gzip_level
+        responder = _CompressionResponder(send, encoding, level, self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    """Per-request send wrapper applying the negotiated encoding."""
+
+    def __init__(self, send: Send, encoding: str, level: int, minimum_size: int):
+        self._send = send
+        self.encoding = encoding
+        self.level = level
+        self.minimum_size = minimum_size
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[_StreamCompressor] = None
+        self.passthrough = False
+
+    def _should_compress(self, headers: MutableHeaders) -> bool:
+        status = self.start_message["status"]
+        if status < 200 or status in (204, 304):
+            return False
+        if "content-encoding" in headers:
+            return False
+        return is_compressible(headers.get("content-type", ""))
+
+    async def send(self, message: Message) -> None:
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            # Hold the headers until we know whether the body gets compressed
+            self.start_message = message
+            return
+
+        if message_type != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is not None:
+            # Continuation of a streamed, compressed body
+            data = self.compressor.compress(body)
+            if not more_body:
+                data += self.compressor.flush()
+            await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
+            return
+
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        if not self._should_compress(headers) or (not more_body and len(body) < self.minimum_size):
+            self.passthrough = True
+            await self._send(self.start_message)
+            await self._send(message)
+            return
+
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            # The compressed bytes differ, so the strong validator no longer applies
+            headers["ETag"] = f"W/{etag}"
+
+        if not more_body:
+            compressed = compress(body, self.encoding, self.level)
+            headers["Content-Length"] = str(len(compressed))
+            await self._send(self.start_message)
+            await self._send({"type": "http.response.body", "body": compressed})
+            return
+
+        # Streamed response: compress chunk by chunk
+        if "content-length" in headers:
+            del headers["Content-Length"]
+        self.compressor = _StreamCompressor(self.encoding, self.level)
+        await self._send(self.start_message)
+        await self._send({
+            "type": "http.response.body",
+            "body": self.compressor.compress(body),
+            "more_body": True
+        })
@@ -0,0 +1,139 @@
+"""
+Database connection pool options and instrumentation.
+Engines are built with pool sizes, timeouts, recycling and pre-ping from
+settings (see DATABASE_POOL_PRESETS), and their QueuePool records how long
+checkouts take so /health/metrics can show when the pool is the bottleneck.
+"""
+import threading
+import time
+from typing import Any, Dict, Optional
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+from app.config import get_settings
+
+settings = get_settings()
+
+
+class PoolMetrics:
+    """
+    Checkout counters for one pool.
+
+    Checkout time includes waiting for a free connection, opening a new one
+    and the pre-ping, i.e. everything a request waits for before its first
+    query.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.checkout_seconds = 0.0
+        self.max_checkout_seconds = 0.0
+
+    def record(self, seconds: float, timed_out: bool) -> None:
+        """Record one checkout."""
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.checkout_seconds += seconds
+            self.max_checkout_seconds = max(self.max_checkout_seconds, seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get checkout counters."""
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "average_checkout_ms": (
+                    round(self.checkout_seconds / self.checkouts * 1000, 3) if self.checkouts else 0.0
+                ),
+                "max_checkout_ms": round(self.max_checkout_seconds * 1000, 3)
+            }
+
+
+class _CheckoutTimingMixin:
+    """Times QueuePool.connect() into a PoolMetrics kept across recreate()."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def connect(self):
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            self.metrics.record(time.perf_counter() - start, timed_out)
+
+    def recreate(self):
+        # engine.dispose() swaps in a new pool; keep the counters
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(_CheckoutTimingMixin, QueuePool):
+    """QueuePool with checkout metrics (sync engines)."""
+
+
+class InstrumentedAsyncQueuePool(_CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool with checkout metrics (async engines)."""
+
+
+def get_pool_options(url: str, is_async: bool = False) -> Dict[str, Any]:
+    """
+    Get create_engine() pool arguments for a database URL.
+
+    In-memory SQLite keeps SQLAlchemy's default single-connection pool,
+    since each new connection would be a new, empty database.
+
+    Args:
+        url: Database URL
+        is_async: Whether the options are for create_async_engine()
+
+    Returns:
+        Keyword arguments for create_engine() / create_async_engine()
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return {}
+
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        "pool_timeout": settings.DATABASE_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DATABASE_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DATABASE_POOL_PRE_PING,
+    }
+
+
+def pool_stats(pool: Pool) -> Optional[Dict[str, Any]]:
+    """
+    Get size, usage and checkout counters of an engine's pool.
+
+    Returns:
+        Stats dictionary, or None if the pool is not a QueuePool
+    """
+    if not isinstance(pool, QueuePool):
+        return None
+
+    stats = {
+        "pool_size": pool.size(),
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        "in_use": pool.checkedout(),
+        "idle": pool.checkedin(),
+        # Negative until the pool has opened pool_size connections
+        "overflow": max(pool.overflow(), 0),
+    }
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        stats.update(metrics.stats())
+    return stats
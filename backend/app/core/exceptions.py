@@ -55,6 +55,13 @@ class SMSException(TestinoException):
         super().__init__(message, status_code=500)
 
 
+class EmailThrottledError(SMSException):
+    """Raised when the email provider rejects a send due to rate limiting."""
+    
+    def __init__(self, message: str = "Email provider rate limit exceeded. Please wait a moment and try again."):
+        super().__init__(message)
+
+
 class ValidationError(TestinoException):
     """Raised when input validation fails."""
     
@@ -0,0 +1,154 @@
+"""
+Executor pools for blocking work.
+Route handlers are async, so blocking calls (SQLAlchemy sessions, boto3,
+Razorpay, Redis) and CPU-heavy work (compression) run on thread pools
+instead of the event loop. I/O-bound and CPU-bound work get separately
+sized pools, so a burst of slow I/O can't queue CPU work behind it and vice
+versa. Each pool reports its queue depth for /health/metrics.
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+IO_POOL = "io"
+CPU_POOL = "cpu"
+
+
+class InstrumentedExecutor:
+    """
+    Thread pool that tracks queued and running calls.
+
+    Attributes:
+        queued: Calls waiting for a free thread
+        active: Calls running
+        max_queued: Highest queue depth seen
+    """
+
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-pool")
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.active = 0
+        self.max_queued = 0
+        self.completed = 0
+        self.wait_seconds = 0.0
+        logger.info(f"{name} pool initialized with {max_workers} workers")
+
+    def submit(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """Submit a blocking call and return its future."""
+        submitted_at = time.perf_counter()
+
+        def call():
+            started_at = time.perf_counter()
+            with self._lock:
+                self.queued -= 1
+                self.active += 1
+                self.wait_seconds += started_at - submitted_at
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self.active -= 1
+                    self.completed += 1
+
+        with self._lock:
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+        future = self._executor.submit(call)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future: Future) -> None:
+        # A call cancelled before it started never left the queue
+        if future.cancelled():
+            with self._lock:
+                self.queued -= 1
+
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a blocking call on the pool and await its result.
+
+        Raises:
+            Any exception raised by func
+        """
+        return await asyncio.wrap_future(self.submit(func, *args, **kwargs))
+
+    def stats(self) -> Dict[str, Any]:
+        """Get queue depth and wait time counters."""
+        with self._lock:
+            started = self.completed + self.active
+            return {
+                "max_workers": self.max_workers,
+                "queued": self.queued,
+                "active": self.active,
+                "max_queued": self.max_queued,
+                "completed": self.completed,
+                "average_wait_ms": round(self.wait_seconds / started * 1000, 3) if started else 0.0
+            }
+
+    def shutdown(self) -> None:
+        """Shut down the pool without waiting for pending calls."""
+        self._executor.shutdown(wait=False)
+
+
+# Pool instances by name
+_executors: Dict[str, InstrumentedExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(name: str) -> InstrumentedExecutor:
+    """
+    Get the io or cpu pool, creating it on first use.
+
+    Raises:
+        ValueError: If the pool name is unknown
+    """
+    executor = _executors.get(name)
+    if executor is not None:
+        return executor
+
+    with _executors_lock:
+        executor = _executors.get(name)
+        if executor is None:
+            if name == IO_POOL:
+                max_workers = settings.EXECUTOR_IO_MAX_WORKERS
+            elif name == CPU_POOL:
+                max_workers = settings.EXECUTOR_CPU_MAX_WORKERS or os.cpu_count() or 1
+            else:
+                raise ValueError(f"Unknown executor pool: {name}")
+            executor = InstrumentedExecutor(name, max_workers)
+            _executors[name] = executor
+        return executor
+
+
+async def run_io(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking I/O call (database, HTTP SDK, ...) on the io pool."""
+    return await get_executor(IO_POOL).run(func, *args, **kwargs)
+
+
+async def run_cpu(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run CPU-bound work (compression, hashing, ...) on the cpu pool."""
+    return await get_executor(CPU_POOL).run(func, *args, **kwargs)
+
+
+def executor_stats() -> Dict[str, Dict[str, Any]]:
+    """Get stats of every pool created so far."""
+    return {name: executor.stats() for name, executor in _executors.items()}
+
+
+def shutdown_executors() -> None:
+    """Shut down all pools. Call this on application shutdown."""
+    with _executors_lock:
+        for executor in _executors.values():
+            executor.shutdown()
+        _executors.clear()
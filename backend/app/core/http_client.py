@@ -0,0 +1,87 @@
+"""
+Shared async HTTP client.
+HTTP-based providers (Resend, MSG91, ...) send through one process-wide
+httpx.AsyncClient, so connections (and their TCP/TLS handshakes) are pooled
+and kept alive across sends instead of being set up for every message.
+"""
+import logging
+from typing import Any, Optional
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Check if httpx is available
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+# HTTP/2 needs the h2 package (pip install httpx[http2])
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+def create_http_client(**overrides: Any) -> "httpx.AsyncClient":
+    """
+    Create an async HTTP client with the configured pool, keep-alive and timeouts.
+
+    Args:
+        **overrides: Extra httpx.AsyncClient arguments (e.g., verify)
+
+    Raises:
+        RuntimeError: If httpx is not installed
+    """
+    if not HTTPX_AVAILABLE:
+        raise RuntimeError("httpx is not installed")
+
+    http2 = settings.HTTP_CLIENT_HTTP2
+    if http2 and not HTTP2_AVAILABLE:
+        logger.warning("h2 not installed. Using HTTP/1.1 for outbound requests.")
+        http2 = False
+
+    options = {
+        "http2": http2,
+        "limits": httpx.Limits(
+            max_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_CLIENT_KEEPALIVE_EXPIRY_SECONDS
+        ),
+        "timeout": httpx.Timeout(
+            settings.HTTP_CLIENT_TIMEOUT_SECONDS,
+            connect=settings.HTTP_CLIENT_CONNECT_TIMEOUT_SECONDS
+        )
+    }
+    options.update(overrides)
+    return httpx.AsyncClient(**options)
+
+
+# Singleton instance
+_http_client: Optional["httpx.AsyncClient"] = None
+
+
+def get_http_client() -> "httpx.AsyncClient":
+    """
+    Get the shared async HTTP client, creating it on first use.
+    Only use it from the application's event loop.
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = create_http_client()
+        logger.info(
+            f"HTTP client created (max connections: {settings.HTTP_CLIENT_MAX_CONNECTIONS}, "
+            f"http2: {settings.HTTP_CLIENT_HTTP2 and HTTP2_AVAILABLE})"
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client and its connections. Call this on application shutdown."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
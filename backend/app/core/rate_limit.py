@@ -0,0 +1,170 @@
+"""
+Token-bucket rate limiting.
+Each key (e.g., an email address or client IP) gets a bucket holding up to
+`limit` tokens that refills over `window_seconds`. A request takes one token
+or is rejected with the time until the next token, in O(1) per check. The
+in-memory limiter is per worker process; the Redis limiter is shared by all
+workers.
+"""
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import List, Optional
+from app.config import get_settings
+from app.core.executors import run_io
+from app.core.redis_client import REDIS_AVAILABLE, get_redis_client
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class RateLimiter(ABC):
+    """Interface for rate limiter backends."""
+
+    @abstractmethod
+    def acquire(self, key: str, limit: int, window_seconds: float) -> float:
+        """
+        Take one token from the bucket for a key.
+
+        Args:
+            key: Bucket key
+            limit: Bucket capacity (requests allowed in a burst)
+            window_seconds: Time for an empty bucket to refill completely
+
+        Returns:
+            0 if the request is allowed, otherwise seconds until it would be
+        """
+
+    async def acquire_async(self, key: str, limit: int, window_seconds: float) -> float:
+        """
+        acquire() for async callers. Backends that block on the network
+        override this so the event loop isn't held up.
+        """
+        return self.acquire(key, limit, window_seconds)
+
+
+class InMemoryRateLimiter(RateLimiter):
+    """
+    Per-process token buckets.
+
+    Buckets are kept in LRU order and the least recently used ones are
+    dropped beyond max_keys, so a flood of distinct keys can't grow memory
+    without bound. A dropped bucket starts over full.
+    """
+
+    def __init__(self, max_keys: Optional[int] = None):
+        self.max_keys = max_keys if max_keys is not None else settings.RATE_LIMIT_MAX_KEYS
+        # key -> [tokens, updated_at]
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str, limit: int, window_seconds: float) -> float:
+        now = time.monotonic()
+        rate = limit / window_seconds
+
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = [float(limit), now]
+                self._buckets[key] = bucket
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(float(limit), bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0.0
+            return (1 - bucket[0]) / rate
+
+
+# Token bucket update in one round trip.
+# KEYS[1] = bucket key; ARGV = capacity, refill rate (tokens/s), now (s)
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(bucket[1]) or capacity
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate)
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return tostring(retry_after)
+"""
+
+
+class RedisRateLimiter(RateLimiter):
+    """
+    Token buckets shared by all workers.
+
+    Each bucket is a Redis hash updated atomically by a Lua script and
+    expired once it would have refilled. If Redis is unreachable requests
+    are allowed, so an outage doesn't lock users out of signing in.
+    """
+
+    KEY_PREFIX = "ratelimit:"
+
+    def __init__(self, client=None):
+        if client is None:
+            client = get_redis_client()
+        self._client = client
+        self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def acquire(self, key: str, limit: int, window_seconds: float) -> float:
+        try:
+            retry_after = self._script(
+                keys=[f"{self.KEY_PREFIX}{key}"],
+                args=[limit, limit / window_seconds, time.time()]
+            )
+        except Exception as e:
+            logger.warning(f"Rate limiter unavailable, allowing request: {e}")
+            return 0.0
+        return float(retry_after)
+
+    async def acquire_async(self, key: str, limit: int, window_seconds: float) -> float:
+        # The script is a blocking round trip to Redis
+        return await run_io(self.acquire, key, limit, window_seconds)
+
+
+def create_rate_limiter() -> RateLimiter:
+    """
+    Create the rate limiter selected by RATE_LIMIT_BACKEND.
+
+    Raises:
+        RuntimeError: If Redis is selected but the redis package is not installed
+        ValueError: If RATE_LIMIT_BACKEND is not "memory" or "redis"
+    """
+    backend = settings.RATE_LIMIT_BACKEND.lower()
+
+    if backend == "memory":
+        return InMemoryRateLimiter()
+    if backend == "redis":
+        # Per-process buckets would silently multiply the limits by the worker count
+        if not REDIS_AVAILABLE:
+            raise RuntimeError("RATE_LIMIT_BACKEND is 'redis' but the redis package is not installed")
+        logger.info("Using Redis rate limiter")
+        return RedisRateLimiter()
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND '{backend}'. Expected 'memory' or 'redis'.")
+
+
+# Singleton instance
+_rate_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Get rate limiter singleton instance."""
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = create_rate_limiter()
+    return _rate_limiter
@@ -0,0 +1,65 @@
+"""
+Shared Redis client.
+One connection-pooled client per process, configured from REDIS_URL or
+REDIS_HOST/REDIS_PORT/REDIS_DB. Used for state that must be shared between
+uvicorn workers (e.g., pending OTPs).
+"""
+import logging
+import threading
+from typing import Optional
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Check if redis is available
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+_redis_client = None
+_lock = threading.Lock()
+
+
+def create_redis_client():
+    """
+    Build a Redis client from settings.
+
+    REDIS_URL takes precedence over REDIS_HOST/REDIS_PORT/REDIS_DB.
+
+    Raises:
+        RuntimeError: If the redis package is not installed
+    """
+    if not REDIS_AVAILABLE:
+        raise RuntimeError("redis is not installed")
+
+    if settings.REDIS_URL:
+        return redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return redis.Redis(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        db=settings.REDIS_DB,
+        decode_responses=True
+    )
+
+
+def get_redis_client():
+    """Get the process-wide Redis client, creating it on first use."""
+    global _redis_client
+    if _redis_client is None:
+        with _lock:
+            if _redis_client is None:
+                _redis_client = create_redis_client()
+                logger.info("Redis client created")
+    return _redis_client
+
+
+def close_redis_client() -> None:
+    """Close the Redis connection pool. Call this from the application shutdown event."""
+    global _redis_client
+    with _lock:
+        if _redis_client is not None:
+            _redis_client.close()
+            _redis_client = None
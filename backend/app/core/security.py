@@ -1,15 +1,101 @@
 """
 Security utilities for OTP generation and token management.
 """
+import hashlib
 import secrets
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from jose import JWTError, jwt
 from app.config import get_settings
 
 settings = get_settings()
 
 
+class TokenCache:
+    """
+    Bounded LRU cache of verified JWT payloads.
+
+    Entries are keyed by the SHA-256 digest of the token (so raw tokens are
+    not kept in memory) and expire at the token's `exp` claim. Only tokens
+    that passed verification are cached.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        # digest -> (payload, exp)
+        self._entries: "OrderedDict[bytes, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Get the cached payload of a token, or None if missing or expired."""
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            payload, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        # Callers get their own copy to modify
+        return dict(payload)
+
+    def put(self, token: str, payload: Dict[str, Any]) -> None:
+        """Cache a verified payload until its exp claim (tokens without exp are not cached)."""
+        expires_at = payload.get("exp")
+        if not isinstance(expires_at, (int, float)):
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (dict(payload), float(expires_at))
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters."""
+        with self._lock:
+            size = len(self._entries)
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            "size": size,
+            "max_size": self.max_size,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0
+        }
+
+
+# Singleton instance
+_token_cache: Optional[TokenCache] = None
+
+
+def get_token_cache() -> Optional[TokenCache]:
+    """Get verified token cache singleton instance, or None if JWT_VERIFY_CACHE_SIZE is 0."""
+    global _token_cache
+    if _token_cache is None and settings.JWT_VERIFY_CACHE_SIZE > 0:
+        _token_cache = TokenCache(settings.JWT_VERIFY_CACHE_SIZE)
+    return _token_cache
+
+
 def generate_otp(length: Optional[int] = None) -> str:
     """
     Generate a cryptographically secure OTP.
@@ -62,25 +148,38 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
     return encoded_jwt
 
 
-def verify_token(token: str) -> Optional[Dict[str, Any]]:
+def verify_token(token: str, use_cache: bool = True) -> Optional[Dict[str, Any]]:
     """
     Verify and decode a JWT token.
     
+    Tokens verified before are served from the token cache until they expire,
+    skipping the signature check.
+    
     Args:
         token: JWT token string
+        use_cache: Whether to use the verified token cache
     
     Returns:
         Decoded token payload if valid, None otherwise
     """
+    cache = get_token_cache() if use_cache else None
+    if cache is not None:
+        payload = cache.get(token)
+        if payload is not None:
+            return payload
+    
     try:
         payload = jwt.decode(
             token,
             settings.JWT_SECRET_KEY,
             algorithms=[settings.JWT_ALGORITHM]
         )
-        return payload
     except JWTError:
         return None
+    
+    if cache is not None:
+        cache.put(token, payload)
+    return payload
 
 
 def generate_access_token() -> str:
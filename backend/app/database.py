@@ -2,13 +2,24 @@
 Database configuration and session management.
 """
 import os
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Union
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.config import get_settings
+from app.core.db_pool import get_pool_options, pool_stats
+from app.core.executors import run_io
 
 settings = get_settings()
 
+# Check if SQLAlchemy asyncio is available (needs greenlet)
+try:
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+    SQLALCHEMY_ASYNC_AVAILABLE = True
+except ImportError:
+    SQLALCHEMY_ASYNC_AVAILABLE = False
+
 # Determine database URL
 if settings.DATABASE_URL:
     database_url = settings.DATABASE_URL
@@ -16,10 +27,11 @@ else:
     # Default to SQLite for development
     database_url = "sqlite:///./testino.db"
 
-# Create engine
+# Create engine (pool settings from DATABASE_POOL_PRESET and overrides)
 engine = create_engine(
     database_url,
-    connect_args={"check_same_thread": False} if "sqlite" in database_url else {}
+    connect_args={"check_same_thread": False} if "sqlite" in database_url else {},
+    **get_pool_options(database_url)
 )
 
 # Create session factory
@@ -28,6 +40,19 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Base class for models
 Base = declarative_base()
 
+# Either session type, as yielded by get_db_session()
+DBSession = Union[Session, "AsyncSession"]
+
+# Async drivers by database backend (DATABASE_ASYNC)
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
+
+# Async engine and session factory (created on first use)
+_async_engine: Optional["AsyncEngine"] = None
+_async_session_factory: Optional["async_sessionmaker"] = None
+
 
 def get_db():
     """
@@ -41,6 +66,107 @@ def get_db():
         db.close()
 
 
+def get_async_database_url(url: str) -> str:
+    """
+    Get the async driver URL for a database URL.
+    DATABASE_URL keeps its sync form (used by init_db and scripts), e.g.
+    postgresql://... becomes postgresql+asyncpg://...
+
+    Raises:
+        ValueError: If there is no async driver for the database backend
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver for database backend: {backend}")
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+def get_async_engine() -> "AsyncEngine":
+    """
+    Get the async engine singleton, creating it on first use.
+
+    Raises:
+        RuntimeError: If SQLAlchemy asyncio (greenlet) is not installed
+    """
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        if not SQLALCHEMY_ASYNC_AVAILABLE:
+            raise RuntimeError("DATABASE_ASYNC requires greenlet (pip install sqlalchemy[asyncio])")
+        async_url = get_async_database_url(database_url)
+        _async_engine = create_async_engine(async_url, **get_pool_options(async_url, is_async=True))
+        # Objects stay loaded after commit; expired attributes can't be
+        # lazy-loaded outside an await
+        _async_session_factory = async_sessionmaker(
+            _async_engine, autoflush=False, expire_on_commit=False
+        )
+    return _async_engine
+
+
+async def get_async_db() -> AsyncIterator["AsyncSession"]:
+    """
+    Dependency function to get an async database session.
+    """
+    get_async_engine()
+    async with _async_session_factory() as db:
+        yield db
+
+
+async def get_db_session() -> AsyncIterator[DBSession]:
+    """
+    Dependency function to get the session routes pass to services: an
+    AsyncSession when DATABASE_ASYNC is enabled, a Session otherwise.
+    Services run their queries through run_in_session(), which works with
+    either.
+    """
+    if settings.DATABASE_ASYNC:
+        async for db in get_async_db():
+            yield db
+    else:
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            # Returning the connection rolls it back (a database round trip)
+            await run_io(db.close)
+
+
+async def run_in_session(db: DBSession, func: Callable[..., Any], *args: Any) -> Any:
+    """
+    Run a function written against a sync Session without blocking the
+    event loop. With an AsyncSession it runs via run_sync(), so its queries
+    await the async driver; with a Session it runs on the io pool.
+
+    Args:
+        db: Session or AsyncSession
+        func: Function called as func(session, *args)
+
+    Returns:
+        The function's return value
+    """
+    if SQLALCHEMY_ASYNC_AVAILABLE and isinstance(db, AsyncSession):
+        return await db.run_sync(func, *args)
+    return await run_io(func, db, *args)
+
+
+def database_pool_stats() -> Dict[str, Any]:
+    """Get connection pool stats of the sync and (if created) async engines."""
+    return {
+        "preset": settings.DATABASE_POOL_PRESET,
+        "sync": pool_stats(engine.pool),
+        "async": pool_stats(_async_engine.sync_engine.pool) if _async_engine is not None else None
+    }
+
+
+async def close_async_engine() -> None:
+    """Dispose of the async engine's connections. Call this on application shutdown."""
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_session_factory = None
+
+
 def init_db():
     """
     Initialize database tables.
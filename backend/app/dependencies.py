@@ -1,10 +1,120 @@
 """
 Shared dependencies for dependency injection.
 """
+import math
+from typing import Any, Dict
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from app.config import get_settings
+from app.core.rate_limit import get_rate_limiter
+from app.core.security import verify_token
 
 settings = get_settings()
 
+# Security scheme for Bearer token authentication
+security = HTTPBearer()
 
 
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict[str, Any]:
+    """
+    Dependency to get current authenticated user from JWT token.
+    
+    Args:
+        credentials: HTTP Bearer token credentials
+    
+    Returns:
+        Decoded token payload with user information
+    
+    Raises:
+        HTTPException: If token is invalid or expired
+    """
+    payload = verify_token(credentials.credentials)
+    
+    if payload is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    return payload
 
+
+async def get_current_user_email(current_user: Dict[str, Any] = Depends(get_current_user)) -> str:
+    """
+    Dependency to get current user email from JWT token.
+    
+    Returns:
+        User email from token
+    
+    Raises:
+        HTTPException: If token is invalid or has no email
+    """
+    email = current_user.get("sub") or current_user.get("email")
+    if not email:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token: email not found"
+        )
+    return email
+
+
+def get_client_ip(request: Request) -> str:
+    """
+    Get the client IP address of a request.
+
+    X-Forwarded-For is only used when RATE_LIMIT_TRUST_PROXY_HEADERS is set,
+    since clients can send it themselves when not behind a proxy. Even then
+    only the entries appended by our own proxies can be trusted: the client
+    IP is the one RATE_LIMIT_TRUSTED_PROXY_HOPS entries from the right, and
+    anything to the left of it is whatever the client sent.
+    """
+    if settings.RATE_LIMIT_TRUST_PROXY_HEADERS:
+        forwarded_for = request.headers.get("x-forwarded-for")
+        if forwarded_for:
+            hops = [hop.strip() for hop in forwarded_for.split(",")]
+            return hops[max(0, len(hops) - max(1, settings.RATE_LIMIT_TRUSTED_PROXY_HOPS))]
+    return request.client.host if request.client else "unknown"
+
+
+async def rate_limit_otp_send(request: Request) -> None:
+    """
+    Dependency throttling OTP sends per client IP and per email address.
+
+    Add it to the route's dependencies so it runs before the database
+    session is used and before any email is rendered or sent.
+
+    Raises:
+        HTTPException: 429 with Retry-After if a limit is exceeded
+    """
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+
+    limiter = get_rate_limiter()
+
+    retry_after = await limiter.acquire_async(
+        f"otp-ip:{get_client_ip(request)}",
+        settings.OTP_SEND_IP_LIMIT,
+        settings.OTP_SEND_IP_WINDOW_SECONDS
+    )
+
+    if not retry_after:
+        # The body has already been read and parsed by FastAPI, so this is cached
+        try:
+            body = await request.json()
+        except ValueError:
+            body = None
+        email = body.get("email") if isinstance(body, dict) else None
+        if isinstance(email, str) and email.strip():
+            retry_after = await limiter.acquire_async(
+                f"otp-email:{email.strip().lower()}",
+                settings.OTP_SEND_EMAIL_LIMIT,
+                settings.OTP_SEND_EMAIL_WINDOW_SECONDS
+            )
+
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many OTP requests. Please try again later.",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
@@ -6,7 +6,19 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import get_settings
 from app.api.v1.routes import auth, health, tests, payment
-from app.database import init_db
+from app.database import close_async_engine, get_async_engine, init_db
+from app.core.aws_clients import init_aws_clients, close_aws_clients
+from app.core.compression import CompressionMiddleware
+from app.core.executors import shutdown_executors
+from app.core.http_client import close_http_client
+from app.core.rate_limit import get_rate_limiter
+from app.core.redis_client import close_redis_client
+from app.services.email_dispatcher import get_email_dispatcher
+from app.services.email_service import close_email_service
+from app.services.email_templates import load_email_templates
+from app.services.otp_service import get_otp_service
+from app.services.s3_fetch_service import get_s3_fetch_service
+from app.services.test_warmup_service import get_test_warmup_service
 
 # Configure logging
 logging.basicConfig(
@@ -35,6 +47,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Allow the UI to read ETags for conditional test loads
+    expose_headers=["ETag"],
+)
+
+# Response compression (precompressed test bodies pass through unchanged)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.GZIP_COMPRESSION_LEVEL,
+    brotli_quality=settings.BROTLI_COMPRESSION_QUALITY,
 )
 
 # Include routers
@@ -64,12 +86,39 @@ async def startup_event():
     # Initialize database tables
     init_db()
     logger.info("Database initialized")
+    if settings.DATABASE_ASYNC:
+        # Fail at startup, not on the first request, if the async driver is missing
+        get_async_engine()
+        logger.info("Async database engine created")
+    # Create shared AWS clients once for all requests
+    init_aws_clients()
+    # Preload test catalog and popular tests; /health/ready reports when done
+    get_test_warmup_service().start()
+    if settings.RATE_LIMIT_ENABLED:
+        # Fail at startup, not on the first OTP send, if the backend is unusable
+        get_rate_limiter()
+    # Evict expired OTPs from the in-memory store in the background
+    get_otp_service().start_expiry_sweeper()
+    # Compile email templates once instead of on the first OTP send
+    load_email_templates()
+    # Send OTP emails from background workers instead of the request
+    await get_email_dispatcher().start()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Application shutdown event."""
     logger.info(f"Shutting down {settings.APP_NAME}")
+    await get_test_warmup_service().stop()
+    await get_otp_service().stop_expiry_sweeper()
+    await get_email_dispatcher().stop()
+    close_email_service()
+    await close_http_client()
+    get_s3_fetch_service().shutdown()
+    shutdown_executors()
+    await close_async_engine()
+    close_aws_clients()
+    close_redis_client()
 
 
 if __name__ == "__main__":
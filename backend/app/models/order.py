@@ -1,7 +1,7 @@
 """
 Order model for payment orders.
 """
-from sqlalchemy import Column, String, Integer, DateTime, Boolean, ForeignKey, Enum
+from sqlalchemy import Column, String, Integer, DateTime, Boolean, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -20,6 +20,10 @@ class Order(Base):
     """Order model for Razorpay orders."""
     
     __tablename__ = "orders"
+    __table_args__ = (
+        # Per-user order history, newest first (also serves user_email lookups)
+        Index("ix_orders_user_email_created_at", "user_email", "created_at"),
+    )
     
     id = Column(String, primary_key=True)  # Internal order ID
     user_email = Column(String, ForeignKey("users.email"), nullable=False)
@@ -10,27 +10,32 @@ from app.config import get_settings
 settings = get_settings()
 
 
-@dataclass
+@dataclass(slots=True)
 class OTPRecord:
     """
     Represents an OTP record in storage.
     
+    Slotted, so a store holding many pending OTPs pays no per-record
+    __dict__. The identifier is the storage key and is not repeated here,
+    and the expiry and attempt limits are captured at construction.
+    
     Attributes:
         otp: The generated OTP code
         created_at: Timestamp when OTP was created
-        expires_at: Timestamp when OTP expires
+        expires_at: Timestamp when OTP expires (defaults to created_at + OTP_EXPIRY_SECONDS)
         attempts: Number of verification attempts made
-        phone_number: Full phone number (country_code + mobile_number)
+        max_attempts: Number of verification attempts allowed
     """
     otp: str
-    phone_number: str
     created_at: float = field(default_factory=time.time)
-    expires_at: float = field(init=False)
+    expires_at: Optional[float] = None
     attempts: int = 0
+    max_attempts: int = field(default_factory=lambda: settings.OTP_MAX_ATTEMPTS)
     
     def __post_init__(self):
         """Set expiration time after initialization."""
-        self.expires_at = self.created_at + settings.OTP_EXPIRY_SECONDS
+        if self.expires_at is None:
+            self.expires_at = self.created_at + settings.OTP_EXPIRY_SECONDS
     
     def is_expired(self) -> bool:
         """Check if OTP has expired."""
@@ -42,12 +47,8 @@ class OTPRecord:
     
     def has_exceeded_max_attempts(self) -> bool:
         """Check if maximum attempts have been exceeded."""
-        return self.attempts >= settings.OTP_MAX_ATTEMPTS
+        return self.attempts >= self.max_attempts
     
     def get_remaining_attempts(self) -> int:
         """Get remaining verification attempts."""
-        return max(0, settings.OTP_MAX_ATTEMPTS - self.attempts)
-
-
-
-
+        return max(0, self.max_attempts - self.attempts)
@@ -1,7 +1,7 @@
 """
 Transaction model for payment transactions.
 """
-from sqlalchemy import Column, String, Integer, DateTime, Boolean, ForeignKey, Enum, Text
+from sqlalchemy import Column, String, Integer, DateTime, Boolean, ForeignKey, Enum, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -21,15 +21,19 @@ class Transaction(Base):
     """Transaction model for Razorpay payments."""
     
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Per-user payment history, newest first (also serves user_email lookups)
+        Index("ix_transactions_user_email_created_at", "user_email", "created_at"),
+    )
     
     id = Column(String, primary_key=True)  # Internal transaction ID
-    order_id = Column(String, ForeignKey("orders.id"), nullable=False)
+    order_id = Column(String, ForeignKey("orders.id"), nullable=False, index=True)
     user_email = Column(String, ForeignKey("users.email"), nullable=False)
     amount = Column(Integer, nullable=False)  # Amount in currency subunits (paise for INR)
     currency = Column(String, nullable=False, default="INR")
     status = Column(Enum(TransactionStatus), default=TransactionStatus.PENDING, nullable=False)
     razorpay_payment_id = Column(String, unique=True, nullable=False)  # Store Razorpay's payment ID
-    razorpay_order_id = Column(String, nullable=False)
+    razorpay_order_id = Column(String, nullable=False, index=True)  # Refund reconciliation by Razorpay order
     razorpay_signature = Column(String, nullable=True)  # Payment signature for verification
     method = Column(String, nullable=True)  # Payment method (card, upi, etc.)
     description = Column(Text, nullable=True)  # Payment description
@@ -0,0 +1,161 @@
+"""
+Cache of presigned asset URLs for assetReferencesResolved.
+Presigned URLs are reused until a safety margin before they expire, and the
+head_object existence check behind them is cached too, so a warm test load
+makes no S3 round trips for its assets.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+@dataclass
+class CachedAssetUrl:
+    """
+    Represents a presigned URL for an S3 asset.
+
+    Attributes:
+        url: Presigned GET URL
+        expires_at: Timestamp when the presigned URL stops working
+        verified_at: Timestamp of the last successful existence check
+    """
+    url: str
+    expires_at: float
+    verified_at: float
+
+
+class AssetUrlCache:
+    """
+    LRU cache of presigned URLs keyed by (bucket, key).
+
+    A cached URL is handed out only while it has more than
+    S3_PRESIGNED_URL_REFRESH_MARGIN_SECONDS of validity left, so students
+    always receive a URL that outlives their test session. The existence
+    check is trusted for ASSET_EXISTENCE_TTL_SECONDS; after that the asset is
+    checked again but a still-valid URL is kept. Missing assets are never
+    cached, so a fixed upload is picked up immediately.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        refresh_margin_seconds: Optional[int] = None,
+        existence_ttl_seconds: Optional[int] = None
+    ):
+        self.max_entries = max_entries or settings.ASSET_URL_CACHE_MAX_ENTRIES
+        self.refresh_margin_seconds = (
+            refresh_margin_seconds if refresh_margin_seconds is not None
+            else settings.S3_PRESIGNED_URL_REFRESH_MARGIN_SECONDS
+        )
+        self.existence_ttl_seconds = (
+            existence_ttl_seconds if existence_ttl_seconds is not None
+            else settings.ASSET_EXISTENCE_TTL_SECONDS
+        )
+        self._entries: "OrderedDict[Tuple[str, str], CachedAssetUrl]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _is_url_usable(self, entry: CachedAssetUrl, now: float) -> bool:
+        """Check if the URL has enough validity left to hand out."""
+        return now < entry.expires_at - self.refresh_margin_seconds
+
+    def get(self, bucket: str, key: str) -> Optional[str]:
+        """
+        Get a presigned URL that needs no S3 round trip.
+
+        Args:
+            bucket: S3 bucket name
+            key: S3 object key
+
+        Returns:
+            Cached presigned URL, or None if the asset must be checked again
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get((bucket, key))
+            if (
+                entry is not None
+                and self._is_url_usable(entry, now)
+                and now - entry.verified_at < self.existence_ttl_seconds
+            ):
+                self._entries.move_to_end((bucket, key))
+                self.hits += 1
+                return entry.url
+            self.misses += 1
+            return None
+
+    def get_usable_url(self, bucket: str, key: str) -> Optional[str]:
+        """Get a cached URL that is still usable, ignoring existence-check age."""
+        with self._lock:
+            entry = self._entries.get((bucket, key))
+            if entry is not None and self._is_url_usable(entry, time.time()):
+                return entry.url
+            return None
+
+    def put(self, bucket: str, key: str, url: str, expires_in: int) -> None:
+        """
+        Store a presigned URL for an asset that was just verified to exist.
+
+        Args:
+            bucket: S3 bucket name
+            key: S3 object key
+            url: Presigned GET URL
+            expires_in: Lifetime of the URL in seconds
+        """
+        now = time.time()
+        with self._lock:
+            self._entries[(bucket, key)] = CachedAssetUrl(
+                url=url,
+                expires_at=now + expires_in,
+                verified_at=now
+            )
+            self._entries.move_to_end((bucket, key))
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def mark_verified(self, bucket: str, key: str) -> None:
+        """Record a successful existence check for a cached asset."""
+        with self._lock:
+            entry = self._entries.get((bucket, key))
+            if entry is not None:
+                entry.verified_at = time.time()
+
+    def invalidate(self, bucket: str, key: str) -> None:
+        """Remove an asset from the cache (e.g., after it was found missing)."""
+        with self._lock:
+            self._entries.pop((bucket, key), None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache counters and current size."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+
+# Singleton instance
+_asset_url_cache: Optional[AssetUrlCache] = None
+
+
+def get_asset_url_cache() -> AssetUrlCache:
+    """Get asset URL cache singleton instance."""
+    global _asset_url_cache
+    if _asset_url_cache is None:
+        _asset_url_cache = AssetUrlCache()
+    return _asset_url_cache
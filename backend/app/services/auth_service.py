@@ -3,28 +3,50 @@ Authentication service for handling user authentication.
 """
 import logging
 from typing import Optional
-from sqlalchemy.orm import Session
 from app.services.otp_service import get_otp_service
 from app.services.email_service import get_email_service
+from app.services.email_dispatcher import EmailJob, get_email_dispatcher
 from app.core.security import create_access_token
+from app.core.executors import run_cpu, run_io
 from app.core.exceptions import ValidationError, UserNotFoundError, SMSException
 from app.utils.validators import validate_email, validate_otp
 from app.config import get_settings
-from app.models.user import User
-from app.database import get_db
+from app.database import DBSession
+from app.services.user_service import get_user_service
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
 
 class AuthService:
-    """Service for handling authentication operations."""
+    """
+    Service for handling authentication operations.
+    
+    The public methods are coroutines: database queries go through
+    UserService (sync or async session), blocking OTP storage calls run
+    on the io executor pool, and JWT signing runs on the cpu pool.
+    """
     
     def __init__(self):
         self.otp_service = get_otp_service()
         self.email_service = get_email_service()
+        self.user_service = get_user_service()
+    
+    async def _send_otp_email(self, email: str, otp: str, name: Optional[str], is_signup: bool) -> None:
+        """
+        Queue the OTP email for the background dispatcher.
+        Sends it inline when the dispatcher is not running (e.g., in scripts).
+        
+        Raises:
+            SMSException: If the email can't be queued or sent
+        """
+        dispatcher = get_email_dispatcher()
+        if dispatcher.is_running:
+            await dispatcher.enqueue(EmailJob(email=email, otp=otp, name=name, is_signup=is_signup))
+        else:
+            await self.email_service.send_otp_async(email, otp, name, is_signup=is_signup)
     
-    def send_email_otp(self, email: str, name: Optional[str] = None, db: Session = None) -> dict:
+    async def send_email_otp(self, email: str, name: Optional[str] = None, db: DBSession = None) -> dict:
         """
         Send OTP to the provided email address.
         For login, checks if user exists before sending OTP.
@@ -47,22 +69,22 @@ class AuthService:
         
         # For login (no name provided), check if user exists first
         if name is None and db is not None:
-            user = db.query(User).filter(User.email == email.lower().strip()).first()
+            user = await self.user_service.get_user(db, email.lower().strip())
             if not user:
                 raise UserNotFoundError("User not found. Please sign up first.")
         
         # Generate and store OTP (using email as identifier)
-        otp = self.otp_service.generate_and_store_otp("", email)  # Empty country code for email
+        otp = await run_io(self.otp_service.generate_and_store_otp, "", email)  # Empty country code for email
         
         # Send OTP via email (for login, no name provided)
         try:
-            self.email_service.send_otp(email, otp, name, is_signup=False)
+            await self._send_otp_email(email, otp, name, is_signup=False)
         except Exception as e:
             # If email fails, clean up OTP
-            self.otp_service.delete_otp("", email)
+            await run_io(self.otp_service.delete_otp, "", email)
             raise
         
-        logger.info(f"OTP sent successfully to {email}")
+        logger.info(f"OTP queued for {email}")
         
         return {
             "success": True,
@@ -70,7 +92,7 @@ class AuthService:
             "expires_in": settings.OTP_EXPIRY_SECONDS
         }
     
-    def verify_email_otp(self, email: str, otp: str, db: Session) -> dict:
+    async def verify_email_otp(self, email: str, otp: str, db: DBSession) -> dict:
         """
         Verify OTP and generate JWT access token.
         
@@ -92,10 +114,10 @@ class AuthService:
         validate_otp(otp, expected_length=settings.OTP_LENGTH)
         
         # Verify OTP
-        self.otp_service.verify_otp("", email, otp)  # Empty country code for email
+        await run_io(self.otp_service.verify_otp, "", email, otp)  # Empty country code for email
         
         # Check if user exists
-        user = db.query(User).filter(User.email == email.lower().strip()).first()
+        user = await self.user_service.get_user(db, email.lower().strip())
         if not user:
             raise UserNotFoundError("User not found. Please sign up first.")
         
@@ -107,7 +129,7 @@ class AuthService:
             "premium": user.premium
         }
         
-        access_token = create_access_token(data=token_data)
+        access_token = await run_cpu(create_access_token, data=token_data)
         
         logger.info(f"OTP verified successfully for {email}, JWT token generated")
         
@@ -118,7 +140,7 @@ class AuthService:
             "token_type": "bearer"
         }
     
-    def signup_with_email_otp(self, name: str, email: str, db: Session = None) -> dict:
+    async def signup_with_email_otp(self, name: str, email: str, db: DBSession = None) -> dict:
         """
         Signup user and send OTP for email verification.
         
@@ -143,22 +165,22 @@ class AuthService:
         # Check if user already exists
         if db is not None:
             email_lower = email.lower().strip()
-            existing_user = db.query(User).filter(User.email == email_lower).first()
+            existing_user = await self.user_service.get_user(db, email_lower)
             if existing_user:
                 raise UserNotFoundError("User already exists. Please sign in instead.")
         
         # Generate and store OTP
-        otp = self.otp_service.generate_and_store_otp("", email)
+        otp = await run_io(self.otp_service.generate_and_store_otp, "", email)
         
         # Send OTP via email (for signup, with name)
         try:
-            self.email_service.send_otp(email, otp, name.strip(), is_signup=True)
+            await self._send_otp_email(email, otp, name.strip(), is_signup=True)
         except Exception as e:
             # If email fails, clean up OTP
-            self.otp_service.delete_otp("", email)
+            await run_io(self.otp_service.delete_otp, "", email)
             raise
         
-        logger.info(f"Signup OTP sent successfully to {email}")
+        logger.info(f"Signup OTP queued for {email}")
         
         return {
             "success": True,
@@ -166,7 +188,7 @@ class AuthService:
             "expires_in": settings.OTP_EXPIRY_SECONDS
         }
     
-    def verify_signup_otp(self, name: str, email: str, otp: str, db: Session) -> dict:
+    async def verify_signup_otp(self, name: str, email: str, otp: str, db: DBSession) -> dict:
         """
         Verify signup OTP and create user account.
         
@@ -190,13 +212,13 @@ class AuthService:
         validate_otp(otp, expected_length=settings.OTP_LENGTH)
         
         # Verify OTP
-        self.otp_service.verify_otp("", email, otp)
+        await run_io(self.otp_service.verify_otp, "", email, otp)
         
         email_lower = email.lower().strip()
         name_stripped = name.strip()
         
         # Check if user already exists
-        existing_user = db.query(User).filter(User.email == email_lower).first()
+        existing_user = await self.user_service.get_user(db, email_lower)
         if existing_user:
             # User already exists, just log them in
             token_data = {
@@ -205,19 +227,14 @@ class AuthService:
                 "name": existing_user.name,
                 "premium": existing_user.premium
             }
-            access_token = create_access_token(data=token_data)
+            access_token = await run_cpu(create_access_token, data=token_data)
             logger.info(f"User {email} already exists, logged in")
         else:
             # Create new user with email as primary key, name, premium=false
             try:
-                new_user = User(
-                    email=email_lower,
-                    name=name_stripped,
-                    premium=False
-                )
-                db.add(new_user)
-                db.commit()
-                db.refresh(new_user)
+                new_user = await self.user_service.create_user(db, email_lower, name_stripped)
+                # Drop any cached lookup from before the account existed
+                self.user_service.invalidate_user(email_lower)
                 
                 # Create JWT token with user data
                 token_data = {
@@ -226,10 +243,9 @@ class AuthService:
                     "name": new_user.name,
                     "premium": new_user.premium
                 }
-                access_token = create_access_token(data=token_data)
+                access_token = await run_cpu(create_access_token, data=token_data)
                 logger.info(f"Signup verified successfully for {email} (name: {name}), user created with email: {new_user.email}")
             except Exception as e:
-                db.rollback()
                 logger.error(f"Error creating user: {str(e)}", exc_info=True)
                 raise ValidationError(f"Failed to create user account: {str(e)}")
         
@@ -0,0 +1,114 @@
+"""
+Email micro-batching.
+Emails submitted within a few milliseconds of each other are collected and
+sent in one bulk provider call, and each caller gets back the result for its
+own recipient.
+"""
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple
+from app.config import get_settings
+from app.core.exceptions import SMSException
+from app.services.email_service import EmailMessage, EmailService, EmailSendResult
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class EmailBatcher:
+    """
+    Collects emails into batches for EmailService.send_batch().
+
+    A batch is sent when it reaches max_batch_size or max_wait_seconds after
+    its first email, whichever comes first. Batches are sent with
+    send_batch_async(), so several can be in flight while the next one
+    fills up. Must be used from a single event loop.
+    """
+
+    def __init__(
+        self,
+        email_service: EmailService,
+        max_batch_size: Optional[int] = None,
+        max_wait_seconds: Optional[float] = None
+    ):
+        limit = email_service.batch_limit
+        if max_batch_size is None:
+            max_batch_size = settings.EMAIL_BATCH_MAX_SIZE
+        self.email_service = email_service
+        self.max_batch_size = min(max_batch_size, limit) if max_batch_size > 0 else limit
+        self.max_wait_seconds = (
+            max_wait_seconds if max_wait_seconds is not None else settings.EMAIL_BATCH_MAX_WAIT_MS / 1000
+        )
+        self._pending: List[Tuple[EmailMessage, asyncio.Future]] = []
+        self._flush_timer: Optional[asyncio.TimerHandle] = None
+        self._in_flight: Set[asyncio.Task] = set()
+
+        # Counters for /health/metrics
+        self.batches = 0
+        self.messages = 0
+
+    async def send(self, message: EmailMessage) -> EmailSendResult:
+        """
+        Send an email as part of the next batch.
+
+        Raises:
+            EmailThrottledError: If the provider throttled this email
+            SMSException: If this email could not be sent
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((message, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_timer is None:
+            self._flush_timer = asyncio.get_running_loop().call_later(self.max_wait_seconds, self._flush)
+
+        result = await future
+        if result.error:
+            raise result.error
+        return result
+
+    def _flush(self) -> None:
+        """Send the pending emails as one batch."""
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._send_batch(batch))
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+
+    async def _send_batch(self, batch: List[Tuple[EmailMessage, asyncio.Future]]) -> None:
+        """Send one batch and hand each caller its result."""
+        self.batches += 1
+        self.messages += len(batch)
+        try:
+            results = await self.email_service.send_batch_async([message for message, _ in batch])
+        except Exception as e:
+            logger.error(f"Email batch of {len(batch)} failed: {e}")
+            error = SMSException(f"Failed to send email: {str(e)}")
+            results = [EmailSendResult(error=error) for _ in batch]
+
+        if len(results) != len(batch):
+            # Results can't be matched to recipients; fail the whole batch
+            # rather than leave callers waiting forever
+            logger.error(f"Email provider returned {len(results)} results for a batch of {len(batch)}")
+            error = SMSException("Failed to send email: provider returned an incomplete batch result")
+            results = [EmailSendResult(error=error) for _ in batch]
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get batch counters."""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_seconds * 1000,
+            "batches": self.batches,
+            "messages": self.messages,
+            "average_batch_size": round(self.messages / self.batches, 2) if self.batches else 0
+        }
@@ -0,0 +1,320 @@
+"""
+Outbound email dispatcher.
+OTP emails are put on a bounded in-process queue and sent by a pool of
+background workers, so API requests return as soon as the OTP is stored
+and the email is queued instead of waiting on the provider round trip.
+"""
+import asyncio
+import json
+import logging
+import os
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+from app.config import get_settings
+from app.core.executors import run_io
+from app.core.exceptions import EmailThrottledError, OTPException, SMSException
+from app.services.email_batcher import EmailBatcher
+from app.services.email_service import EmailMessage, get_email_service
+from app.services.email_templates import otp_email_values
+from app.services.otp_service import get_otp_service
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+@dataclass
+class EmailJob:
+    """
+    An OTP email waiting to be sent.
+
+    Attributes:
+        email: Recipient email address
+        otp: The OTP to send
+        name: Optional recipient name
+        is_signup: Whether this is for signup (True) or signin (False)
+        attempts: Number of send attempts made
+        created_at: Timestamp when the email was queued
+    """
+    email: str
+    otp: str
+    name: Optional[str] = None
+    is_signup: bool = False
+    attempts: int = 0
+    created_at: float = field(default_factory=time.time)
+
+    def is_stale(self) -> bool:
+        """Check if the OTP in this email has expired, making it pointless to send."""
+        return time.time() - self.created_at >= settings.OTP_EXPIRY_SECONDS
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert job to a dictionary for the spool file."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "EmailJob":
+        """Build a job from a spool file entry."""
+        return cls(**data)
+
+
+class EmailDispatcher:
+    """
+    Bounded email queue drained by a pool of asyncio workers.
+
+    Workers await send_otp_async(), which uses the shared async HTTP client
+    for HTTP providers and the io pool for blocking SDKs.
+    Throttled sends (EmailThrottledError) are retried with exponential
+    backoff and jitter; the worker waits out the backoff, which also slows
+    the pool down while the provider is throttling. When a send finally
+    fails, the OTP it carried is deleted so the user can request a new one.
+
+    If EMAIL_SPOOL_PATH is set, emails that don't fit in the queue and
+    emails still queued at shutdown are appended to that JSONL file, and
+    the file is replayed on the next startup.
+
+    With EMAIL_BATCH_ENABLED, workers hand their emails to an EmailBatcher
+    instead, which sends them in bulk provider calls. Each worker waits on
+    one email, so a batch worth of workers is started per EMAIL_QUEUE_WORKERS
+    to keep as many bulk calls in flight as there would be single sends.
+    """
+
+    def __init__(self):
+        self.max_queue_size = settings.EMAIL_QUEUE_MAX_SIZE
+        self.worker_count = settings.EMAIL_QUEUE_WORKERS
+        self.spool_path = settings.EMAIL_SPOOL_PATH
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._workers: List[asyncio.Task] = []
+        self._batcher: Optional[EmailBatcher] = None
+        self._spool_lock = threading.Lock()
+
+        # Counters for /health/metrics
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.spooled = 0
+
+    @property
+    def is_running(self) -> bool:
+        """Whether workers are running and emails can be queued."""
+        return self._queue is not None
+
+    async def start(self) -> None:
+        """
+        Start the worker pool and replay spooled emails.
+        Call this from the application startup event.
+        """
+        if not settings.EMAIL_QUEUE_ENABLED or self.is_running:
+            return
+
+        worker_count = max(1, self.worker_count)
+        email_service = get_email_service()
+        if settings.EMAIL_BATCH_ENABLED:
+            if email_service.batch_limit > 1:
+                self._batcher = EmailBatcher(email_service)
+                worker_count *= self._batcher.max_batch_size
+                logger.info(f"Email batching enabled (up to {self._batcher.max_batch_size} per call)")
+            else:
+                logger.warning(f"Email provider '{email_service.provider}' has no bulk API. Sending one by one.")
+
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._workers = [
+            asyncio.create_task(self._worker(index))
+            for index in range(worker_count)
+        ]
+        logger.info(f"Email dispatcher started with {len(self._workers)} workers")
+
+        for job in await run_io(self._read_spool):
+            await self.enqueue(job)
+
+    async def stop(self) -> None:
+        """
+        Let workers drain the queue, then stop them.
+        Call this from the application shutdown event.
+
+        Emails still queued after EMAIL_QUEUE_SHUTDOWN_TIMEOUT_SECONDS are
+        spooled when a spool file is configured, and dropped otherwise.
+        """
+        if not self.is_running:
+            return
+
+        queue = self._queue
+        try:
+            await asyncio.wait_for(queue.join(), settings.EMAIL_QUEUE_SHUTDOWN_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            logger.warning(f"Email queue not drained at shutdown ({queue.qsize()} emails left)")
+
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._batcher = None
+        self._queue = None
+        self._loop = None
+
+        remaining = []
+        while not queue.empty():
+            remaining.append(queue.get_nowait())
+        if remaining:
+            if self.spool_path:
+                await run_io(self._write_spool, remaining)
+            else:
+                logger.error(f"Dropping {len(remaining)} queued emails at shutdown")
+
+    async def enqueue(self, job: EmailJob) -> None:
+        """
+        Queue an email for sending.
+
+        Raises:
+            SMSException: If the dispatcher is not running, or the queue is
+                full and no spool file is configured
+        """
+        loop = self._loop
+        if loop is None:
+            # Callers check is_running and send inline instead
+            raise SMSException("Email dispatcher is not running")
+
+        if asyncio.get_running_loop() is not loop:
+            # Called from another event loop; asyncio.Queue is not
+            # thread-safe, so hand the job over to the dispatcher's loop
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self._put(job), loop))
+            return
+
+        await self._put(job)
+
+    async def _put(self, job: EmailJob) -> None:
+        """Put a job on the queue, spooling it if the queue is full."""
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            if not self.spool_path:
+                logger.error("Email queue is full")
+                raise SMSException("Email service is busy. Please try again in a moment.")
+            # Picked up again on the next startup
+            await run_io(self._write_spool, [job])
+
+    async def _worker(self, index: int) -> None:
+        """Send queued emails until cancelled."""
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._deliver(job)
+            except Exception as e:
+                logger.error(f"Email worker {index} error: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _deliver(self, job: EmailJob) -> None:
+        """Send one email, retrying with backoff while the provider is throttling."""
+        email_service = get_email_service()
+
+        while True:
+            if job.is_stale():
+                logger.warning(f"Dropping email to {job.email}: OTP expired before it could be sent")
+                self.failed += 1
+                return
+
+            job.attempts += 1
+            try:
+                if self._batcher is not None:
+                    template, values = otp_email_values(job.otp, job.name, job.is_signup)
+                    await self._batcher.send(EmailMessage(job.email, template, values))
+                else:
+                    await email_service.send_otp_async(job.email, job.otp, job.name, job.is_signup)
+                self.sent += 1
+                logger.info(f"OTP email sent to {job.email}")
+                return
+            except EmailThrottledError as e:
+                if job.attempts > settings.EMAIL_SEND_MAX_RETRIES:
+                    await self._on_failure(job, e)
+                    return
+                delay = min(
+                    settings.EMAIL_RETRY_BACKOFF_MAX_SECONDS,
+                    settings.EMAIL_RETRY_BACKOFF_SECONDS * (2 ** (job.attempts - 1))
+                )
+                # Jitter so throttled workers don't retry in lockstep
+                delay *= random.uniform(0.5, 1.0)
+                self.retried += 1
+                logger.warning(f"Email to {job.email} throttled, retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+            except Exception as e:
+                await self._on_failure(job, e)
+                return
+
+    async def _on_failure(self, job: EmailJob, error: Exception) -> None:
+        """Delete the OTP of an email that could not be sent."""
+        self.failed += 1
+        logger.error(f"Failed to send OTP email to {job.email} after {job.attempts} attempts: {error}")
+        # OTP store calls are network round trips with the Redis store
+        await run_io(self._delete_undelivered_otp, job)
+
+    @staticmethod
+    def _delete_undelivered_otp(job: EmailJob) -> None:
+        otp_service = get_otp_service()
+        try:
+            record = otp_service.get_otp_record("", job.email)
+        except OTPException:
+            return
+        # Don't delete a newer OTP requested while this one was queued
+        if record.otp == job.otp:
+            otp_service.delete_otp("", job.email)
+
+    def _write_spool(self, jobs: List[EmailJob]) -> None:
+        """Append jobs to the spool file."""
+        with self._spool_lock:
+            with open(self.spool_path, "a", encoding="utf-8") as spool:
+                for job in jobs:
+                    spool.write(json.dumps(job.to_dict()) + "\n")
+            self.spooled += len(jobs)
+        logger.info(f"Spooled {len(jobs)} emails to {self.spool_path}")
+
+    def _read_spool(self) -> List[EmailJob]:
+        """Read and clear the spool file, skipping emails whose OTP has expired."""
+        if not self.spool_path or not os.path.exists(self.spool_path):
+            return []
+
+        jobs = []
+        with self._spool_lock:
+            with open(self.spool_path, "r", encoding="utf-8") as spool:
+                for line in spool:
+                    try:
+                        job = EmailJob.from_dict(json.loads(line))
+                    except (ValueError, TypeError) as e:
+                        logger.warning(f"Skipping invalid spooled email: {e}")
+                        continue
+                    if not job.is_stale():
+                        jobs.append(job)
+            os.remove(self.spool_path)
+
+        if jobs:
+            logger.info(f"Replaying {len(jobs)} spooled emails")
+        return jobs
+
+    def stats(self) -> Dict[str, Any]:
+        """Get queue depth and delivery counters."""
+        return {
+            "running": self.is_running,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue_size": self.max_queue_size,
+            "workers": len(self._workers),
+            "sent": self.sent,
+            "failed": self.failed,
+            "retried": self.retried,
+            "spooled": self.spooled,
+            "batching": self._batcher.stats() if self._batcher is not None else None
+        }
+
+
+# Singleton instance
+_email_dispatcher: Optional[EmailDispatcher] = None
+
+
+def get_email_dispatcher() -> EmailDispatcher:
+    """Get email dispatcher singleton instance."""
+    global _email_dispatcher
+    if _email_dispatcher is None:
+        _email_dispatcher = EmailDispatcher()
+    return _email_dispatcher
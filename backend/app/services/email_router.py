@@ -0,0 +1,372 @@
+"""
+Email provider failover.
+Routes sends across several providers ranked by their recent latency and
+error rate, skips providers whose circuit breaker is open, and can hedge a
+slow send by also sending through the next provider. Providers that lost
+their traffic are probed now and then, so a recovered provider wins it back.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from app.config import get_settings
+from app.core.executors import run_io
+from app.core.exceptions import EmailThrottledError, SMSException
+from app.services.email_service import EmailMessage, EmailSendResult, EmailService
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class ProviderHealth:
+    """
+    Health score and circuit breaker of one provider.
+
+    Latency and error rate are exponentially weighted moving averages, so
+    recent sends count the most. The error rate also halves every
+    reset_seconds without a send, so old failures stop counting against a
+    provider that no longer gets traffic. The circuit opens after
+    failure_threshold consecutive failures; after reset_seconds one trial
+    send is let through per reset_seconds (half-open) until one succeeds,
+    closing the circuit, or fails, reopening it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        alpha: Optional[float] = None,
+        failure_threshold: Optional[int] = None,
+        reset_seconds: Optional[float] = None
+    ):
+        self.alpha = alpha if alpha is not None else settings.EMAIL_HEALTH_EWMA_ALPHA
+        self.failure_threshold = (
+            failure_threshold if failure_threshold is not None else settings.EMAIL_CIRCUIT_FAILURE_THRESHOLD
+        )
+        self.reset_seconds = reset_seconds if reset_seconds is not None else settings.EMAIL_CIRCUIT_RESET_SECONDS
+
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        # Time of the last recorded send and of the last probe claimed
+        self.updated_at = time.monotonic()
+        self.probed_at = 0.0
+        self.sends = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def _decayed_error_rate(self, now: float) -> float:
+        if self.reset_seconds <= 0:
+            return self.error_rate
+        return self.error_rate * 0.5 ** ((now - self.updated_at) / self.reset_seconds)
+
+    @property
+    def score(self) -> Optional[float]:
+        """Expected seconds per successful send (None until a send completes); lower is better."""
+        if self.latency is None:
+            return None
+        return self.latency / max(0.05, 1.0 - self._decayed_error_rate(time.monotonic()))
+
+    def claim_probe(self) -> bool:
+        """
+        Claim a probe send if the provider has had no send, probe or
+        circuit change for reset_seconds. At most one caller gets it.
+        """
+        with self._lock:
+            now = time.monotonic()
+            idle_since = max(self.updated_at, self.probed_at)
+            if self.state != self.CLOSED:
+                idle_since = max(idle_since, self.opened_at)
+            if now - idle_since < self.reset_seconds:
+                return False
+            self.probed_at = now
+            return True
+
+    def allow(self) -> bool:
+        """Check whether a send may go to this provider, claiming the trial send when half-open."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            now = time.monotonic()
+            if now - self.opened_at >= self.reset_seconds:
+                # Another trial is allowed if the last one never reported back
+                self.state = self.HALF_OPEN
+                self.opened_at = now
+                return True
+            return False
+
+    def record(self, success: bool, latency: float) -> None:
+        """Record the outcome of a send."""
+        with self._lock:
+            now = time.monotonic()
+            self.sends += 1
+            self.latency = latency if self.latency is None else (
+                self.alpha * latency + (1 - self.alpha) * self.latency
+            )
+            self.error_rate = (
+                self.alpha * (0.0 if success else 1.0) + (1 - self.alpha) * self._decayed_error_rate(now)
+            )
+            self.updated_at = now
+
+            if success:
+                self.consecutive_failures = 0
+                self.state = self.CLOSED
+                return
+
+            self.failures += 1
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(f"Email provider circuit opened after {self.consecutive_failures} failures")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get health counters."""
+        return {
+            "state": self.state,
+            "latency_ms": round(self.latency * 1000, 1) if self.latency is not None else None,
+            "error_rate": round(self._decayed_error_rate(time.monotonic()), 3),
+            "sends": self.sends,
+            "failures": self.failures
+        }
+
+
+class EmailRouter:
+    """
+    Sends email through the healthiest of several providers.
+
+    Has the same send interface as EmailService. Providers are tried best
+    score first (configuration order breaks ties and ranks providers that
+    haven't sent yet), and a failed send fails over to the next one. A
+    provider's circuit breaker is only consulted when the send reaches it,
+    and a provider whose circuit is open is skipped. If every circuit is
+    open, all providers are tried anyway rather than failing the send
+    outright.
+
+    A provider that hasn't been sent to for reset_seconds gets the next
+    send first (a probe), so a provider that recovered, or whose circuit
+    is due a half-open trial, is measured again instead of keeping the
+    score it had when it lost its traffic. A failed probe fails over to
+    the best provider as usual.
+
+    With hedge_after_seconds set, a single send still running after that
+    long is also sent through the next provider and the first success
+    wins. The recipient may then get the email twice, which is harmless
+    for an OTP since both carry the same code. Batches are not hedged.
+    """
+
+    def __init__(self, services: Dict[str, EmailService], hedge_after_seconds: Optional[float] = None):
+        if not services:
+            raise ValueError("EmailRouter needs at least one provider")
+        self.services = services
+        self.order = list(services)
+        self.health = {name: ProviderHealth() for name in services}
+        self.hedge_after_seconds = (
+            hedge_after_seconds if hedge_after_seconds is not None else settings.EMAIL_HEDGE_AFTER_MS / 1000
+        )
+        self.hedged = 0
+        self.probes = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    @property
+    def provider(self) -> str:
+        return ",".join(self.order)
+
+    @property
+    def batch_limit(self) -> int:
+        return max(service.batch_limit for service in self.services.values())
+
+    def _ranked(self) -> List[str]:
+        """Providers in the order to try them: a due probe first, then best score first."""
+        def rank(name: str):
+            score = self.health[name].score
+            return (score is None, score or 0.0, self.order.index(name))
+
+        names = sorted(self.order, key=rank)
+        for name in names[1:]:
+            if self.health[name].claim_probe():
+                self.probes += 1
+                names.remove(name)
+                names.insert(0, name)
+                break
+        return names
+
+    def _candidates(self) -> Iterator[str]:
+        """
+        Yield providers to try in ranked order, skipping open circuits.
+
+        Lazy, so a circuit breaker's half-open trial is only claimed by a
+        send that actually goes to that provider.
+        """
+        names = self._ranked()
+        skipped = []
+        for name in names:
+            if self.health[name].allow():
+                yield name
+            else:
+                skipped.append(name)
+        if len(skipped) == len(names):
+            # Every circuit is open; trying them beats failing the send outright
+            yield from skipped
+
+    def _timed(self, name: str, call: Callable[[EmailService], Any]) -> Any:
+        """Run a send against one provider and record its health."""
+        start = time.monotonic()
+        try:
+            result = call(self.services[name])
+        except Exception:
+            self.health[name].record(False, time.monotonic() - start)
+            raise
+        self.health[name].record(True, time.monotonic() - start)
+        return result
+
+    def send_otp(self, email: str, otp: str, name: Optional[str] = None, is_signup: bool = False) -> bool:
+        """
+        Send OTP via email, failing over between providers.
+
+        Raises:
+            EmailThrottledError: If every provider failed and one was throttling
+            SMSException: If every provider failed
+        """
+        return self._send(lambda service: service.send_otp(email, otp, name, is_signup))
+
+    async def send_otp_async(self, email: str, otp: str, name: Optional[str] = None, is_signup: bool = False) -> bool:
+        """Send OTP via email from the event loop (failover and hedging run on the io pool)."""
+        return await run_io(self.send_otp, email, otp, name, is_signup)
+
+    async def send_batch_async(self, messages: List[EmailMessage]) -> List[EmailSendResult]:
+        """Async version of send_batch()."""
+        return await run_io(self.send_batch, messages)
+
+    def _send(self, call: Callable[[EmailService], Any]) -> Any:
+        candidates = self._candidates()
+        if self.hedge_after_seconds > 0 and len(self.order) > 1:
+            return self._send_hedged(candidates, call)
+
+        errors = []
+        for name in candidates:
+            try:
+                return self._timed(name, call)
+            except Exception as e:
+                logger.warning(f"Email provider {name} failed: {e}")
+                errors.append(e)
+        raise self._final_error(errors)
+
+    def _send_hedged(self, candidates: Iterator[str], call: Callable[[EmailService], Any]) -> Any:
+        """Start the next provider whenever the running sends exceed the hedge delay or fail."""
+        executor = self._get_executor()
+        pending: Dict[Future, str] = {}
+        errors = []
+        exhausted = False
+
+        name = next(candidates)
+        pending[executor.submit(self._timed, name, call)] = name
+        while pending:
+            done, _ = wait(
+                pending,
+                timeout=None if exhausted else self.hedge_after_seconds,
+                return_when=FIRST_COMPLETED
+            )
+            if not done:
+                name = next(candidates, None)
+                if name is None:
+                    exhausted = True
+                    continue
+                self.hedged += 1
+                logger.info(f"Hedging slow email send through {name}")
+                pending[executor.submit(self._timed, name, call)] = name
+                continue
+
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    return future.result()
+                except Exception as e:
+                    logger.warning(f"Email provider {name} failed: {e}")
+                    errors.append(e)
+            if not pending:
+                name = next(candidates, None)
+                if name is not None:
+                    pending[executor.submit(self._timed, name, call)] = name
+        raise self._final_error(errors)
+
+    def send_batch(self, messages: List[EmailMessage]) -> List[EmailSendResult]:
+        """
+        Send emails through the best provider, failing over the rest.
+
+        A batch counts as failed for the provider's health when every
+        message failed; only those messages and throttled ones are passed
+        on to the next provider.
+        """
+        results: List[Optional[EmailSendResult]] = [None] * len(messages)
+        todo = list(range(len(messages)))
+
+        for name in self._candidates():
+            start = time.monotonic()
+            batch_results = self.services[name].send_batch([messages[index] for index in todo])
+            all_failed = all(not result.ok for result in batch_results)
+            self.health[name].record(not all_failed, time.monotonic() - start)
+
+            retry = []
+            for index, result in zip(todo, batch_results):
+                results[index] = result
+                if not result.ok and (all_failed or isinstance(result.error, EmailThrottledError)):
+                    retry.append(index)
+            if not retry:
+                break
+            logger.warning(f"Email provider {name} failed {len(retry)} of {len(todo)} emails")
+            todo = retry
+        return results
+
+    def _final_error(self, errors: List[Exception]) -> Exception:
+        """The error to raise once every provider failed."""
+        if any(isinstance(e, EmailThrottledError) for e in errors):
+            return EmailThrottledError("All email providers are throttling. Please try again in a moment.")
+        return SMSException(f"Failed to send email: {errors[-1]}" if errors else "No email provider available")
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Pool for hedged sends, created on first use."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=settings.EMAIL_HEDGE_MAX_WORKERS,
+                    thread_name_prefix="email-hedge"
+                )
+            return self._executor
+
+    def close(self) -> None:
+        """Shut down the hedge pool without waiting for sends still in flight."""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Get per-provider health."""
+        return {
+            "providers": {name: self.health[name].stats() for name in self.order},
+            "hedged": self.hedged,
+            "probes": self.probes
+        }
+
+
+def create_email_router(providers: List[str]) -> EmailRouter:
+    """Create a router over the given providers, skipping duplicates and unusable ones."""
+    services: Dict[str, EmailService] = {}
+    for provider in providers:
+        service = EmailService(provider)
+        if service.provider != provider:
+            # Not installed or configured; EmailService fell back to console
+            logger.warning(f"Email provider {provider} unavailable, leaving it out of failover")
+            continue
+        services.setdefault(provider, service)
+    if not services:
+        services["console"] = EmailService("console")
+    return EmailRouter(services)
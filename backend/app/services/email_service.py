@@ -1,11 +1,22 @@
 """
 Email service for sending OTP messages.
-Supports multiple providers: console (dev), Resend, AWS SES, SendGrid.
+Supports multiple providers: console (dev), Resend, AWS SES, SendGrid,
+and stub (offline testing).
 """
+import itertools
 import logging
-from typing import Optional
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
 from app.config import get_settings
-from app.core.exceptions import SMSException
+from app.core.executors import run_io
+from app.core.exceptions import EmailThrottledError, SMSException
+from app.core.aws_clients import get_aws_client
+from app.core.http_client import HTTPX_AVAILABLE, get_http_client
+from app.services.email_templates import RenderedEmail, get_email_template, render_otp_email
 
 # Import boto3 exceptions for proper error handling
 try:
@@ -18,12 +29,52 @@ except ImportError:
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Per-recipient SES bulk statuses worth retrying later
+SES_RETRYABLE_STATUSES = {"AccountThrottled", "TransientFailure"}
+
+
+@dataclass
+class EmailMessage:
+    """
+    An email to send in a batch.
+
+    Attributes:
+        to: Recipient email address
+        template: Email template name (see email_templates)
+        values: Placeholder values for the template
+    """
+    to: str
+    template: str
+    values: Dict[str, str]
+
+    def render(self) -> RenderedEmail:
+        """Render the email locally."""
+        return get_email_template(self.template).render(**self.values)
+
+
+@dataclass
+class EmailSendResult:
+    """Outcome of sending one message of a batch."""
+    message_id: Optional[str] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
 
 class EmailService:
     """Service for sending email messages."""
     
-    def __init__(self):
-        self.provider = settings.EMAIL_PROVIDER
+    # Recipients per bulk API call, for providers that have one
+    BATCH_LIMITS = {
+        "resend": 100,
+        "aws_ses": 50,
+        "stub": 100
+    }
+    
+    def __init__(self, provider: Optional[str] = None):
+        self.provider = provider or settings.EMAIL_PROVIDER
         logger.info(f"Email provider: {self.provider}")
         self._initialize_provider()
     
@@ -54,13 +105,10 @@ class EmailService:
                     self.provider = "console"
                     return
                 
-                self.ses_client = boto3.client(
-                    'ses',
-                    aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-                    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-                    region_name=settings.AWS_REGION
-                )
+                # Reuse the process-wide pooled SES client
+                self.ses_client = get_aws_client('ses')
                 self.ses_from_email = settings.AWS_SES_FROM_EMAIL
+                self.ses_template_prefix = settings.AWS_SES_TEMPLATE_PREFIX
                 logger.info(f"AWS SES initialized with from email: {self.ses_from_email}, region: {settings.AWS_REGION}")
             except ImportError:
                 logger.warning("boto3 not installed. Falling back to console.")
@@ -75,6 +123,21 @@ class EmailService:
             except ImportError:
                 logger.warning("SendGrid not installed. Falling back to console.")
                 self.provider = "console"
+        elif self.provider == "stub":
+            self.stub_latency = settings.EMAIL_STUB_LATENCY_MS / 1000
+            # Fraction of API calls failing with EmailThrottledError (set by tests)
+            self.stub_failure_rate = 0.0
+            self.stub_outbox = deque(maxlen=1000)
+            self.stub_calls = 0
+            self._stub_ids = itertools.count(1)
+            self._stub_lock = threading.Lock()
+    
+    @property
+    def batch_limit(self) -> int:
+        """Recipients per bulk API call (1 if the provider has no bulk call)."""
+        if self.provider == "aws_ses" and not self.ses_template_prefix:
+            return 1
+        return self.BATCH_LIMITS.get(self.provider, 1)
     
     def send_otp(self, email: str, otp: str, name: Optional[str] = None, is_signup: bool = False) -> bool:
         """
@@ -92,64 +155,163 @@ class EmailService:
         Raises:
             SMSException: If email sending fails
         """
-        subject = "Your Testino Verification Code"
-        message = self._generate_otp_email_body(otp, name, is_signup)
+        rendered = render_otp_email(otp, name, is_signup)
+        subject, message, text = rendered.subject, rendered.html, rendered.text
         
         try:
-            if self.provider == "resend":
-                return self._send_via_resend(email, subject, message)
-            elif self.provider == "aws_ses":
-                return self._send_via_aws_ses(email, subject, message)
-            elif self.provider == "sendgrid":
-                return self._send_via_sendgrid(email, subject, message)
-            else:
-                # Console provider (for development)
-                return self._send_via_console(email, subject, message)
+            return self._send(email, subject, message, text)
+        except EmailThrottledError:
+            # Let callers distinguish throttling so they can retry later
+            raise
         except Exception as e:
             logger.error(f"Error sending email: {e}")
             raise SMSException(f"Failed to send email: {str(e)}")
     
-    def _generate_otp_email_body(self, otp: str, name: Optional[str] = None, is_signup: bool = False) -> str:
-        """Generate HTML email body for OTP."""
-        if name:
-            greeting = f"Hi {name},"
-            intro_text = "Your verification code for Testino is:" if is_signup else "Your sign-in verification code for Testino is:"
+    async def send_otp_async(self, email: str, otp: str, name: Optional[str] = None, is_signup: bool = False) -> bool:
+        """
+        Send OTP via email without blocking the event loop.
+        
+        Resend is called through the shared async HTTP client; the other
+        providers' SDKs block, so send_otp runs on the io pool for them.
+        
+        Raises:
+            EmailThrottledError: If the provider is throttling
+            SMSException: If email sending fails
+        """
+        if not self._resend_async:
+            return await run_io(self.send_otp, email, otp, name, is_signup)
+        
+        rendered = render_otp_email(otp, name, is_signup)
+        result = await self._post_to_resend("/emails", self._resend_params(email, rendered))
+        logger.info(f"Email sent via Resend to {email}, ID: {result.get('id')}")
+        return True
+    
+    async def send_batch_async(self, messages: List[EmailMessage]) -> List[EmailSendResult]:
+        """Async version of send_batch(), using the shared HTTP client for Resend."""
+        if not self._resend_async:
+            return await run_io(self.send_batch, messages)
+        
+        results = []
+        limit = self.batch_limit
+        for start in range(0, len(messages), limit):
+            chunk = messages[start:start + limit]
+            try:
+                result = await self._post_to_resend(
+                    "/emails/batch",
+                    [self._resend_params(message.to, message.render()) for message in chunk]
+                )
+                results.extend(EmailSendResult(message_id=item.get("id")) for item in result["data"])
+            except (EmailThrottledError, SMSException) as e:
+                results.extend(EmailSendResult(error=e) for _ in chunk)
+        logger.info(f"{sum(result.ok for result in results)} of {len(messages)} batched emails sent via Resend")
+        return results
+    
+    @property
+    def _resend_async(self) -> bool:
+        return self.provider == "resend" and HTTPX_AVAILABLE
+    
+    def _resend_params(self, email: str, rendered: RenderedEmail) -> Dict[str, Any]:
+        """Resend API payload for one email."""
+        return {
+            "from": self.resend_from_email,
+            "to": [email],
+            "subject": rendered.subject,
+            "html": rendered.html,
+            "text": rendered.text
+        }
+    
+    async def _post_to_resend(self, path: str, payload: Any) -> Any:
+        """
+        Call the Resend REST API.
+        
+        Raises:
+            EmailThrottledError: On 429 responses
+            SMSException: On other errors
+        """
+        try:
+            response = await get_http_client().post(
+                f"{settings.RESEND_BASE_URL}{path}",
+                json=payload,
+                headers={"Authorization": f"Bearer {settings.RESEND_API_KEY}"}
+            )
+        except Exception as e:
+            logger.error(f"Resend error: {e}")
+            raise SMSException(f"Resend email failed: {str(e)}")
+        
+        if response.status_code == 429:
+            raise EmailThrottledError("Resend rate limit exceeded. Please wait a moment and try again.")
+        if response.status_code >= 400:
+            logger.error(f"Resend error ({response.status_code}): {response.text}")
+            raise SMSException(f"Resend email failed ({response.status_code}): {response.text}")
+        return response.json()
+    
+    def _send(self, email: str, subject: str, message: str, text: Optional[str] = None) -> bool:
+        """Send one rendered email through the configured provider."""
+        if self.provider == "resend":
+            return self._send_via_resend(email, subject, message, text)
+        elif self.provider == "aws_ses":
+            return self._send_via_aws_ses(email, subject, message, text)
+        elif self.provider == "sendgrid":
+            return self._send_via_sendgrid(email, subject, message, text)
+        elif self.provider == "stub":
+            return self._send_via_stub(email, subject, message, text)
         else:
-            greeting = "Hello,"
-            intro_text = "Your sign-in verification code for Testino is:"
+            # Console provider (for development)
+            return self._send_via_console(email, subject, message, text)
+    
+    def send_batch(self, messages: List[EmailMessage]) -> List[EmailSendResult]:
+        """
+        Send emails with as few provider API calls as possible.
         
-        html_body = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        </head>
-        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333; max-width: 600px; margin: 0 auto; padding: 20px; background-color: #f5f5f5;">
-            <div style="background-color: #ffffff; border-radius: 12px; overflow: hidden; box-shadow: 0 2px 8px rgba(0,0,0,0.1);">
-                <div style="background-color: #086A6F; padding: 24px; text-align: center;">
-                    <h1 style="color: #ffffff; margin: 0; font-size: 28px; font-weight: 600;">Testino</h1>
-                </div>
-                <div style="padding: 40px 30px; background-color: #ffffff;">
-                    <h2 style="color: #086A6F; margin-top: 0; margin-bottom: 20px; font-size: 20px; font-weight: 600;">{greeting}</h2>
-                    <p style="color: #333; font-size: 16px; margin-bottom: 24px;">{intro_text}</p>
-                    <div style="background-color: #f8f9fa; border: 2px solid #086A6F; border-radius: 12px; padding: 24px; text-align: center; margin: 24px 0;">
-                        <div style="color: #086A6F; font-size: 36px; letter-spacing: 12px; margin: 0; font-family: 'Courier New', monospace; font-weight: 700;">{otp}</div>
-                    </div>
-                    <p style="color: #666; font-size: 14px; margin-bottom: 8px;">This code will expire in 5 minutes.</p>
-                    <p style="color: #999; font-size: 13px; margin-top: 32px; margin-bottom: 0;">If you didn't request this code, please ignore this email.</p>
-                </div>
-                <div style="background-color: #f8f9fa; padding: 20px; text-align: center; border-top: 1px solid #e5e5e5;">
-                    <p style="color: #666; font-size: 14px; margin: 0;">Best regards,<br><strong style="color: #086A6F;">The Testino Team</strong></p>
-                </div>
-            </div>
-        </body>
-        </html>
+        Messages are split into chunks of batch_limit and each chunk is sent
+        in one bulk call. Providers without a bulk call send them one by one.
+        
+        Args:
+            messages: Emails to send
+        
+        Returns:
+            One result per message, in the same order. Failed messages carry
+            an EmailThrottledError (retry later) or SMSException.
         """
+        send_chunk: Optional[Callable[[List[EmailMessage]], List[EmailSendResult]]] = None
+        if self.batch_limit > 1:
+            if self.provider == "resend":
+                send_chunk = self._send_batch_via_resend
+            elif self.provider == "aws_ses":
+                send_chunk = self._send_batch_via_aws_ses
+            elif self.provider == "stub":
+                send_chunk = self._send_batch_via_stub
+        
+        if send_chunk is None:
+            return [self._send_one(message) for message in messages]
         
-        return html_body
+        results = []
+        limit = self.batch_limit
+        for start in range(0, len(messages), limit):
+            chunk = messages[start:start + limit]
+            try:
+                results.extend(send_chunk(chunk))
+            except (EmailThrottledError, SMSException) as e:
+                results.extend(EmailSendResult(error=e) for _ in chunk)
+            except Exception as e:
+                logger.error(f"Error sending email batch: {e}")
+                error = SMSException(f"Failed to send email: {str(e)}")
+                results.extend(EmailSendResult(error=error) for _ in chunk)
+        return results
     
-    def _send_via_resend(self, email: str, subject: str, message: str) -> bool:
+    def _send_one(self, message: EmailMessage) -> EmailSendResult:
+        """Send one message of a batch, capturing its error."""
+        try:
+            rendered = message.render()
+            self._send(message.to, rendered.subject, rendered.html, rendered.text)
+            return EmailSendResult()
+        except (EmailThrottledError, SMSException) as e:
+            return EmailSendResult(error=e)
+        except Exception as e:
+            logger.error(f"Error sending email: {e}")
+            return EmailSendResult(error=SMSException(f"Failed to send email: {str(e)}"))
+    
+    def _send_via_resend(self, email: str, subject: str, message: str, text: Optional[str] = None) -> bool:
         """Send email via Resend (recommended - free tier available)."""
         try:
             params = {
@@ -158,6 +320,8 @@ class EmailService:
                 "subject": subject,
                 "html": message,
             }
+            if text:
+                params["text"] = text
             
             result = self.resend_client.emails.send(params)
             logger.info(f"Email sent via Resend to {email}, ID: {result.id}")
@@ -166,7 +330,91 @@ class EmailService:
             logger.error(f"Resend error: {e}")
             raise SMSException(f"Resend email failed: {str(e)}")
     
-    def _send_via_aws_ses(self, email: str, subject: str, message: str) -> bool:
+    def _send_batch_via_resend(self, messages: List[EmailMessage]) -> List[EmailSendResult]:
+        """
+        Send up to 100 emails in one Resend batch call.
+        Resend validates the batch as a whole, so an error fails every message.
+        """
+        import resend
+        resend.api_key = settings.RESEND_API_KEY
+        
+        params = [self._resend_params(message.to, message.render()) for message in messages]
+        
+        try:
+            result = resend.Batch.send(params)
+        except Exception as e:
+            logger.error(f"Resend batch error: {e}")
+            if getattr(e, "code", None) == 429 or "rate limit" in str(e).lower():
+                raise EmailThrottledError("Resend rate limit exceeded. Please wait a moment and try again.")
+            raise SMSException(f"Resend email failed: {str(e)}")
+        
+        logger.info(f"Batch of {len(messages)} emails sent via Resend")
+        return [EmailSendResult(message_id=item.get("id")) for item in result["data"]]
+    
+    def _send_batch_via_aws_ses(self, messages: List[EmailMessage]) -> List[EmailSendResult]:
+        """
+        Send up to 50 emails with SES SendBulkTemplatedEmail.
+        
+        Bulk sends need the templates stored in SES (scripts/sync_ses_templates.py).
+        One call is made per template in the chunk; SES reports a status per
+        destination.
+        """
+        results: List[Optional[EmailSendResult]] = [None] * len(messages)
+        by_template: Dict[str, List[int]] = {}
+        for index, message in enumerate(messages):
+            by_template.setdefault(message.template, []).append(index)
+        
+        for template_name, indexes in by_template.items():
+            template = get_email_template(template_name)
+            destinations = [
+                {
+                    "Destination": {"ToAddresses": [messages[index].to]},
+                    "ReplacementTemplateData": template.ses_template_data(messages[index].values)
+                }
+                for index in indexes
+            ]
+            try:
+                response = self.ses_client.send_bulk_templated_email(
+                    Source=self.ses_from_email,
+                    Template=f"{self.ses_template_prefix}{template_name}",
+                    DefaultTemplateData="{}",
+                    Destinations=destinations
+                )
+            except ClientError as e:
+                error_code = e.response.get('Error', {}).get('Code', 'Unknown')
+                error_message = e.response.get('Error', {}).get('Message', str(e))
+                logger.error(f"AWS SES bulk ClientError - Code: {error_code}, Message: {error_message}")
+                if error_code == "Throttling":
+                    error = EmailThrottledError("AWS SES rate limit exceeded. Please wait a moment and try again.")
+                else:
+                    error = SMSException(f"AWS SES error ({error_code}): {error_message}")
+                for index in indexes:
+                    results[index] = EmailSendResult(error=error)
+                continue
+            except BotoCoreError as e:
+                logger.error(f"AWS SES BotoCoreError: {e}")
+                error = SMSException(f"AWS SES connection error: {str(e)}")
+                for index in indexes:
+                    results[index] = EmailSendResult(error=error)
+                continue
+            
+            for index, status in zip(indexes, response["Status"]):
+                code = status.get("Status", "Success")
+                if code == "Success":
+                    results[index] = EmailSendResult(message_id=status.get("MessageId"))
+                elif code in SES_RETRYABLE_STATUSES:
+                    results[index] = EmailSendResult(error=EmailThrottledError(
+                        f"AWS SES could not send right now ({code}). Please try again."
+                    ))
+                else:
+                    results[index] = EmailSendResult(error=SMSException(
+                        f"AWS SES error ({code}): {status.get('Error', '')}"
+                    ))
+        
+        logger.info(f"Batch of {len(messages)} emails sent via AWS SES")
+        return results
+    
+    def _send_via_aws_ses(self, email: str, subject: str, message: str, text: Optional[str] = None) -> bool:
         """Send email via AWS SES (very cheap at scale)."""
         try:
             # Check if SES client is initialized
@@ -180,14 +428,16 @@ class EmailService:
                     "AWS_SES_FROM_EMAIL not configured. Please set it in your .env file."
                 )
             
+            body = {'Html': {'Data': message, 'Charset': 'UTF-8'}}
+            if text:
+                body['Text'] = {'Data': text, 'Charset': 'UTF-8'}
+            
             response = self.ses_client.send_email(
                 Source=self.ses_from_email,
                 Destination={'ToAddresses': [email]},
                 Message={
                     'Subject': {'Data': subject, 'Charset': 'UTF-8'},
-                    'Body': {
-                        'Html': {'Data': message, 'Charset': 'UTF-8'}
-                    }
+                    'Body': body
                 }
             )
             logger.info(f"Email sent via AWS SES to {email}, MessageId: {response['MessageId']}")
@@ -214,7 +464,7 @@ class EmailService:
                 else:
                     raise SMSException(f"AWS SES message rejected: {error_message}")
             elif error_code == "Throttling":
-                raise SMSException(
+                raise EmailThrottledError(
                     f"AWS SES rate limit exceeded. Please wait a moment and try again."
                 )
             elif error_code == "InvalidParameterValue":
@@ -264,7 +514,7 @@ class EmailService:
                     f"Please verify '{email}' in AWS SES console or request production access."
                 )
             elif "Throttling" in error_str or "Rate exceeded" in error_str:
-                raise SMSException(
+                raise EmailThrottledError(
                     f"AWS SES rate limit exceeded. Please wait a moment and try again."
                 )
             elif "InvalidAccessKeyId" in error_str or "SignatureDoesNotMatch" in error_str:
@@ -275,7 +525,7 @@ class EmailService:
             else:
                 raise SMSException(f"AWS SES email failed: {error_str}")
     
-    def _send_via_sendgrid(self, email: str, subject: str, message: str) -> bool:
+    def _send_via_sendgrid(self, email: str, subject: str, message: str, text: Optional[str] = None) -> bool:
         """Send email via SendGrid."""
         try:
             from sendgrid.helpers.mail import Mail
@@ -284,7 +534,8 @@ class EmailService:
                 from_email=self.sendgrid_from_email,
                 to_emails=email,
                 subject=subject,
-                html_content=message
+                html_content=message,
+                plain_text_content=text
             )
             
             response = self.sendgrid_client.send(mail)
@@ -294,7 +545,43 @@ class EmailService:
             logger.error(f"SendGrid error: {e}")
             raise SMSException(f"SendGrid email failed: {str(e)}")
     
-    def _send_via_console(self, email: str, subject: str, message: str) -> bool:
+    def _send_via_stub(self, email: str, subject: str, message: str, text: Optional[str] = None) -> bool:
+        """Pretend to send an email (for offline testing)."""
+        self._stub_call()
+        result = self._stub_deliver(email, subject, text)
+        if result.error:
+            raise result.error
+        return True
+    
+    def _send_batch_via_stub(self, messages: List[EmailMessage]) -> List[EmailSendResult]:
+        """Pretend to send emails in one bulk call (for offline testing)."""
+        self._stub_call()
+        results = []
+        for message in messages:
+            rendered = message.render()
+            results.append(self._stub_deliver(message.to, rendered.subject, rendered.text))
+        return results
+    
+    def _stub_call(self) -> None:
+        """Simulate the latency and throttling of one stub API call."""
+        time.sleep(self.stub_latency)
+        with self._stub_lock:
+            self.stub_calls += 1
+        if self.stub_failure_rate and random.random() < self.stub_failure_rate:
+            raise EmailThrottledError("Stub provider throttled the request")
+    
+    def _stub_deliver(self, email: str, subject: str, text: Optional[str]) -> EmailSendResult:
+        """
+        Record one stub email in stub_outbox.
+        Recipients on the .invalid TLD are rejected, to exercise failures.
+        """
+        if email.rsplit(".", 1)[-1].lower() == "invalid":
+            return EmailSendResult(error=SMSException(f"Stub provider rejected {email}"))
+        message_id = f"stub-{next(self._stub_ids)}"
+        self.stub_outbox.append({"id": message_id, "to": email, "subject": subject, "text": text})
+        return EmailSendResult(message_id=message_id)
+    
+    def _send_via_console(self, email: str, subject: str, message: str, text: Optional[str] = None) -> bool:
         """Log email to console (for development)."""
         logger.info(f"[EMAIL] To: {email}")
         logger.info(f"[EMAIL] Subject: {subject}")
@@ -302,7 +589,10 @@ class EmailService:
         print(f"Email Notification (Development Mode)")
         print(f"To: {email}")
         print(f"Subject: {subject}")
-        print(f"Message: {message[:200]}...")
+        if text:
+            print(f"Message:\n{text}")
+        else:
+            print(f"Message: {message[:200]}...")
         print(f"{'='*50}\n")
         return True
 
@@ -312,9 +602,27 @@ _email_service: Optional[EmailService] = None
 
 
 def get_email_service() -> EmailService:
-    """Get email service singleton instance."""
+    """
+    Get email service singleton instance.
+    With EMAIL_FAILOVER_PROVIDERS set this is an EmailRouter, which has the
+    same send interface.
+    """
     global _email_service
     if _email_service is None:
-        _email_service = EmailService()
+        providers = [p.strip() for p in settings.EMAIL_FAILOVER_PROVIDERS.split(",") if p.strip()]
+        if len(providers) > 1:
+            from app.services.email_router import create_email_router
+            _email_service = create_email_router(providers)
+        else:
+            _email_service = EmailService(providers[0] if providers else None)
     return _email_service
 
+
+def close_email_service() -> None:
+    """Release the email service's threads. Call this from the application shutdown event."""
+    global _email_service
+    close = getattr(_email_service, "close", None)
+    if close is not None:
+        close()
+    _email_service = None
+
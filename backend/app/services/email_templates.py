@@ -0,0 +1,262 @@
+"""
+Email templates.
+Each template is compiled once into static segments around its
+{{placeholders}}, so rendering an email only escapes the per-message values
+and joins them with the precompiled segments. Every template has an HTML
+body and a plain-text alternative.
+"""
+import html
+import json
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+from app.config import get_settings
+
+settings = get_settings()
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{(\w+)\}\}")
+
+
+class CompiledTemplate:
+    """
+    Template source split into static segments and placeholder names.
+
+    Placeholders listed in constants are substituted at compile time;
+    the rest are filled in by render() after passing through escape.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        constants: Optional[Dict[str, str]] = None,
+        escape: Callable[[str], str] = str
+    ):
+        constants = constants or {}
+        self.escape = escape
+
+        segments = []
+        fields = []
+        current = []
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(source):
+            current.append(source[position:match.start()])
+            placeholder = match.group(1)
+            if placeholder in constants:
+                current.append(escape(constants[placeholder]))
+            else:
+                segments.append("".join(current))
+                fields.append(placeholder)
+                current = []
+            position = match.end()
+        current.append(source[position:])
+        segments.append("".join(current))
+
+        self.segments: Tuple[str, ...] = tuple(segments)
+        self.fields: Tuple[str, ...] = tuple(fields)
+
+        # Segments interleaved with empty slots, plus (slot index, field) pairs,
+        # so render() only copies the list and fills the slots
+        self._parts: List[str] = [segments[0]]
+        slots = []
+        for field, segment in zip(fields, segments[1:]):
+            slots.append((len(self._parts), field))
+            self._parts.append("")
+            self._parts.append(segment)
+        self._slots: Tuple[Tuple[int, str], ...] = tuple(slots)
+
+    def render(self, values: Dict[str, str]) -> str:
+        """
+        Render the template.
+
+        Raises:
+            KeyError: If a placeholder has no value
+        """
+        escape = self.escape
+        parts = self._parts.copy()
+        for index, field in self._slots:
+            parts[index] = escape(values[field])
+        return "".join(parts)
+
+    def source(self, placeholder: Callable[[str], str]) -> str:
+        """Rebuild the source with constants applied, writing each remaining placeholder with placeholder(name)."""
+        parts = self._parts.copy()
+        for index, field in self._slots:
+            parts[index] = placeholder(field)
+        return "".join(parts)
+
+
+def _escape_html(value: str) -> str:
+    return html.escape(value, quote=True)
+
+
+def _compact_html(source: str) -> str:
+    """Drop source indentation, which only adds bytes to every email."""
+    return "\n".join(line.strip() for line in source.strip().splitlines())
+
+
+def format_duration(seconds: int) -> str:
+    """Format a duration for email copy (e.g., 300 -> "5 minutes")."""
+    if seconds % 60 == 0 and seconds >= 60:
+        minutes = seconds // 60
+        return f"{minutes} minute" if minutes == 1 else f"{minutes} minutes"
+    return f"{seconds} second" if seconds == 1 else f"{seconds} seconds"
+
+
+@dataclass
+class RenderedEmail:
+    """A rendered email ready to hand to a provider."""
+    subject: str
+    html: str
+    text: str
+
+
+class EmailTemplate:
+    """An email with a fixed subject, an HTML body and a plain-text body."""
+
+    def __init__(self, subject: str, html_source: str, text_source: str, constants: Dict[str, str]):
+        self.subject = subject
+        self.html = CompiledTemplate(_compact_html(html_source), constants, _escape_html)
+        self.text = CompiledTemplate(text_source.strip() + "\n", constants)
+
+    def render(self, **values: str) -> RenderedEmail:
+        """Render the email with the given placeholder values."""
+        return RenderedEmail(
+            subject=self.subject,
+            html=self.html.render(values),
+            text=self.text.render(values)
+        )
+
+    def ses_template(self, template_name: str) -> Dict[str, str]:
+        """
+        Build the SES stored template for this email (used for bulk sends).
+
+        Placeholders use triple braces so SES inserts values unchanged; the
+        HTML part reads the pre-escaped <field>_html values from
+        ses_template_data() instead.
+        """
+        return {
+            "TemplateName": template_name,
+            "SubjectPart": self.subject,
+            "HtmlPart": self.html.source(lambda field: "{{{%s_html}}}" % field),
+            "TextPart": self.text.source(lambda field: "{{{%s}}}" % field)
+        }
+
+    def ses_template_data(self, values: Dict[str, str]) -> str:
+        """Build the SES template data (JSON) for one recipient."""
+        data = {field: values[field] for field in self.text.fields}
+        for field in self.html.fields:
+            data[f"{field}_html"] = self.html.escape(values[field])
+        return json.dumps(data)
+
+
+OTP_SUBJECT = "Your Testino Verification Code"
+
+OTP_HTML = """
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+</head>
+<body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333; max-width: 600px; margin: 0 auto; padding: 20px; background-color: #f5f5f5;">
+    <div style="background-color: #ffffff; border-radius: 12px; overflow: hidden; box-shadow: 0 2px 8px rgba(0,0,0,0.1);">
+        <div style="background-color: #086A6F; padding: 24px; text-align: center;">
+            <h1 style="color: #ffffff; margin: 0; font-size: 28px; font-weight: 600;">Testino</h1>
+        </div>
+        <div style="padding: 40px 30px; background-color: #ffffff;">
+            <h2 style="color: #086A6F; margin-top: 0; margin-bottom: 20px; font-size: 20px; font-weight: 600;">{{greeting}}</h2>
+            <p style="color: #333; font-size: 16px; margin-bottom: 24px;">{{intro_text}}</p>
+            <div style="background-color: #f8f9fa; border: 2px solid #086A6F; border-radius: 12px; padding: 24px; text-align: center; margin: 24px 0;">
+                <div style="color: #086A6F; font-size: 36px; letter-spacing: 12px; margin: 0; font-family: 'Courier New', monospace; font-weight: 700;">{{otp}}</div>
+            </div>
+            <p style="color: #666; font-size: 14px; margin-bottom: 8px;">This code will expire in {{expiry}}.</p>
+            <p style="color: #999; font-size: 13px; margin-top: 32px; margin-bottom: 0;">If you didn't request this code, please ignore this email.</p>
+        </div>
+        <div style="background-color: #f8f9fa; padding: 20px; text-align: center; border-top: 1px solid #e5e5e5;">
+            <p style="color: #666; font-size: 14px; margin: 0;">Best regards,<br><strong style="color: #086A6F;">The Testino Team</strong></p>
+        </div>
+    </div>
+</body>
+</html>
+"""
+
+OTP_TEXT = """
+{{greeting}}
+
+{{intro_text}}
+
+{{otp}}
+
+This code will expire in {{expiry}}.
+
+If you didn't request this code, please ignore this email.
+
+Best regards,
+The Testino Team
+"""
+
+
+def compile_templates() -> Dict[str, EmailTemplate]:
+    """Compile all email templates with the current settings."""
+    expiry = format_duration(settings.OTP_EXPIRY_SECONDS)
+    return {
+        "otp_signup": EmailTemplate(OTP_SUBJECT, OTP_HTML, OTP_TEXT, {
+            "intro_text": "Your verification code for Testino is:",
+            "expiry": expiry
+        }),
+        "otp_signin": EmailTemplate(OTP_SUBJECT, OTP_HTML, OTP_TEXT, {
+            "intro_text": "Your sign-in verification code for Testino is:",
+            "expiry": expiry
+        })
+    }
+
+
+# Compiled templates
+_templates: Optional[Dict[str, EmailTemplate]] = None
+
+
+def load_email_templates() -> Dict[str, EmailTemplate]:
+    """
+    Compile all email templates once per process.
+    Call this from the application startup event; otherwise templates are
+    compiled on first use.
+    """
+    global _templates
+    if _templates is None:
+        _templates = compile_templates()
+    return _templates
+
+
+def get_email_template(name: str) -> EmailTemplate:
+    """Get a compiled email template by name."""
+    return load_email_templates()[name]
+
+
+def otp_email_values(otp: str, name: Optional[str] = None, is_signup: bool = False) -> Tuple[str, Dict[str, str]]:
+    """
+    Pick the OTP email template and its placeholder values.
+
+    Args:
+        otp: The OTP to send
+        name: Optional recipient name (HTML-escaped in the HTML body)
+        is_signup: Whether this is for signup (True) or signin (False)
+
+    Returns:
+        Tuple of (template name, placeholder values)
+    """
+    if name:
+        return ("otp_signup" if is_signup else "otp_signin"), {"greeting": f"Hi {name},", "otp": otp}
+    return "otp_signin", {"greeting": "Hello,", "otp": otp}
+
+
+def render_otp_email(otp: str, name: Optional[str] = None, is_signup: bool = False) -> RenderedEmail:
+    """
+    Render the OTP email.
+
+    Args:
+        otp: The OTP to send
+        name: Optional recipient name (HTML-escaped in the HTML body)
+        is_signup: Whether this is for signup (True) or signin (False)
+    """
+    template_name, values = otp_email_values(otp, name, is_signup)
+    return get_email_template(template_name).render(**values)
@@ -1,10 +1,13 @@
 """
 OTP service for managing OTP generation, storage, and verification.
-In production, this should use Redis or a database.
+OTPs are kept in the store selected by OTP_STORAGE_BACKEND (Redis in
+production, in-memory for development).
 """
+import asyncio
 import logging
-from typing import Dict, Optional
+from typing import Optional
 from app.models.otp import OTPRecord
+from app.core.executors import run_io
 from app.core.security import generate_otp
 from app.core.exceptions import (
     OTPNotFoundError,
@@ -12,6 +15,7 @@ from app.core.exceptions import (
     OTPInvalidError,
     OTPMaxAttemptsExceededError
 )
+from app.services.otp_store import OTPStore, OTPVerifyStatus, create_otp_store
 from app.config import get_settings
 
 logger = logging.getLogger(__name__)
@@ -22,13 +26,13 @@ class OTPService:
     """
     Service for managing OTP operations.
     
-    Note: Uses in-memory storage for development.
-    In production, replace with Redis or database.
+    Storage is delegated to an OTPStore, so verification works across
+    uvicorn workers when the Redis store is used.
     """
     
-    def __init__(self):
-        # In-memory storage (replace with Redis in production)
-        self._storage: Dict[str, OTPRecord] = {}
+    def __init__(self, store: Optional[OTPStore] = None):
+        self._store = store if store is not None else create_otp_store()
+        self._sweeper_task: Optional[asyncio.Task] = None
     
     def generate_and_store_otp(self, country_code: str, identifier: str) -> str:
         """
@@ -50,8 +54,8 @@ class OTPService:
         otp = generate_otp()
         
         # Store OTP record
-        otp_record = OTPRecord(otp=otp, phone_number=key)
-        self._storage[key] = otp_record
+        otp_record = OTPRecord(otp=otp)
+        self._store.save(key, otp_record)
         
         logger.info(f"OTP generated for {key} (expires in {settings.OTP_EXPIRY_SECONDS}s)")
         
@@ -78,14 +82,13 @@ class OTPService:
         else:
             key = identifier  # Email address
         
-        if key not in self._storage:
+        otp_record = self._store.get(key)
+        if otp_record is None:
             raise OTPNotFoundError()
         
-        otp_record = self._storage[key]
-        
         if otp_record.is_expired():
             # Clean up expired OTP
-            del self._storage[key]
+            self._store.delete(key)
             raise OTPExpiredError()
         
         return otp_record
@@ -119,21 +122,19 @@ class OTPService:
         else:
             key = identifier  # Email address
         
-        otp_record = self.get_otp_record(country_code, identifier)
+        # Check, count the attempt, and consume a valid OTP atomically so
+        # concurrent attempts can't exceed the limit
+        status, remaining = self._store.verify_and_increment(key, provided_otp)
         
-        # Check if max attempts exceeded
-        if otp_record.has_exceeded_max_attempts():
-            del self._storage[key]
+        if status == OTPVerifyStatus.NOT_FOUND:
+            raise OTPNotFoundError()
+        if status == OTPVerifyStatus.EXPIRED:
+            raise OTPExpiredError()
+        if status == OTPVerifyStatus.MAX_ATTEMPTS:
             raise OTPMaxAttemptsExceededError()
-        
-        # Verify OTP
-        if provided_otp != otp_record.otp:
-            otp_record.increment_attempts()
-            remaining = otp_record.get_remaining_attempts()
+        if status == OTPVerifyStatus.INVALID:
             raise OTPInvalidError(attempts_remaining=remaining)
         
-        # OTP is valid - clean up
-        del self._storage[key]
         logger.info(f"OTP verified successfully for {key}")
         
         return True
@@ -152,8 +153,7 @@ class OTPService:
         else:
             key = identifier  # Email address
         
-        if key in self._storage:
-            del self._storage[key]
+        if self._store.delete(key):
             logger.info(f"OTP deleted for {key}")
     
     def cleanup_expired_otps(self) -> int:
@@ -163,19 +163,42 @@ class OTPService:
         Returns:
             Number of expired OTPs removed
         """
-        expired_numbers = [
-            phone_number
-            for phone_number, record in self._storage.items()
-            if record.is_expired()
-        ]
+        removed = self._store.cleanup_expired()
         
-        for phone_number in expired_numbers:
-            del self._storage[phone_number]
+        if removed:
+            logger.info(f"Cleaned up {removed} expired OTPs")
         
-        if expired_numbers:
-            logger.info(f"Cleaned up {len(expired_numbers)} expired OTPs")
+        return removed
+    
+    def start_expiry_sweeper(self) -> None:
+        """
+        Start the background task removing expired OTPs.
+        Call this from the application startup event.
         
-        return len(expired_numbers)
+        Not started for stores that expire OTPs themselves (Redis).
+        """
+        interval = settings.OTP_CLEANUP_INTERVAL_SECONDS
+        if self._store.expires_natively or interval <= 0 or self._sweeper_task is not None:
+            return
+        self._sweeper_task = asyncio.create_task(self._sweep_expired_otps(interval))
+    
+    async def stop_expiry_sweeper(self) -> None:
+        """Stop the expiry sweeper. Call this from the application shutdown event."""
+        if self._sweeper_task is None:
+            return
+        self._sweeper_task.cancel()
+        await asyncio.gather(self._sweeper_task, return_exceptions=True)
+        self._sweeper_task = None
+    
+    async def _sweep_expired_otps(self, interval: int) -> None:
+        """Remove expired OTPs every interval seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                # A sweep after a spike can take a while; keep it off the event loop
+                await run_io(self.cleanup_expired_otps)
+            except Exception as e:
+                logger.error(f"Error cleaning up expired OTPs: {e}")
 
 
 # Singleton instance
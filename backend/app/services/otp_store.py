@@ -0,0 +1,252 @@
+"""
+OTP storage backends.
+The in-memory store keeps OTPs in the worker process and is meant for
+development. The Redis store shares OTPs between workers, expires them with
+native key TTLs, and verifies them atomically in a Lua script.
+"""
+import heapq
+import logging
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from enum import Enum
+from typing import Dict, List, Optional, Tuple
+from app.models.otp import OTPRecord
+from app.core.redis_client import REDIS_AVAILABLE, get_redis_client
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class OTPVerifyStatus(str, Enum):
+    """Outcome of an atomic OTP verification."""
+    VALID = "valid"
+    INVALID = "invalid"
+    NOT_FOUND = "not_found"
+    EXPIRED = "expired"
+    MAX_ATTEMPTS = "max_attempts"
+
+
+class OTPStore(ABC):
+    """
+    Interface for OTP storage backends.
+
+    Keys are the identifiers OTPs are sent to (email address, or country
+    code + mobile number).
+    """
+
+    # Whether the backend removes expired OTPs itself (no sweeper needed)
+    expires_natively = False
+
+    @abstractmethod
+    def save(self, key: str, record: OTPRecord) -> None:
+        """Store an OTP, replacing any pending OTP for the key."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[OTPRecord]:
+        """Get the pending OTP for a key, or None if there is none."""
+
+    @abstractmethod
+    def delete(self, key: str) -> bool:
+        """Delete the pending OTP for a key. Returns True if one existed."""
+
+    @abstractmethod
+    def verify_and_increment(self, key: str, provided_otp: str) -> Tuple[OTPVerifyStatus, int]:
+        """
+        Check an OTP and count the attempt in one atomic step.
+
+        A matching OTP is consumed. A wrong OTP increments the attempt
+        count. Expired OTPs and OTPs out of attempts are deleted.
+
+        Args:
+            key: OTP key
+            provided_otp: OTP provided by the user
+
+        Returns:
+            Tuple of (status, attempts remaining after this attempt)
+        """
+
+    def cleanup_expired(self, now: Optional[float] = None) -> int:
+        """Remove expired OTPs. Returns the number removed."""
+        return 0
+
+
+class InMemoryOTPStore(OTPStore):
+    """
+    Process-local OTP store for development.
+
+    OTPs are not shared between uvicorn workers, so run a single worker
+    when using this store.
+
+    Expiry times are kept in a min-heap, so a sweep only touches OTPs that
+    have actually expired (O(log n) each) instead of scanning every pending
+    OTP. Heap entries for OTPs that were replaced or consumed are skipped
+    when they come due, which bounds the heap to the OTPs issued within
+    one expiry window.
+    """
+
+    # Heap entries removed per lock acquisition, so a large sweep doesn't
+    # hold up request threads
+    SWEEP_BATCH_SIZE = 1000
+
+    def __init__(self):
+        self._storage: Dict[str, OTPRecord] = {}
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._storage)
+
+    def save(self, key: str, record: OTPRecord) -> None:
+        with self._lock:
+            self._storage[key] = record
+            heapq.heappush(self._expiry_heap, (record.expires_at, key))
+
+    def get(self, key: str) -> Optional[OTPRecord]:
+        with self._lock:
+            return self._storage.get(key)
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            return self._storage.pop(key, None) is not None
+
+    def verify_and_increment(self, key: str, provided_otp: str) -> Tuple[OTPVerifyStatus, int]:
+        with self._lock:
+            record = self._storage.get(key)
+            if record is None:
+                return OTPVerifyStatus.NOT_FOUND, 0
+
+            if record.is_expired():
+                del self._storage[key]
+                return OTPVerifyStatus.EXPIRED, 0
+
+            if record.has_exceeded_max_attempts():
+                del self._storage[key]
+                return OTPVerifyStatus.MAX_ATTEMPTS, 0
+
+            if provided_otp != record.otp:
+                record.increment_attempts()
+                return OTPVerifyStatus.INVALID, record.get_remaining_attempts()
+
+            del self._storage[key]
+            return OTPVerifyStatus.VALID, record.get_remaining_attempts()
+
+    def cleanup_expired(self, now: Optional[float] = None) -> int:
+        if now is None:
+            now = time.time()
+
+        removed = 0
+        heap = self._expiry_heap
+        while True:
+            with self._lock:
+                for _ in range(self.SWEEP_BATCH_SIZE):
+                    if not heap or heap[0][0] >= now:
+                        return removed
+                    expires_at, key = heapq.heappop(heap)
+                    record = self._storage.get(key)
+                    # Skip entries whose OTP was consumed or replaced since
+                    if record is not None and record.expires_at == expires_at:
+                        del self._storage[key]
+                        removed += 1
+
+
+# Checks and counts an attempt atomically.
+# KEYS[1] = OTP hash key; ARGV[1] = provided OTP, ARGV[2] = max attempts for
+# OTPs stored without their own limit
+VERIFY_AND_INCREMENT_SCRIPT = """
+local record = redis.call('HMGET', KEYS[1], 'otp', 'attempts', 'max_attempts')
+local otp = record[1]
+if not otp then
+    return {'not_found', 0}
+end
+local attempts = tonumber(record[2] or '0')
+local max_attempts = tonumber(record[3] or ARGV[2])
+if attempts >= max_attempts then
+    redis.call('DEL', KEYS[1])
+    return {'max_attempts', 0}
+end
+if otp ~= ARGV[1] then
+    attempts = redis.call('HINCRBY', KEYS[1], 'attempts', 1)
+    return {'invalid', math.max(0, max_attempts - attempts)}
+end
+redis.call('DEL', KEYS[1])
+return {'valid', max_attempts - attempts}
+"""
+
+
+class RedisOTPStore(OTPStore):
+    """
+    Redis OTP store shared by all workers.
+
+    Each OTP is a hash expiring with the OTP (OTP_EXPIRY_SECONDS), so Redis
+    removes expired OTPs itself; an expired OTP is reported as not found.
+    """
+
+    KEY_PREFIX = "otp:"
+    expires_natively = True
+
+    def __init__(self, client=None):
+        if client is None:
+            client = get_redis_client()
+        self._client = client
+        self._verify_script = client.register_script(VERIFY_AND_INCREMENT_SCRIPT)
+
+    def _key(self, key: str) -> str:
+        return f"{self.KEY_PREFIX}{key}"
+
+    def save(self, key: str, record: OTPRecord) -> None:
+        redis_key = self._key(key)
+        pipeline = self._client.pipeline(transaction=True)
+        # Replace rather than merge with a previous OTP's attempt count
+        pipeline.delete(redis_key)
+        pipeline.hset(redis_key, mapping={
+            "otp": record.otp,
+            "created_at": record.created_at,
+            "expires_at": record.expires_at,
+            "attempts": record.attempts,
+            "max_attempts": record.max_attempts
+        })
+        pipeline.expire(redis_key, max(1, math.ceil(record.expires_at - record.created_at)))
+        pipeline.execute()
+
+    def get(self, key: str) -> Optional[OTPRecord]:
+        data = self._client.hgetall(self._key(key))
+        if not data:
+            return None
+        return OTPRecord(
+            otp=data["otp"],
+            created_at=float(data["created_at"]),
+            expires_at=float(data["expires_at"]),
+            attempts=int(data.get("attempts", 0)),
+            max_attempts=int(data.get("max_attempts", settings.OTP_MAX_ATTEMPTS))
+        )
+
+    def delete(self, key: str) -> bool:
+        return self._client.delete(self._key(key)) > 0
+
+    def verify_and_increment(self, key: str, provided_otp: str) -> Tuple[OTPVerifyStatus, int]:
+        status, remaining = self._verify_script(keys=[self._key(key)], args=[provided_otp, settings.OTP_MAX_ATTEMPTS])
+        return OTPVerifyStatus(status), int(remaining)
+
+
+def create_otp_store() -> OTPStore:
+    """
+    Create the OTP store selected by OTP_STORAGE_BACKEND.
+
+    Raises:
+        RuntimeError: If Redis is selected but the redis package is not installed
+        ValueError: If OTP_STORAGE_BACKEND is not "memory" or "redis"
+    """
+    backend = settings.OTP_STORAGE_BACKEND.lower()
+
+    if backend == "memory":
+        return InMemoryOTPStore()
+    if backend == "redis":
+        # Per-process storage would silently break OTPs across workers
+        if not REDIS_AVAILABLE:
+            raise RuntimeError("OTP_STORAGE_BACKEND is 'redis' but the redis package is not installed")
+        logger.info("Using Redis OTP storage")
+        return RedisOTPStore()
+    raise ValueError(f"Unknown OTP_STORAGE_BACKEND '{backend}'. Expected 'memory' or 'redis'.")
@@ -13,13 +13,22 @@ from app.models.order import Order, OrderStatus
 from app.models.transaction import Transaction, TransactionStatus
 from app.models.user import User
 from app.core.exceptions import ValidationError
+from app.core.executors import run_io
+from app.database import DBSession, run_in_session
+from app.services.user_service import get_user_service
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
 
 class PaymentService:
-    """Service for handling payment operations with Razorpay."""
+    """
+    Service for handling payment operations with Razorpay.
+    
+    The public methods are coroutines: blocking Razorpay calls run on the
+    io executor pool, and database work runs through run_in_session() with
+    either session type.
+    """
     
     def __init__(self):
         """Initialize Razorpay client."""
@@ -31,12 +40,12 @@ class PaymentService:
                 auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET)
             )
     
-    def create_order(
+    async def create_order(
         self,
         user_email: str,
         amount: int,
         currency: str = "INR",
-        db: Session = None
+        db: DBSession = None
     ) -> dict:
         """
         Create a Razorpay order.
@@ -68,7 +77,7 @@ class PaymentService:
         
         try:
             # Create order with Razorpay
-            razorpay_order = self.client.order.create({
+            razorpay_order = await run_io(self.client.order.create, {
                 "amount": amount,
                 "currency": currency,
                 "receipt": receipt_id,
@@ -87,9 +96,7 @@ class PaymentService:
                     status=OrderStatus.CREATED,
                     razorpay_order_id=razorpay_order.get('id'),
                 )
-                db.add(order)
-                db.commit()
-                db.refresh(order)
+                await run_in_session(db, self._store_order, order)
                 logger.info(f"Order stored in database: {order.id}")
             
             return {
@@ -104,13 +111,13 @@ class PaymentService:
             logger.error(f"Error creating Razorpay order: {str(e)}", exc_info=True)
             raise Exception(f"Failed to create order: {str(e)}")
     
-    def verify_payment(
+    async def verify_payment(
         self,
         user_email: str,
         razorpay_payment_id: str,
         razorpay_order_id: str,
         razorpay_signature: str,
-        db: Session = None
+        db: DBSession = None
     ) -> dict:
         """
         Verify payment signature and update user premium status.
@@ -136,9 +143,7 @@ class PaymentService:
         
         try:
             # Find order in database
-            order = db.query(Order).filter(
-                Order.razorpay_order_id == razorpay_order_id
-            ).first()
+            order = await run_in_session(db, self._get_order, razorpay_order_id)
             
             if not order:
                 raise ValidationError(f"Order not found: {razorpay_order_id}")
@@ -164,7 +169,7 @@ class PaymentService:
             
             # Fetch payment details from Razorpay
             try:
-                payment = self.client.payment.fetch(razorpay_payment_id)
+                payment = await run_io(self.client.payment.fetch, razorpay_payment_id)
                 payment_status = payment.get('status', 'pending')
                 payment_method = payment.get('method', '')
                 payment_description = payment.get('description', '')
@@ -183,6 +188,66 @@ class PaymentService:
             }
             transaction_status = status_mapping.get(payment_status, TransactionStatus.PENDING)
             
+            await run_in_session(
+                db,
+                self._record_payment,
+                order,
+                user_email,
+                transaction_status,
+                razorpay_payment_id,
+                razorpay_order_id,
+                razorpay_signature,
+                payment_method,
+                payment_description
+            )
+            # The payment may have upgraded the user to premium
+            get_user_service().invalidate_user(user_email)
+            
+            return {
+                "success": True,
+                "message": "Payment verified successfully",
+                "payment_id": razorpay_payment_id,
+                "order_id": razorpay_order_id
+            }
+            
+        except ValidationError:
+            raise
+        except Exception as e:
+            logger.error(f"Error verifying payment: {str(e)}", exc_info=True)
+            raise Exception(f"Payment verification failed: {str(e)}")
+    
+    @staticmethod
+    def _store_order(db: Session, order: Order) -> None:
+        """Insert an order."""
+        db.add(order)
+        db.commit()
+        db.refresh(order)
+    
+    @staticmethod
+    def _get_order(db: Session, razorpay_order_id: str) -> Optional[Order]:
+        """Get an order by its Razorpay order ID."""
+        return db.query(Order).filter(
+            Order.razorpay_order_id == razorpay_order_id
+        ).first()
+    
+    @staticmethod
+    def _record_payment(
+        db: Session,
+        order: Order,
+        user_email: str,
+        transaction_status: TransactionStatus,
+        razorpay_payment_id: str,
+        razorpay_order_id: str,
+        razorpay_signature: str,
+        payment_method: Optional[str],
+        payment_description: Optional[str]
+    ) -> None:
+        """
+        Create or update the payment's transaction, update the order status,
+        and upgrade the user to premium if the payment was captured. Rolls
+        back the session if anything fails.
+        """
+        try:
             # Check if transaction already exists
             transaction = db.query(Transaction).filter(
                 Transaction.razorpay_payment_id == razorpay_payment_id
@@ -229,20 +294,9 @@ class PaymentService:
                     logger.info(f"User {user_email} upgraded to premium")
             
             db.commit()
-            
-            return {
-                "success": True,
-                "message": "Payment verified successfully",
-                "payment_id": razorpay_payment_id,
-                "order_id": razorpay_order_id
-            }
-            
-        except ValidationError:
-            raise
-        except Exception as e:
-            logger.error(f"Error verifying payment: {str(e)}", exc_info=True)
+        except Exception:
             db.rollback()
-            raise Exception(f"Payment verification failed: {str(e)}")
+            raise
 
 
 # Singleton instance
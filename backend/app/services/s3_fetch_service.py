@@ -0,0 +1,109 @@
+"""
+S3 fetch service for running blocking boto3 calls off the event loop.
+Batches of get_object/head_object/list calls run concurrently on a bounded
+thread pool so their latencies overlap instead of adding up.
+"""
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from app.config import get_settings
+from app.core.executors import InstrumentedExecutor
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+@dataclass
+class FetchResult:
+    """
+    Outcome of a single call in a batch.
+
+    Attributes:
+        item: The input item the call was made for
+        value: Return value of the call (None if it failed)
+        error: Exception raised by the call (None if it succeeded)
+    """
+    item: Any
+    value: Any = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the call succeeded."""
+        return self.error is None
+
+
+class S3FetchService:
+    """Service for running S3 calls on a bounded thread pool."""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or settings.S3_FETCH_MAX_WORKERS
+        self._executor = InstrumentedExecutor("s3-fetch", self.max_workers)
+
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a single blocking call on the pool and await its result.
+
+        Args:
+            func: Blocking callable (e.g., a boto3 client method)
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            Return value of func
+
+        Raises:
+            Any exception raised by func
+        """
+        return await self._executor.run(func, *args, **kwargs)
+
+    async def map(self, func: Callable[[Any], Any], items: Iterable[Any]) -> List[FetchResult]:
+        """
+        Run func for every item concurrently, bounded by the pool size.
+
+        Errors are captured per item rather than failing the whole batch.
+
+        Args:
+            func: Blocking callable taking a single item
+            items: Items to process
+
+        Returns:
+            List of FetchResult in the same order as items
+        """
+        items = list(items)
+        if not items:
+            return []
+
+        outcomes = await asyncio.gather(
+            *(self.run(func, item) for item in items),
+            return_exceptions=True
+        )
+
+        results = []
+        for item, outcome in zip(items, outcomes):
+            if isinstance(outcome, BaseException):
+                results.append(FetchResult(item=item, error=outcome))
+            else:
+                results.append(FetchResult(item=item, value=outcome))
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        """Get queue depth and wait time counters."""
+        return self._executor.stats()
+
+    def shutdown(self) -> None:
+        """Shut down the thread pool without waiting for pending calls."""
+        self._executor.shutdown()
+
+
+# Singleton instance
+_s3_fetch_service: Optional[S3FetchService] = None
+
+
+def get_s3_fetch_service() -> S3FetchService:
+    """Get S3 fetch service singleton instance."""
+    global _s3_fetch_service
+    if _s3_fetch_service is None:
+        _s3_fetch_service = S3FetchService()
+    return _s3_fetch_service
@@ -5,7 +5,9 @@ Supports multiple providers: console (dev), Twilio, AWS SNS, Plivo, MSG91.
 import logging
 from typing import Optional
 from app.config import get_settings
+from app.core.executors import run_io
 from app.core.exceptions import SMSException
+from app.core.http_client import HTTPX_AVAILABLE, get_http_client
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -43,27 +45,23 @@ class SMSService:
                 logger.warning("Plivo not installed. Falling back to console.")
                 self.provider = "console"
         elif self.provider == "msg91":
-            try:
-                # MSG91 uses HTTP API, no SDK needed
-                self.msg91_auth_key = settings.MSG91_AUTH_KEY
-                self.msg91_sender_id = settings.MSG91_SENDER_ID
-            except Exception:
-                logger.warning("MSG91 configuration missing. Falling back to console.")
+            # MSG91 uses HTTP API through the shared HTTP client, no SDK needed
+            if not HTTPX_AVAILABLE:
+                logger.warning("httpx not installed. Falling back to console.")
                 self.provider = "console"
+                return
+            self.msg91_auth_key = settings.MSG91_AUTH_KEY
+            self.msg91_sender_id = settings.MSG91_SENDER_ID
         elif self.provider == "aws_sns":
             try:
-                import boto3
-                self.sns_client = boto3.client(
-                    'sns',
-                    aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-                    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-                    region_name=settings.AWS_REGION
-                )
-            except ImportError:
+                from app.core.aws_clients import get_aws_client
+                # Reuse the process-wide pooled SNS client
+                self.sns_client = get_aws_client('sns')
+            except RuntimeError:
                 logger.warning("boto3 not installed. Falling back to console.")
                 self.provider = "console"
     
-    def send_otp(self, country_code: str, mobile_number: str, otp: str) -> bool:
+    async def send_otp(self, country_code: str, mobile_number: str, otp: str) -> bool:
         """
         Send OTP via SMS.
         
@@ -82,14 +80,15 @@ class SMSService:
         message = f"Your Testino OTP is {otp}. Valid for 5 minutes."
         
         try:
+            # SDK-based providers block, so they run on the io pool
             if self.provider == "twilio":
-                return self._send_via_twilio(full_number, message)
+                return await run_io(self._send_via_twilio, full_number, message)
             elif self.provider == "plivo":
-                return self._send_via_plivo(full_number, message)
+                return await run_io(self._send_via_plivo, full_number, message)
             elif self.provider == "msg91":
-                return self._send_via_msg91(full_number, message)
+                return await self._send_via_msg91(full_number, message)
             elif self.provider == "aws_sns":
-                return self._send_via_aws_sns(full_number, message)
+                return await run_io(self._send_via_aws_sns, full_number, message)
             else:
                 # Console provider (for development)
                 return self._send_via_console(full_number, message)
@@ -125,35 +124,31 @@ class SMSService:
             logger.error(f"Plivo error: {e}")
             raise SMSException(f"Plivo SMS failed: {str(e)}")
     
-    def _send_via_msg91(self, phone_number: str, message: str) -> bool:
+    async def _send_via_msg91(self, phone_number: str, message: str) -> bool:
         """Send SMS via MSG91 (cheap option for India)."""
         try:
-            import requests
-            
-            # MSG91 API endpoint
-            url = "https://control.msg91.com/api/v5/flow/"
-            
-            headers = {
-                "accept": "application/json",
-                "authkey": self.msg91_auth_key,
-                "content-type": "application/json"
-            }
+            client = get_http_client()
             
             # MSG91 requires phone number without + for India
             # Remove + and country code for Indian numbers, keep for international
             clean_number = phone_number.replace("+", "")
             
-            payload = {
-                "template_id": settings.MSG91_TEMPLATE_ID,  # Optional: use template
-                "sender": self.msg91_sender_id,
-                "short_url": "0",  # Disable URL shortening
-                "mobiles": clean_number,
-                "message": message
-            }
-            
-            # Alternative: Use simple send endpoint if template not configured
-            if not settings.MSG91_TEMPLATE_ID:
-                url = "https://control.msg91.com/api/sendhttp.php"
+            if settings.MSG91_TEMPLATE_ID:
+                headers = {
+                    "accept": "application/json",
+                    "authkey": self.msg91_auth_key,
+                    "content-type": "application/json"
+                }
+                payload = {
+                    "template_id": settings.MSG91_TEMPLATE_ID,
+                    "sender": self.msg91_sender_id,
+                    "short_url": "0",  # Disable URL shortening
+                    "mobiles": clean_number,
+                    "message": message
+                }
+                response = await client.post(f"{settings.MSG91_BASE_URL}/api/v5/flow/", json=payload, headers=headers)
+            else:
+                # Simple send endpoint if template not configured
                 params = {
                     "authkey": self.msg91_auth_key,
                     "mobiles": clean_number,
@@ -162,16 +157,11 @@ class SMSService:
                     "route": "4",  # Transactional route
                     "country": "91" if clean_number.startswith("91") else "0"  # 0 for international
                 }
-                response = requests.get(url, params=params)
-            else:
-                response = requests.post(url, json=payload, headers=headers)
+                response = await client.get(f"{settings.MSG91_BASE_URL}/api/sendhttp.php", params=params)
             
             response.raise_for_status()
             logger.info(f"SMS sent via MSG91 to {phone_number}")
             return True
-        except ImportError:
-            logger.error("requests library not installed for MSG91")
-            raise SMSException("MSG91 requires 'requests' library")
         except Exception as e:
             logger.error(f"MSG91 error: {e}")
             raise SMSException(f"MSG91 SMS failed: {str(e)}")
@@ -0,0 +1,442 @@
+"""
+Test catalog service for listing tests stored in S3.
+Keeps an in-process index of test metadata so the catalog can be served
+from memory. Every refresh lists the bucket once and compares the S3 ETags
+against the index; only new or changed tests are downloaded. A sidecar
+catalog.json manifest supplies the entries of unchanged tests, so a cold
+start doesn't have to open every test file.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set
+from app.config import get_settings
+from app.services.s3_fetch_service import get_s3_fetch_service
+from app.utils.json_stream import extract_top_level_fields, load_json_stream
+
+# Check if boto3 is available
+try:
+    from botocore.exceptions import ClientError
+except ImportError:
+    # boto3 not installed, define dummy class
+    ClientError = Exception
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Version of the catalog.json manifest format
+MANIFEST_VERSION = 1
+
+# Error codes S3 returns for a missing object or an unchanged conditional GET
+NOT_FOUND_CODES = ('404', 'NoSuchKey')
+NOT_MODIFIED_CODES = ('304', 'NotModified')
+
+
+@dataclass
+class CatalogEntry:
+    """
+    Represents a single test in the catalog index.
+
+    Attributes:
+        id: Test ID (e.g., 1 for test-1.json)
+        name: Test name from the testName field
+        test_authorization: Authorization level from the test JSON
+        etag: S3 ETag of the test object the entry was built from
+        last_modified: S3 LastModified timestamp of the test object
+        content_hash: SHA-256 of the test JSON (only known from the manifest)
+        assets: Asset references of the test (only known from the manifest)
+    """
+    id: int
+    name: str
+    test_authorization: str
+    etag: str
+    last_modified: Optional[datetime] = None
+    content_hash: Optional[str] = None
+    assets: List[Dict[str, Any]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert entry to the dictionary shape used by the tests routes."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "test_authorization": self.test_authorization
+        }
+
+    def to_manifest_dict(self) -> Dict[str, Any]:
+        """Convert entry to its catalog.json manifest representation."""
+        return {
+            "id": self.id,
+            "key": f"test-{self.id}.json",
+            "name": self.name,
+            "test_authorization": self.test_authorization,
+            "etag": self.etag,
+            "last_modified": self.last_modified.isoformat() if self.last_modified else None,
+            "content_hash": self.content_hash,
+            "assets": self.assets
+        }
+
+    @classmethod
+    def from_manifest_dict(cls, data: Dict[str, Any]) -> "CatalogEntry":
+        """Build an entry from its catalog.json manifest representation."""
+        last_modified = data.get("last_modified")
+        return cls(
+            id=int(data["id"]),
+            name=data.get("name") or f"Test {data['id']}",
+            test_authorization=data.get("test_authorization", "") or "",
+            etag=data.get("etag", ""),
+            last_modified=datetime.fromisoformat(last_modified) if last_modified else None,
+            content_hash=data.get("content_hash"),
+            assets=data.get("assets") or []
+        )
+
+
+def parse_test_id_from_key(key: str) -> Optional[int]:
+    """
+    Extract the test ID from an S3 key.
+
+    Args:
+        key: S3 object key (e.g., "test-1.json")
+
+    Returns:
+        Test ID, or None if the key does not match the test-*.json pattern
+    """
+    # Only process files matching test-*.json pattern
+    if not key.endswith('.json') or not key.startswith('test-'):
+        return None
+
+    # Extract test ID from filename (e.g., "test-1.json" -> 1)
+    filename = Path(key).stem  # "test-1"
+    test_id_str = filename.replace("test-", "")
+
+    try:
+        return int(test_id_str)
+    except ValueError:
+        logger.warning(f"Invalid test filename format in S3: {key}")
+        return None
+
+
+class TestCatalogService:
+    """
+    Service maintaining an in-memory index of the tests bucket.
+
+    A refresh lists the bucket (one list_objects_v2 call per 1000 tests)
+    and reads only the tests whose ETag matches neither the index nor the
+    catalog.json manifest. The manifest is fetched with a conditional GET,
+    so an unchanged manifest costs no download; tests changed since it was
+    built are patched in from the bucket until it is rebuilt. Refreshes are
+    throttled by TEST_CATALOG_REFRESH_INTERVAL_SECONDS so most requests are
+    answered without touching S3 at all.
+    """
+
+    def __init__(self, refresh_interval_seconds: Optional[int] = None):
+        if refresh_interval_seconds is None:
+            refresh_interval_seconds = settings.TEST_CATALOG_REFRESH_INTERVAL_SECONDS
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self._entries: Dict[int, CatalogEntry] = {}
+        self._last_refresh: Optional[float] = None
+        self._lock = threading.Lock()
+        # Serializes refreshes so concurrent requests share one bucket scan
+        self._refresh_lock = asyncio.Lock()
+        # Called with (updated_ids, removed_ids) after a refresh finds changes
+        self._change_listeners: List[Callable[[Set[int], Set[int]], Any]] = []
+        self.manifest_key = settings.TEST_CATALOG_MANIFEST_KEY
+        # ETag and entries of the last manifest read, reused while it is unchanged
+        self._manifest_etag: Optional[str] = None
+        self._manifest_entries: Optional[Dict[int, CatalogEntry]] = None
+
+    def is_stale(self) -> bool:
+        """Check whether the index needs to be refreshed from S3."""
+        if self._last_refresh is None:
+            return True
+        return time.time() - self._last_refresh >= self.refresh_interval_seconds
+
+    def list_entries(self) -> List[CatalogEntry]:
+        """Get all catalog entries sorted by test ID."""
+        with self._lock:
+            entries = list(self._entries.values())
+        entries.sort(key=lambda entry: entry.id)
+        return entries
+
+    def get_entry(self, test_id: int) -> Optional[CatalogEntry]:
+        """Get the catalog entry for a test, if indexed."""
+        with self._lock:
+            return self._entries.get(test_id)
+
+    def is_loaded(self) -> bool:
+        """Check whether the index has been built at least once."""
+        return self._last_refresh is not None
+
+    def add_change_listener(self, listener: Callable[[Set[int], Set[int]], Any]) -> None:
+        """
+        Register a callback for catalog changes.
+
+        Args:
+            listener: Called with (updated_ids, removed_ids) after a refresh
+                finds new, changed, or deleted tests
+        """
+        self._change_listeners.append(listener)
+
+    def invalidate(self) -> None:
+        """Force the next call to refresh() to re-list the bucket."""
+        self._last_refresh = None
+
+    async def refresh(self, s3_client, bucket: str, force: bool = False) -> List[CatalogEntry]:
+        """
+        Refresh the index from the bucket listing if it is stale.
+
+        New and changed tests not covered by the manifest are downloaded
+        concurrently through the S3 fetch pool.
+
+        Args:
+            s3_client: boto3 S3 client
+            bucket: Name of the tests bucket
+            force: Refresh even if the refresh interval has not elapsed
+
+        Returns:
+            All catalog entries sorted by test ID
+
+        Raises:
+            ClientError: If listing the bucket fails
+        """
+        if not force and not self.is_stale():
+            return self.list_entries()
+
+        async with self._refresh_lock:
+            # Another request may have refreshed while we were waiting
+            if not force and not self.is_stale():
+                return self.list_entries()
+
+            with self._lock:
+                current = dict(self._entries)
+
+            manifest = None
+            if self.manifest_key:
+                manifest = await get_s3_fetch_service().run(self._read_manifest, s3_client, bucket)
+            entries = await self._scan_bucket(s3_client, bucket, current, manifest)
+
+            with self._lock:
+                self._entries = entries
+                self._last_refresh = time.time()
+
+        # Tests added for the first time have nothing to invalidate
+        modified = {
+            test_id for test_id, entry in entries.items()
+            if test_id in current and current[test_id].etag != entry.etag
+        }
+        added = set(entries) - set(current)
+        removed = set(current) - set(entries)
+
+        if modified or added or removed:
+            logger.info(
+                f"Test catalog refreshed: {len(added)} added, "
+                f"{len(modified)} updated, {len(removed)} removed, {len(entries)} total"
+            )
+            for listener in self._change_listeners:
+                try:
+                    listener(modified, removed)
+                except Exception as e:
+                    logger.error(f"Error in test catalog change listener: {e}")
+
+        return self.list_entries()
+
+    def _read_manifest(self, s3_client, bucket: str) -> Optional[Dict[int, CatalogEntry]]:
+        """
+        Load catalog entries from the manifest.
+
+        Returns:
+            Entries keyed by test ID, or None if the manifest is missing or invalid
+        """
+        request = {"Bucket": bucket, "Key": self.manifest_key}
+        if self._manifest_etag:
+            request["IfNoneMatch"] = self._manifest_etag
+
+        try:
+            response = s3_client.get_object(**request)
+        except ClientError as e:
+            error_code = e.response.get('Error', {}).get('Code', '')
+            if error_code in NOT_MODIFIED_CODES:
+                # Same manifest as last time
+                return self._manifest_entries
+            if error_code in NOT_FOUND_CODES:
+                logger.debug(f"No catalog manifest at {bucket}/{self.manifest_key}; scanning tests")
+            else:
+                logger.warning(f"Error reading catalog manifest, scanning tests instead: {e}")
+            self._manifest_etag = None
+            self._manifest_entries = None
+            return None
+
+        try:
+            manifest = load_json_stream(response['Body'], settings.S3_READ_CHUNK_SIZE)[0]
+            if manifest.get("version") != MANIFEST_VERSION:
+                raise ValueError(f"unsupported manifest version {manifest.get('version')}")
+            entries = {}
+            for item in manifest["tests"]:
+                entry = CatalogEntry.from_manifest_dict(item)
+                entries[entry.id] = entry
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.warning(f"Invalid catalog manifest, scanning tests instead: {e}")
+            self._manifest_etag = None
+            self._manifest_entries = None
+            return None
+
+        self._manifest_etag = response.get('ETag')
+        self._manifest_entries = entries
+        return entries
+
+    async def _scan_bucket(
+        self,
+        s3_client,
+        bucket: str,
+        current: Dict[int, CatalogEntry],
+        manifest: Optional[Dict[int, CatalogEntry]] = None
+    ) -> Dict[int, CatalogEntry]:
+        """
+        Build entries by listing the bucket and reading new or changed tests.
+
+        A listed test keeps its manifest entry, or else its current entry,
+        if that entry's ETag matches the listing. Any other test is read
+        from the bucket, and tests missing from the listing are dropped.
+        """
+        fetch_service = get_s3_fetch_service()
+        listing = await fetch_service.run(self._list_test_objects, s3_client, bucket)
+
+        entries: Dict[int, CatalogEntry] = {}
+        changed = []
+        for test_id, obj in listing.items():
+            for source in (manifest or {}, current):
+                entry = source.get(test_id)
+                if entry is not None and entry.etag == obj["ETag"]:
+                    entries[test_id] = entry
+                    break
+            else:
+                changed.append((test_id, obj))
+
+        if manifest is not None:
+            outdated = sum(1 for test_id, _ in changed if test_id in manifest)
+            deleted = len(set(manifest) - set(listing))
+            new = len(changed) - outdated
+            if outdated or deleted or new:
+                logger.info(
+                    f"Catalog manifest is out of date ({new} new, {outdated} changed, "
+                    f"{deleted} deleted tests); patching from the bucket until it is rebuilt"
+                )
+
+        results = await fetch_service.map(
+            lambda item: self._load_entry(s3_client, bucket, *item),
+            changed
+        )
+
+        for result in results:
+            test_id = result.item[0]
+            if not result.ok:
+                # Skip tests that can't be read
+                logger.warning(f"Skipping test {test_id} due to read error: {result.error}")
+                continue
+            entries[test_id] = result.value
+
+        return entries
+
+    def build_manifest(self, s3_client, bucket: str) -> Dict[str, Any]:
+        """
+        Build the catalog.json manifest by reading every test in the bucket.
+
+        Args:
+            s3_client: boto3 S3 client
+            bucket: Name of the tests bucket
+
+        Returns:
+            Manifest dictionary, ready to be serialized and uploaded
+        """
+        tests = []
+        for test_id, obj in sorted(self._list_test_objects(s3_client, bucket).items()):
+            response = s3_client.get_object(Bucket=bucket, Key=obj['Key'])
+            raw = response['Body'].read()
+            try:
+                test_data = json.loads(raw.decode('utf-8'))
+            except json.JSONDecodeError as e:
+                logger.warning(f"Skipping test {test_id} due to read error: {e}")
+                continue
+
+            entry = CatalogEntry(
+                id=test_id,
+                name=test_data.get("testName", f"Test {test_id}"),
+                test_authorization=test_data.get("test_authorization", "") or "",
+                etag=response.get('ETag', obj['ETag']),
+                last_modified=response.get('LastModified', obj.get('LastModified')),
+                content_hash=hashlib.sha256(raw).hexdigest(),
+                assets=test_data.get("assetReferences") or []
+            )
+            tests.append(entry.to_manifest_dict())
+
+        return {
+            "version": MANIFEST_VERSION,
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "tests": tests
+        }
+
+    def _list_test_objects(self, s3_client, bucket: str) -> Dict[int, Dict[str, Any]]:
+        """List test objects in the bucket keyed by test ID."""
+        objects: Dict[int, Dict[str, Any]] = {}
+
+        # List all objects with prefix "test-" in the bucket
+        paginator = s3_client.get_paginator('list_objects_v2')
+        pages = paginator.paginate(Bucket=bucket, Prefix="test-")
+
+        for page in pages:
+            if 'Contents' not in page:
+                continue
+
+            for obj in page['Contents']:
+                test_id = parse_test_id_from_key(obj['Key'])
+                if test_id is None:
+                    continue
+                objects[test_id] = obj
+
+        return objects
+
+    def _load_entry(
+        self,
+        s3_client,
+        bucket: str,
+        test_id: int,
+        obj: Dict[str, Any]
+    ) -> CatalogEntry:
+        """Read the catalog fields of a single test and build its catalog entry."""
+        response = s3_client.get_object(Bucket=bucket, Key=obj['Key'])
+        body = response['Body']
+        try:
+            # Only the top-level catalog fields are parsed; the rest of the
+            # document (sections, transcripts) is never materialized
+            test_data = extract_top_level_fields(
+                body, ("testName", "test_authorization"), settings.S3_READ_CHUNK_SIZE
+            )
+        finally:
+            body.close()
+
+        return CatalogEntry(
+            id=test_id,
+            name=test_data.get("testName", f"Test {test_id}"),
+            test_authorization=test_data.get("test_authorization", "") or "",
+            # Use the ETag of the object actually read so a concurrent upload
+            # is picked up on the next refresh
+            etag=response.get('ETag', obj['ETag']),
+            last_modified=response.get('LastModified', obj.get('LastModified'))
+        )
+
+
+# Singleton instance
+_test_catalog_service: Optional[TestCatalogService] = None
+
+
+def get_test_catalog_service() -> TestCatalogService:
+    """Get test catalog service singleton instance."""
+    global _test_catalog_service
+    if _test_catalog_service is None:
+        _test_catalog_service = TestCatalogService()
+    return _test_catalog_service
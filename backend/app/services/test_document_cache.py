@@ -0,0 +1,406 @@
+"""
+In-process cache of parsed test documents.
+Test JSON rarely changes, so parsed documents are kept in an LRU bounded by
+total size and revalidated against S3 with a conditional GET once their TTL
+runs out. The serialized API response body is cached alongside each
+document so it is built once per test version, and counts towards the
+cache size like the document itself.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+from app.config import get_settings
+from app.core.compression import compress
+from app.utils.json_stream import load_json_stream
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Check if boto3 is available
+try:
+    from botocore.exceptions import BotoCoreError, ClientError
+except ImportError:
+    # boto3 not installed, define dummy classes
+    ClientError = Exception
+    BotoCoreError = Exception
+
+# Error codes S3 returns for a conditional GET whose ETag still matches
+NOT_MODIFIED_CODES = ('304', 'NotModified')
+
+# Error codes meaning the test document no longer exists
+NOT_FOUND_CODES = ('404', 'NoSuchKey', 'NotFound')
+
+# Fields removed from test documents before they are sent to clients
+PRIVATE_FIELDS = ("test_authorization",)
+
+
+def serialize_json(content: Any) -> bytes:
+    """Serialize content exactly like FastAPI's JSONResponse."""
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":")
+    ).encode("utf-8")
+
+
+@dataclass
+class PreparedTestResponse:
+    """
+    Serialized GET /tests/{test_id} response for one version of a test.
+
+    Attributes:
+        etag: Strong ETag of the body (quoted)
+        body: JSON response body
+        suffix: Serialized assetReferencesResolved tail the body was built with
+        encoded_bodies: Precompressed copies of body keyed by content encoding
+        on_grow: Called with the size of each compressed body added
+    """
+    etag: str
+    body: bytes
+    suffix: bytes
+    encoded_bodies: Dict[str, bytes] = field(default_factory=dict, repr=False)
+    on_grow: Optional[Callable[[int], None]] = field(default=None, repr=False, compare=False)
+
+    @property
+    def size(self) -> int:
+        """Bytes held by the body and its compressed copies."""
+        return len(self.body) + sum(len(encoded) for encoded in list(self.encoded_bodies.values()))
+
+    def get_etag(self, encoding: Optional[str] = None) -> str:
+        """Get the strong ETag for the body in the given content encoding."""
+        if encoding is None:
+            return self.etag
+        return f'{self.etag[:-1]}-{encoding}"'
+
+    def get_body(self, encoding: Optional[str] = None) -> bytes:
+        """
+        Get the body in the given content encoding.
+
+        Each encoding is compressed once per test version and then reused.
+        This is CPU-bound on a cache miss; call it off the event loop.
+        """
+        if encoding is None:
+            return self.body
+        encoded = self.encoded_bodies.get(encoding)
+        if encoded is None:
+            compressed = compress(self.body, encoding)
+            # Only the first of concurrent compressions is kept and counted
+            encoded = self.encoded_bodies.setdefault(encoding, compressed)
+            if encoded is compressed and self.on_grow is not None:
+                self.on_grow(len(encoded))
+        return encoded
+
+
+@dataclass
+class CachedTestDocument:
+    """
+    Represents a parsed test document in the cache.
+
+    Attributes:
+        test_id: Test ID
+        data: Parsed test JSON (shared between requests - do not mutate)
+        etag: S3 ETag of the object the document was parsed from
+        size: Bytes accounted to the entry: the JSON document, plus the
+            serialized and compressed response bodies once they are built
+        validated_at: Timestamp when the document was last fetched or revalidated
+        on_resize: Called with (document, bytes added or removed) when a body
+            is attached, so the cache holding the document can account for it
+    """
+    test_id: int
+    data: Dict[str, Any]
+    etag: str
+    size: int
+    validated_at: float
+    body_prefix: Optional[bytes] = field(default=None, repr=False)
+    prepared: Optional[PreparedTestResponse] = field(default=None, repr=False)
+    on_resize: Optional[Callable[["CachedTestDocument", int], None]] = field(
+        default=None, repr=False, compare=False
+    )
+
+    def _resize(self, delta: int) -> None:
+        if self.on_resize is not None:
+            self.on_resize(self, delta)
+        else:
+            self.size += delta
+
+    def is_fresh(self, ttl_seconds: int) -> bool:
+        """Check if the document can be served without revalidation."""
+        return time.time() - self.validated_at < ttl_seconds
+
+    def get_body_prefix(self) -> bytes:
+        """
+        Get the sanitized document serialized without its closing brace.
+
+        Built once per document version; assetReferencesResolved is spliced
+        in after it for each response.
+        """
+        if self.body_prefix is None:
+            excluded = set(PRIVATE_FIELDS)
+            if self.data.get("assetReferences"):
+                # Replaced by the freshly resolved references
+                excluded.add("assetReferencesResolved")
+            public_data = {k: v for k, v in self.data.items() if k not in excluded}
+            body_prefix = serialize_json(public_data)[:-1]
+            previous, self.body_prefix = self.body_prefix, body_prefix
+            self._resize(len(body_prefix) - (len(previous) if previous is not None else 0))
+        return self.body_prefix
+
+    def prepare_response(
+        self,
+        asset_references_resolved: Optional[List[Dict[str, Any]]] = None
+    ) -> PreparedTestResponse:
+        """
+        Get the serialized API response for this document.
+
+        The body is only rebuilt when the resolved asset references change
+        (e.g., when presigned URLs are regenerated).
+
+        Args:
+            asset_references_resolved: Resolved asset references, or None if
+                the test has no assetReferences
+
+        Returns:
+            PreparedTestResponse with body and strong ETag
+        """
+        prefix = self.get_body_prefix()
+
+        if asset_references_resolved is None:
+            suffix = b"}"
+        else:
+            separator = b"," if len(prefix) > 1 else b""
+            suffix = (
+                separator
+                + b'"assetReferencesResolved":'
+                + serialize_json(asset_references_resolved)
+                + b"}"
+            )
+
+        prepared = self.prepared
+        if prepared is not None and prepared.suffix == suffix:
+            return prepared
+
+        # The S3 ETag identifies the prefix, so hashing it with the suffix
+        # identifies the full body without hashing the whole document
+        digest = hashlib.sha256(self.etag.encode("utf-8") + suffix).hexdigest()
+        prepared = PreparedTestResponse(
+            etag=f'"{digest[:32]}"',
+            body=prefix + suffix,
+            suffix=suffix,
+            on_grow=self._resize
+        )
+        previous, self.prepared = self.prepared, prepared
+        self._resize(prepared.size - (previous.size if previous is not None else 0))
+        return prepared
+
+
+class TestDocumentCache:
+    """
+    LRU cache of parsed test documents keyed by test ID.
+
+    The cache is bounded by total size rather than by entry count, since
+    test documents vary widely in size. An entry's size counts the JSON
+    document and the response bodies built from it (serialized prefix,
+    response body and its compressed copies), so attaching a body may evict
+    other entries. Entries older than the TTL are revalidated with
+    get_object(IfNoneMatch=etag), so an unchanged test costs a 304 instead
+    of a full download and parse.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None, ttl_seconds: Optional[int] = None):
+        self.max_bytes = max_bytes if max_bytes is not None else settings.TEST_CACHE_MAX_BYTES
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.TEST_CACHE_TTL_SECONDS
+        self._entries: "OrderedDict[int, CachedTestDocument]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+        # Counters for sizing the cache in production
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+        self.stale_served = 0
+
+    def get(self, test_id: int) -> Optional[CachedTestDocument]:
+        """Get a cached document regardless of freshness, marking it recently used."""
+        with self._lock:
+            entry = self._entries.get(test_id)
+            if entry is not None:
+                self._entries.move_to_end(test_id)
+            return entry
+
+    def put(self, entry: CachedTestDocument) -> None:
+        """Add or replace a cached document, evicting least recently used entries."""
+        with self._lock:
+            previous = self._entries.pop(entry.test_id, None)
+            if previous is not None:
+                self._total_bytes -= previous.size
+
+            if entry.size > self.max_bytes:
+                # Never cache a document larger than the whole cache
+                logger.warning(
+                    f"Test {entry.test_id} ({entry.size} bytes) exceeds cache size "
+                    f"({self.max_bytes} bytes); not caching"
+                )
+                return
+
+            entry.on_resize = self._resize
+            self._entries[entry.test_id] = entry
+            self._total_bytes += entry.size
+            self._evict_over_budget()
+
+    def _resize(self, entry: CachedTestDocument, delta: int) -> None:
+        """Account for a body attached to (or dropped from) an entry."""
+        with self._lock:
+            entry.size += delta
+            if self._entries.get(entry.test_id) is not entry:
+                # Replaced or evicted meanwhile; not counted in the total
+                return
+            self._total_bytes += delta
+            self._evict_over_budget()
+
+    def _evict_over_budget(self) -> None:
+        """Evict least recently used entries until the cache fits. Call with the lock held."""
+        while self._total_bytes > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._total_bytes -= evicted.size
+            self.evictions += 1
+
+    def invalidate(self, test_id: int) -> None:
+        """Remove a test from the cache."""
+        with self._lock:
+            entry = self._entries.pop(test_id, None)
+            if entry is not None:
+                self._total_bytes -= entry.size
+
+    def contains(self, test_id: int) -> bool:
+        """Check if a test is cached, without affecting LRU order."""
+        with self._lock:
+            return test_id in self._entries
+
+    def clear(self) -> None:
+        """Remove all cached documents."""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def fetch(
+        self,
+        s3_client,
+        bucket: str,
+        test_id: int,
+        revalidate: bool = False
+    ) -> CachedTestDocument:
+        """
+        Get a test document, from cache when fresh and from S3 otherwise.
+
+        Args:
+            s3_client: boto3 S3 client
+            bucket: Name of the tests bucket
+            test_id: The test ID (e.g., 1 for test-1.json)
+            revalidate: Check a cached copy against S3 even if it is still fresh
+
+        Returns:
+            CachedTestDocument for the test
+
+        If revalidating a cached copy fails for any reason other than the
+        test being gone (throttling, 5xx, timeouts), the cached copy is
+        served and revalidated again on the next request.
+
+        Raises:
+            ClientError: If the S3 request fails and there is no cached copy
+                (or the test no longer exists)
+            BotoCoreError: If S3 can't be reached and there is no cached copy
+            json.JSONDecodeError: If the test JSON cannot be parsed
+        """
+        entry = self.get(test_id)
+        if entry is not None and not revalidate and entry.is_fresh(self.ttl_seconds):
+            with self._lock:
+                self.hits += 1
+            return entry
+
+        request = {"Bucket": bucket, "Key": f"test-{test_id}.json"}
+        if entry is not None:
+            request["IfNoneMatch"] = entry.etag
+
+        try:
+            response = s3_client.get_object(**request)
+        except ClientError as e:
+            error_code = e.response.get('Error', {}).get('Code', '')
+            if entry is not None and error_code in NOT_MODIFIED_CODES:
+                # Unchanged in S3 - keep serving the parsed copy
+                entry.validated_at = time.time()
+                with self._lock:
+                    self.hits += 1
+                    self.revalidations += 1
+                return entry
+            if error_code in NOT_FOUND_CODES:
+                # The test was deleted; don't keep serving it
+                self.invalidate(test_id)
+                raise
+            if entry is None:
+                raise
+            return self._serve_stale(entry, e)
+        except BotoCoreError as e:
+            # Timeouts and connection errors
+            if entry is None:
+                raise
+            return self._serve_stale(entry, e)
+
+        # Parse straight from the stream instead of buffering the raw bytes
+        # and a decoded copy next to the parsed document
+        data, size = load_json_stream(response['Body'], settings.S3_READ_CHUNK_SIZE)
+
+        entry = CachedTestDocument(
+            test_id=test_id,
+            data=data,
+            etag=response.get('ETag', ''),
+            size=size,
+            validated_at=time.time()
+        )
+        self.put(entry)
+
+        with self._lock:
+            self.misses += 1
+
+        return entry
+
+    def _serve_stale(self, entry: CachedTestDocument, error: Exception) -> CachedTestDocument:
+        """Serve a cached copy that could not be revalidated (validated_at is left as is)."""
+        logger.warning(f"Revalidating test {entry.test_id} failed, serving cached copy: {error}")
+        with self._lock:
+            self.stale_served += 1
+        return entry
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache counters and current size."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidations": self.revalidations,
+                "evictions": self.evictions,
+                "stale_served": self.stale_served
+            }
+
+
+# Singleton instance
+_test_document_cache: Optional[TestDocumentCache] = None
+
+
+def get_test_document_cache() -> TestDocumentCache:
+    """Get test document cache singleton instance."""
+    global _test_document_cache
+    if _test_document_cache is None:
+        _test_document_cache = TestDocumentCache()
+    return _test_document_cache
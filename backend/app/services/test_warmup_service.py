@@ -0,0 +1,195 @@
+"""
+Test warm-up service.
+Preloads the test catalog and the most-requested tests at startup so the
+first users after a deploy don't pay for cold S3 reads, then polls the
+tests bucket in the background to pick up changed tests.
+"""
+import asyncio
+import logging
+import time
+from typing import List, Optional, Set
+from app.config import get_settings
+from app.core.aws_clients import get_aws_client
+from app.services.s3_fetch_service import get_s3_fetch_service
+from app.services.test_catalog_service import CatalogEntry, get_test_catalog_service
+from app.services.test_document_cache import get_test_document_cache
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class TestWarmupService:
+    """
+    Service running the startup warm-up stage and the bucket change poller.
+
+    The application reports ready (GET /health/ready) only after warm-up has
+    finished. A failed warm-up is logged and does not block readiness, since
+    requests can still be served through the cold path.
+    """
+
+    def __init__(self):
+        self.bucket = settings.TESTS_S3_BUCKET
+        self.warmed_test_ids: List[int] = []
+        self.warmup_error: Optional[str] = None
+        self.warmup_seconds: Optional[float] = None
+        self._ready = False
+        self._tasks: List[asyncio.Task] = []
+        # Cached tests whose ETag changed, re-fetched on the next poll
+        self._pending_revalidation: Set[int] = set()
+
+    @property
+    def is_ready(self) -> bool:
+        """Whether warm-up has completed."""
+        return self._ready
+
+    def start(self) -> None:
+        """
+        Start warm-up and the bucket poller as background tasks.
+        Call this from the application startup event.
+        """
+        get_test_catalog_service().add_change_listener(self._on_catalog_change)
+        self._tasks.append(asyncio.create_task(self._run()))
+
+    async def stop(self) -> None:
+        """Cancel background tasks. Call this from the application shutdown event."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def _run(self) -> None:
+        """Warm up, then poll the bucket until cancelled."""
+        if settings.TEST_WARMUP_ENABLED:
+            await self.warm_up()
+        else:
+            self._ready = True
+
+        if settings.TEST_CATALOG_POLL_INTERVAL_SECONDS > 0:
+            await self._poll_bucket()
+
+    def _get_s3_client(self):
+        """Get the shared S3 client, or None if AWS is not configured."""
+        if not settings.AWS_ACCESS_KEY_ID or not settings.AWS_SECRET_ACCESS_KEY:
+            return None
+        return get_aws_client('s3')
+
+    async def warm_up(self) -> None:
+        """Preload the catalog and the most-requested tests."""
+        start = time.time()
+
+        try:
+            s3_client = self._get_s3_client()
+            if s3_client is None:
+                logger.warning("AWS credentials not configured. Skipping test warm-up.")
+                return
+
+            entries = await get_test_catalog_service().refresh(s3_client, self.bucket, force=True)
+            test_ids = self._select_warmup_test_ids(entries)
+
+            results = await get_s3_fetch_service().map(
+                lambda test_id: self._warm_test(s3_client, test_id),
+                test_ids
+            )
+            for result in results:
+                if result.ok:
+                    self.warmed_test_ids.append(result.item)
+                else:
+                    logger.warning(f"Failed to warm up test {result.item}: {result.error}")
+
+            self.warmup_seconds = time.time() - start
+            logger.info(
+                f"Test warm-up complete: {len(entries)} tests in catalog, "
+                f"{len(self.warmed_test_ids)} preloaded in {self.warmup_seconds:.2f}s"
+            )
+        except Exception as e:
+            self.warmup_error = str(e)
+            logger.error(f"Test warm-up failed: {e}")
+        finally:
+            self._ready = True
+
+    def _select_warmup_test_ids(self, entries: List[CatalogEntry]) -> List[int]:
+        """
+        Pick the tests to preload.
+
+        Uses TEST_WARMUP_IDS (most-requested tests, e.g. from analytics) when
+        configured, then fills up to TEST_WARMUP_COUNT with the lowest test
+        IDs, which are listed first in the catalog.
+        """
+        available = [entry.id for entry in entries]
+        available_set = set(available)
+
+        test_ids = []
+        for value in settings.TEST_WARMUP_IDS.split(","):
+            value = value.strip()
+            if value.isdigit() and int(value) in available_set and int(value) not in test_ids:
+                test_ids.append(int(value))
+
+        for test_id in available:
+            if len(test_ids) >= settings.TEST_WARMUP_COUNT:
+                break
+            if test_id not in test_ids:
+                test_ids.append(test_id)
+
+        return test_ids[:max(settings.TEST_WARMUP_COUNT, 0)]
+
+    def _warm_test(self, s3_client, test_id: int) -> None:
+        """Load a test into the document cache and pre-serialize its body."""
+        document = get_test_document_cache().fetch(s3_client, self.bucket, test_id)
+        document.get_body_prefix()
+
+    def _on_catalog_change(self, modified: Set[int], removed: Set[int]) -> None:
+        """Drop deleted tests and queue changed cached tests for re-fetch."""
+        document_cache = get_test_document_cache()
+        for test_id in removed:
+            document_cache.invalidate(test_id)
+        self._pending_revalidation.update(
+            test_id for test_id in modified if document_cache.contains(test_id)
+        )
+
+    async def _poll_bucket(self) -> None:
+        """Re-list the bucket on an interval and refresh changed tests."""
+        interval = settings.TEST_CATALOG_POLL_INTERVAL_SECONDS
+        logger.info(f"Polling '{self.bucket}' for test changes every {interval}s")
+
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                s3_client = self._get_s3_client()
+                if s3_client is None:
+                    continue
+
+                await get_test_catalog_service().refresh(s3_client, self.bucket, force=True)
+
+                pending, self._pending_revalidation = self._pending_revalidation, set()
+                results = await get_s3_fetch_service().map(
+                    lambda test_id: get_test_document_cache().fetch(
+                        s3_client, self.bucket, test_id, revalidate=True
+                    ),
+                    pending
+                )
+                for result in results:
+                    if not result.ok:
+                        logger.warning(f"Failed to refresh changed test {result.item}: {result.error}")
+            except Exception as e:
+                logger.error(f"Error polling tests bucket: {e}")
+
+    def status(self) -> dict:
+        """Get warm-up status for the readiness endpoint."""
+        return {
+            "ready": self._ready,
+            "warmed_tests": len(self.warmed_test_ids),
+            "warmup_seconds": self.warmup_seconds,
+            "warmup_error": self.warmup_error
+        }
+
+
+# Singleton instance
+_test_warmup_service: Optional[TestWarmupService] = None
+
+
+def get_test_warmup_service() -> TestWarmupService:
+    """Get test warm-up service singleton instance."""
+    global _test_warmup_service
+    if _test_warmup_service is None:
+        _test_warmup_service = TestWarmupService()
+    return _test_warmup_service
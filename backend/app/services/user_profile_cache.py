@@ -0,0 +1,127 @@
+"""
+Cache of user profiles (name and premium status) keyed by email.
+Test listing, test loading and /auth/me only need a user's premium status,
+so a recently read profile is reused instead of querying the database on
+every request. Writers (signup, payment verification) invalidate the entry.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+@dataclass(frozen=True)
+class UserProfile:
+    """
+    Read-only snapshot of a user row.
+
+    Attributes:
+        email: User email (primary key)
+        name: User name
+        premium: Whether the user has premium access
+    """
+    email: str
+    name: str
+    premium: bool
+
+
+class UserProfileCache:
+    """
+    LRU cache of user profiles with a TTL.
+
+    Invalidation only reaches the current worker process, so the TTL bounds
+    how long other workers can serve a stale premium status after a payment.
+    A profile read from the database before an invalidation is not stored
+    afterwards (see generation()), so a slow read can't bring back the old
+    status.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, ttl_seconds: Optional[int] = None):
+        self.max_entries = max_entries or settings.USER_CACHE_MAX_ENTRIES
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.USER_CACHE_TTL_SECONDS
+        # email -> (profile, expires_at)
+        self._entries: "OrderedDict[str, Tuple[UserProfile, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, email: str) -> Optional[UserProfile]:
+        """Get a cached profile, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is None or entry[1] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[email]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(email)
+            self.hits += 1
+            return entry[0]
+
+    def generation(self) -> int:
+        """Get the invalidation counter; pass it to put() for a profile read after this call."""
+        with self._lock:
+            return self._generation
+
+    def put(self, profile: UserProfile, generation: int) -> None:
+        """
+        Store a profile read from the database.
+
+        Args:
+            profile: Profile to cache
+            generation: generation() taken before the database read; the
+                profile is dropped if anything was invalidated since
+        """
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[profile.email] = (profile, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(profile.email)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, email: str) -> None:
+        """Remove a user's profile after it changed in the database."""
+        with self._lock:
+            self._entries.pop(email, None)
+            self._generation += 1
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        """Remove all profiles."""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache counters and current size."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations
+            }
+
+
+# Singleton instance
+_user_profile_cache: Optional[UserProfileCache] = None
+
+
+def get_user_profile_cache() -> Optional[UserProfileCache]:
+    """Get user profile cache singleton instance, or None if USER_CACHE_TTL_SECONDS is 0."""
+    global _user_profile_cache
+    if _user_profile_cache is None and settings.USER_CACHE_TTL_SECONDS > 0:
+        _user_profile_cache = UserProfileCache()
+    return _user_profile_cache
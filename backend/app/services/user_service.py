@@ -0,0 +1,113 @@
+"""
+User service for reading and creating user accounts.
+"""
+import logging
+from typing import Optional
+from sqlalchemy.orm import Session
+from app.database import DBSession, run_in_session
+from app.models.user import User
+from app.services.user_profile_cache import UserProfile, get_user_profile_cache
+
+logger = logging.getLogger(__name__)
+
+
+class UserService:
+    """
+    Service for reading and creating user accounts.
+
+    Methods take either session type from get_db_session() and run their
+    queries through run_in_session(), so they never block the event loop.
+    Read-only premium checks use get_profile(), which is served from the
+    user profile cache; code that changes a user calls invalidate_user().
+    """
+
+    async def get_user(self, db: DBSession, email: str) -> Optional[User]:
+        """
+        Get a user by email.
+
+        Args:
+            db: Database session
+            email: User email (primary key)
+
+        Returns:
+            The user, or None if not found
+        """
+        return await run_in_session(db, self._get_user, email)
+
+    async def get_profile(self, db: DBSession, email: str) -> Optional[UserProfile]:
+        """
+        Get a user's profile, from the cache when possible.
+
+        Args:
+            db: Database session (used on a cache miss)
+            email: User email (primary key)
+
+        Returns:
+            The profile, or None if the user does not exist
+        """
+        cache = get_user_profile_cache()
+        if cache is not None:
+            profile = cache.get(email)
+            if profile is not None:
+                return profile
+            generation = cache.generation()
+
+        user = await self.get_user(db, email)
+        if user is None:
+            return None
+
+        profile = UserProfile(email=user.email, name=user.name, premium=user.premium)
+        if cache is not None:
+            cache.put(profile, generation)
+        return profile
+
+    def invalidate_user(self, email: str) -> None:
+        """Drop a user's cached profile. Call this after changing the user."""
+        cache = get_user_profile_cache()
+        if cache is not None:
+            cache.invalidate(email)
+
+    async def create_user(self, db: DBSession, email: str, name: str) -> User:
+        """
+        Create a user with premium=False.
+
+        Args:
+            db: Database session
+            email: User email (primary key)
+            name: User name
+
+        Returns:
+            The created user
+
+        Raises:
+            Exception: If the insert fails (the session is rolled back)
+        """
+        return await run_in_session(db, self._create_user, email, name)
+
+    @staticmethod
+    def _get_user(db: Session, email: str) -> Optional[User]:
+        return db.query(User).filter(User.email == email).first()
+
+    @staticmethod
+    def _create_user(db: Session, email: str, name: str) -> User:
+        user = User(email=email, name=name, premium=False)
+        try:
+            db.add(user)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        db.refresh(user)
+        return user
+
+
+# Singleton instance
+_user_service: Optional[UserService] = None
+
+
+def get_user_service() -> UserService:
+    """Get user service singleton instance."""
+    global _user_service
+    if _user_service is None:
+        _user_service = UserService()
+    return _user_service
@@ -0,0 +1,140 @@
+"""
+Incremental JSON parsing for S3 object bodies.
+Parses straight from the byte stream in fixed-size chunks, so a large test
+document is never held as raw bytes, decoded text, and parsed objects at
+the same time. Uses ijson when installed and falls back to the standard
+json module (one full read) otherwise.
+"""
+import json
+from typing import Any, Dict, Iterable, Tuple
+
+# Check if ijson is available
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+class _CountingReader:
+    """File-like wrapper counting the bytes read from the underlying body."""
+
+    def __init__(self, body):
+        self._body = body
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._body.read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+def _read_all(body, chunk_size: int) -> bytearray:
+    """Read a body to the end in chunks."""
+    buffer = bytearray()
+    while True:
+        chunk = body.read(chunk_size)
+        if not chunk:
+            return buffer
+        buffer.extend(chunk)
+
+
+def _decode_error(error: Exception) -> json.JSONDecodeError:
+    """Map an ijson parse error to the error json.loads would raise."""
+    return json.JSONDecodeError(f"Invalid JSON: {error}", "", 0)
+
+
+def load_json_stream(body, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Tuple[Any, int]:
+    """
+    Parse a complete JSON document from a file-like body.
+
+    Args:
+        body: Readable byte stream (e.g., the StreamingBody of get_object)
+        chunk_size: Number of bytes read from the body at a time
+
+    Returns:
+        Tuple of (parsed document, number of bytes read)
+
+    Raises:
+        json.JSONDecodeError: If the body is not valid JSON
+    """
+    if not IJSON_AVAILABLE:
+        raw = _read_all(body, chunk_size)
+        return json.loads(raw), len(raw)
+
+    reader = _CountingReader(body)
+    try:
+        for document in ijson.items(reader, "", buf_size=chunk_size, use_float=True):
+            return document, reader.bytes_read
+    except ijson.JSONError as e:
+        raise _decode_error(e) from e
+    raise json.JSONDecodeError("Expecting value", "", 0)
+
+
+def extract_top_level_fields(
+    body,
+    fields: Iterable[str],
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Dict[str, Any]:
+    """
+    Read selected top-level fields of a JSON object without building the rest.
+
+    With ijson, parsing stops as soon as every requested field has been
+    seen, so fields near the start of a large document cost only the bytes
+    before them. The caller should close the body afterwards.
+
+    Args:
+        body: Readable byte stream positioned at the start of a JSON object
+        fields: Top-level keys to extract (e.g., "testName")
+        chunk_size: Number of bytes read from the body at a time
+
+    Returns:
+        Dictionary of the requested fields that are present in the document
+
+    Raises:
+        json.JSONDecodeError: If the body is not valid JSON
+    """
+    wanted = set(fields)
+    if not wanted:
+        return {}
+
+    if not IJSON_AVAILABLE:
+        document = json.loads(_read_all(body, chunk_size))
+        if not isinstance(document, dict):
+            return {}
+        return {key: document[key] for key in wanted if key in document}
+
+    found: Dict[str, Any] = {}
+    builder = None
+    building = None
+
+    try:
+        # Events for a top-level key carry the key itself as prefix; nested
+        # values have dotted prefixes, so they never match a wanted field
+        for prefix, event, value in ijson.parse(body, buf_size=chunk_size, use_float=True):
+            if building is not None:
+                builder.event(event, value)
+                if prefix == building and event in ("end_map", "end_array"):
+                    found[building] = builder.value
+                    building = None
+                    if len(found) == len(wanted):
+                        break
+                continue
+
+            if prefix not in wanted or prefix in found:
+                continue
+
+            if event in ("start_map", "start_array"):
+                builder = ijson.ObjectBuilder()
+                builder.event(event, value)
+                building = prefix
+            elif event not in ("map_key", "end_map", "end_array"):
+                found[prefix] = value
+                if len(found) == len(wanted):
+                    break
+    except ijson.JSONError as e:
+        raise _decode_error(e) from e
+
+    return found
@@ -0,0 +1,165 @@
+"""
+Benchmark: bytes on wire and serving latency for a representative test document.
+
+Serves a synthetic reading/listening test (passages, questions, transcripts)
+through CompressionMiddleware three ways:
+  identity      - no compression
+  dynamic       - compressed by the middleware on every request
+  precompressed - compressed once and passed through (what GET /tests/{id} does)
+
+Latency is measured in-process through the ASGI stack, so it isolates the
+CPU cost of compression from network transfer.
+
+Usage (from the backend directory):
+    python -m scripts.bench_compression --requests 500
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+from app.config import get_settings
+from app.core.compression import BROTLI_AVAILABLE, CompressionMiddleware, compress
+
+WORDS = (
+    "the research suggests that students who practice regularly develop stronger "
+    "comprehension skills because repeated exposure to academic vocabulary helps "
+    "them recognize patterns in lectures and passages about biology geology history "
+    "astronomy economics and psychology professor explains evidence however therefore"
+).split()
+
+
+def make_paragraph(rng: random.Random, words: int) -> str:
+    """Build a pseudo-academic paragraph."""
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def make_test_document(seed: int = 7) -> dict:
+    """Build a test document shaped like the ones in the tests bucket."""
+    rng = random.Random(seed)
+    sections = []
+    for section_index in range(8):
+        questions = [
+            {
+                "question": make_paragraph(rng, 20),
+                "answers": [
+                    {"text": make_paragraph(rng, 12), "is_correct": answer_index == 0}
+                    for answer_index in range(4)
+                ]
+            }
+            for _ in range(10)
+        ]
+        sections.append({
+            "id": f"section-{section_index}",
+            "passage": "\n\n".join(make_paragraph(rng, 120) for _ in range(6)),
+            "transcript": "\n".join(make_paragraph(rng, 60) for _ in range(12)),
+            "questions": questions
+        })
+    return {
+        "testName": "TOEFL Practice Test",
+        "sections": sections,
+        "assetReferencesResolved": [
+            {"id": f"audio-{i}", "type": "url", "reference": f"https://assets.s3.amazonaws.com/audio-{i}.mp3?X-Amz-Signature={i:064x}"}
+            for i in range(30)
+        ]
+    }
+
+
+def make_app(body: bytes, encoding: str = None):
+    """Minimal ASGI app returning a fixed JSON body."""
+    async def app(scope, receive, send):
+        # Fresh header list per response, as Starlette responses do
+        headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        if encoding:
+            headers.append((b"content-encoding", encoding.encode()))
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+    return app
+
+
+async def serve_once(app, accept_encoding: str) -> int:
+    """Run one request through the ASGI app and return bytes sent."""
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/api/v1/tests/1",
+        "headers": [(b"accept-encoding", accept_encoding.encode())]
+    }
+    sent = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal sent
+        if message["type"] == "http.response.body":
+            sent += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return sent
+
+
+async def measure(app, accept_encoding: str, requests: int):
+    """Measure per-request latency (ms) and bytes on wire."""
+    timings = []
+    sent = 0
+    for _ in range(requests):
+        start = time.perf_counter()
+        sent = await serve_once(app, accept_encoding)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings, sent
+
+
+def report(label: str, timings: list, sent: int, original: int) -> None:
+    """Print a result row."""
+    timings = sorted(timings)
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    print(
+        f"{label:<22} {sent:>10,} B  ({sent / original:>6.1%})   "
+        f"p50 {statistics.median(timings):>8.3f} ms   p99 {p99:>8.3f} ms"
+    )
+
+
+async def run(requests: int) -> None:
+    settings = get_settings()
+    body = json.dumps(make_test_document(), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    original = len(body)
+
+    def middleware(app):
+        return CompressionMiddleware(
+            app,
+            minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+            gzip_level=settings.GZIP_COMPRESSION_LEVEL,
+            brotli_quality=settings.BROTLI_COMPRESSION_QUALITY
+        )
+
+    encodings = ["gzip"] + (["br"] if BROTLI_AVAILABLE else [])
+
+    print(f"Representative test document: {original:,} bytes, {requests} requests per row")
+    timings, sent = await measure(middleware(make_app(body)), "identity", requests)
+    report("identity", timings, sent, original)
+
+    for encoding in encodings:
+        timings, sent = await measure(middleware(make_app(body)), encoding, requests)
+        report(f"dynamic {encoding}", timings, sent, original)
+
+        precompressed = compress(body, encoding)
+        timings, sent = await measure(middleware(make_app(precompressed, encoding)), encoding, requests)
+        report(f"precompressed {encoding}", timings, sent, original)
+
+    if not BROTLI_AVAILABLE:
+        print("brotli not installed; only gzip was measured")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark: requests per second for a user lookup route, sync vs async sessions.
+
+Serves a route shaped like GET /auth/me (get_db_session + UserService.get_user)
+with uvicorn in a background thread and drives it with --concurrency clients
+for --duration seconds per mode:
+
+  sync    Session from SessionLocal; queries run on the io thread pool
+  async   AsyncSession (DATABASE_ASYNC); queries await the async driver
+
+Uses a throwaway SQLite database seeded with --users users unless
+--database-url is given (sync form, e.g. postgresql://...; the async mode
+needs asyncpg/aiosqlite installed).
+
+Usage (from the backend directory):
+    python -m scripts.bench_database_async --concurrency 50 --duration 5
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import database
+from app.config import get_settings
+from app.database import DBSession, get_db_session
+from app.models.user import User
+from app.services.user_service import get_user_service
+from scripts.load_test_executors import start_server
+
+
+def use_database(url: str, users: int) -> None:
+    """Point app.database at the benchmark database and seed it."""
+    engine = create_engine(url, connect_args={"check_same_thread": False} if "sqlite" in url else {})
+    database.database_url = url
+    database.engine = engine
+    database.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    database.Base.metadata.create_all(bind=engine)
+    with database.SessionLocal() as db:
+        existing = {email for (email,) in db.query(User.email)}
+        db.add_all(
+            User(email=f"user{i}@example.com", name=f"User {i}", premium=i % 2 == 0)
+            for i in range(users) if f"user{i}@example.com" not in existing
+        )
+        db.commit()
+
+
+def create_demo_app() -> FastAPI:
+    """Demo app with a /me-style user lookup route."""
+    app = FastAPI()
+
+    @app.get("/users/{index}")
+    async def get_user(index: int, db: DBSession = Depends(get_db_session)):
+        user = await get_user_service().get_user(db, f"user{index}@example.com")
+        return {"email": user.email, "name": user.name, "premium": user.premium}
+
+    return app
+
+
+async def run_mode(base_url: str, mode: str, users: int, concurrency: int, duration: float) -> None:
+    """Drive one mode and print requests per second and latency."""
+    latencies = []
+    deadline = time.perf_counter() + duration
+
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=httpx.Limits(max_connections=concurrency), timeout=60
+    ) as client:
+        async def worker(offset: int):
+            i = offset
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                (await client.get(f"/users/{i % users}")).raise_for_status()
+                latencies.append(time.perf_counter() - start)
+                i += concurrency
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(
+        f"{mode:<6} {len(latencies) / elapsed:>8,.0f} req/s   "
+        f"p50 {statistics.median(latencies) * 1000:>7.1f} ms   p99 {p99 * 1000:>7.1f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", default="")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=5)
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    use_database(url, args.users)
+    base_url = start_server(create_demo_app())
+
+    settings = get_settings()
+    for mode in ("sync", "async"):
+        settings.DATABASE_ASYNC = mode == "async"
+        asyncio.run(run_mode(base_url, mode, args.users, args.concurrency, args.duration))
+
+
+if __name__ == "__main__":
+    main()
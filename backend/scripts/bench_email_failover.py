@@ -0,0 +1,119 @@
+"""
+Benchmark: email provider failover and hedged sends against fake providers.
+
+Two stub providers with injected latency and throttling sit behind an
+EmailRouter. Each scenario sends --sends OTP emails from --threads threads
+and reports latency percentiles, where the emails went and the final
+provider health. The recovery scenario fails the primary's first sends and
+checks that it wins the traffic back. Runs entirely offline.
+
+Usage (from the backend directory):
+    python -m scripts.bench_email_failover --sends 400 --hedge-ms 150 --reset-ms 500
+"""
+import argparse
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.config import get_settings
+from app.core.exceptions import EmailThrottledError
+from app.services.email_router import EmailRouter
+from app.services.email_service import EmailService
+
+
+class FakeProvider(EmailService):
+    """
+    Stub provider whose calls take `latency` seconds, or `slow_latency` for a
+    `slow_rate` fraction. The first `fail_first` calls fail (an outage).
+    """
+
+    def __init__(
+        self,
+        latency: float,
+        slow_rate: float = 0.0,
+        slow_latency: float = 0.0,
+        failure_rate: float = 0.0,
+        fail_first: int = 0
+    ):
+        super().__init__("stub")
+        self.latency = latency
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.stub_failure_rate = failure_rate
+        self.fail_first = fail_first
+
+    def _stub_call(self) -> None:
+        time.sleep(self.slow_latency if random.random() < self.slow_rate else self.latency)
+        with self._stub_lock:
+            self.stub_calls += 1
+            in_outage = self.stub_calls <= self.fail_first
+        if in_outage or (self.stub_failure_rate and random.random() < self.stub_failure_rate):
+            raise EmailThrottledError("Fake provider throttled the request")
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run(label: str, primary: FakeProvider, secondary: FakeProvider, hedge_seconds: float, sends: int, threads: int) -> None:
+    """Send emails through a fresh router and print the results."""
+    router = EmailRouter({"primary": primary, "secondary": secondary}, hedge_after_seconds=hedge_seconds)
+
+    def send(i: int):
+        start = time.perf_counter()
+        try:
+            router.send_otp(f"user{i}@example.com", "123456")
+            ok = True
+        except Exception:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        outcomes = list(pool.map(send, range(sends)))
+
+    # The last tenth of the sends show where traffic settled
+    tail = max(1, sends // 10)
+    primary_before = len(primary.stub_outbox)
+    for i in range(tail):
+        send(sends + i)
+    tail_primary = len(primary.stub_outbox) - primary_before
+
+    latencies = [latency * 1000 for latency, _ in outcomes]
+    failed = sum(1 for _, ok in outcomes if not ok)
+    stats = router.stats()
+    health = stats["providers"]
+    print(
+        f"{label:<30} p50 {statistics.median(latencies):>6.0f}ms   p99 {percentile(latencies, 0.99):>6.0f}ms   "
+        f"failed {failed:>3}   delivered primary/secondary {len(primary.stub_outbox):>4}/{len(secondary.stub_outbox):<4}   "
+        f"last {tail} to primary {tail_primary:>3}   hedged {router.hedged:>4}   probes {stats['probes']:>3}   "
+        f"primary circuit {health['primary']['state']}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sends", type=int, default=400)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--hedge-ms", type=float, default=150)
+    parser.add_argument("--reset-ms", type=float, default=500, help="Circuit reset and probe interval")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    settings.EMAIL_STUB_LATENCY_MS = 0
+    settings.EMAIL_CIRCUIT_RESET_SECONDS = args.reset_ms / 1000
+    hedge = args.hedge_ms / 1000
+    scenarios = [
+        ("healthy", lambda: FakeProvider(0.05), 0),
+        ("primary throttling", lambda: FakeProvider(0.05, failure_rate=1.0), 0),
+        ("primary slow tail", lambda: FakeProvider(0.05, slow_rate=0.1, slow_latency=1.0), 0),
+        ("primary slow tail + hedging", lambda: FakeProvider(0.05, slow_rate=0.1, slow_latency=1.0), hedge),
+        ("primary outage, recovers", lambda: FakeProvider(0.05, fail_first=10), 0),
+    ]
+    for label, make_primary, hedge_seconds in scenarios:
+        run(label, make_primary(), FakeProvider(0.08), hedge_seconds, args.sends, args.threads)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark: OTP email renders per second.
+
+Compares the previous f-string HTML assembly (one ~2KB string built per
+send, no escaping, HTML only) with the precompiled templates, which render
+both the HTML body (with the name escaped) and the plain-text alternative.
+
+Usage (from the backend directory):
+    python -m scripts.bench_email_templates --renders 100000
+"""
+import argparse
+import time
+
+from app.services.email_templates import get_email_template, load_email_templates, render_otp_email
+
+
+def legacy_otp_email_body(otp: str, name: str = None, is_signup: bool = False) -> str:
+    """The previous EmailService._generate_otp_email_body."""
+    if name:
+        greeting = f"Hi {name},"
+        intro_text = "Your verification code for Testino is:" if is_signup else "Your sign-in verification code for Testino is:"
+    else:
+        greeting = "Hello,"
+        intro_text = "Your sign-in verification code for Testino is:"
+
+    html_body = f"""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <meta charset="utf-8">
+            <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        </head>
+        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333; max-width: 600px; margin: 0 auto; padding: 20px; background-color: #f5f5f5;">
+            <div style="background-color: #ffffff; border-radius: 12px; overflow: hidden; box-shadow: 0 2px 8px rgba(0,0,0,0.1);">
+                <div style="background-color: #086A6F; padding: 24px; text-align: center;">
+                    <h1 style="color: #ffffff; margin: 0; font-size: 28px; font-weight: 600;">Testino</h1>
+                </div>
+                <div style="padding: 40px 30px; background-color: #ffffff;">
+                    <h2 style="color: #086A6F; margin-top: 0; margin-bottom: 20px; font-size: 20px; font-weight: 600;">{greeting}</h2>
+                    <p style="color: #333; font-size: 16px; margin-bottom: 24px;">{intro_text}</p>
+                    <div style="background-color: #f8f9fa; border: 2px solid #086A6F; border-radius: 12px; padding: 24px; text-align: center; margin: 24px 0;">
+                        <div style="color: #086A6F; font-size: 36px; letter-spacing: 12px; margin: 0; font-family: 'Courier New', monospace; font-weight: 700;">{otp}</div>
+                    </div>
+                    <p style="color: #666; font-size: 14px; margin-bottom: 8px;">This code will expire in 5 minutes.</p>
+                    <p style="color: #999; font-size: 13px; margin-top: 32px; margin-bottom: 0;">If you didn't request this code, please ignore this email.</p>
+                </div>
+                <div style="background-color: #f8f9fa; padding: 20px; text-align: center; border-top: 1px solid #e5e5e5;">
+                    <p style="color: #666; font-size: 14px; margin: 0;">Best regards,<br><strong style="color: #086A6F;">The Testino Team</strong></p>
+                </div>
+            </div>
+        </body>
+        </html>
+        """
+
+    return html_body
+
+
+def measure(label: str, render, renders: int) -> None:
+    """Print renders per second and output size for one implementation."""
+    start = time.perf_counter()
+    for i in range(renders):
+        output = render(f"{i % 1_000_000:06d}", "Jane Doe", True)
+    elapsed = time.perf_counter() - start
+    size = len(output) if isinstance(output, str) else len(output.html) + len(output.text)
+    print(f"{label:<22} {renders / elapsed:>12,.0f} renders/s   {elapsed / renders * 1e6:>6.2f} us/render   {size:>6,} chars")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--renders", type=int, default=100_000)
+    args = parser.parse_args()
+
+    load_email_templates()
+    html_template = get_email_template("otp_signup").html
+
+    def render_html(otp: str, name: str, is_signup: bool) -> str:
+        return html_template.render({"greeting": f"Hi {name},", "otp": otp})
+
+    measure("f-string (html)", legacy_otp_email_body, args.renders)
+    measure("compiled (html)", render_html, args.renders)
+    measure("compiled (html+text)", render_otp_email, args.renders)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Benchmark: MSG91 sends with a new connection per request vs the shared client.
+
+Starts a local stub MSG91 server (optionally over TLS with a throwaway
+self-signed certificate) that counts the connections it accepts, then sends
+--sends SMS OTPs:
+
+  per-request   requests.get() in threads, as the previous MSG91 code did,
+                which opens (and handshakes) a new connection every send
+  shared        SMSService.send_otp() awaited on the shared httpx client,
+                which keeps connections alive and reuses them
+
+Usage (from the backend directory):
+    python -m scripts.bench_http_client --sends 2000 --concurrency 20 --tls
+"""
+import argparse
+import asyncio
+import datetime
+import http.server
+import os
+import ssl
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+import urllib3
+
+from app.config import get_settings
+from app.core import http_client
+from app.services.sms_service import SMSService
+
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+    """Answers every request like MSG91's send endpoint."""
+
+    protocol_version = "HTTP/1.1"
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with StubHandler.lock:
+            StubHandler.connections += 1
+
+    def do_GET(self):
+        body = b'{"type": "success"}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_POST = do_GET
+
+    def log_message(self, *args):
+        pass
+
+
+def self_signed_context() -> ssl.SSLContext:
+    """Server TLS context with a throwaway certificate for localhost."""
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name).issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now).not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+
+    directory = tempfile.mkdtemp()
+    cert_path, key_path = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    with open(cert_path, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        ))
+
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert_path, key_path)
+    return context
+
+
+def start_stub_server(tls: bool) -> str:
+    """Start the stub server in a background thread and return its base URL."""
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    if tls:
+        server.socket = self_signed_context().wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"{'https' if tls else 'http'}://127.0.0.1:{server.server_address[1]}"
+
+
+def report(label: str, sends: int, elapsed: float, connections: int) -> None:
+    print(
+        f"{label:<12} {sends / elapsed:>8,.0f} sends/s   {elapsed / sends * 1000:>6.2f} ms/send   "
+        f"{connections:>6,} connections"
+    )
+
+
+def run_per_request(base_url: str, sends: int, concurrency: int) -> None:
+    """The previous MSG91 path: a blocking requests call per send."""
+    url = f"{base_url}/api/sendhttp.php"
+
+    def send(i: int) -> None:
+        response = requests.get(url, params={"mobiles": f"9198765{i:05d}", "message": "Your OTP"}, verify=False)
+        response.raise_for_status()
+
+    before = StubHandler.connections
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(send, range(sends)))
+    report("per-request", sends, time.perf_counter() - start, StubHandler.connections - before)
+
+
+async def run_shared(sends: int, concurrency: int) -> None:
+    """The new MSG91 path: awaited sends on the shared client."""
+    sms_service = SMSService()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send(i: int) -> None:
+        async with semaphore:
+            await sms_service.send_otp("+91", f"98765{i:05d}", "123456")
+
+    before = StubHandler.connections
+    start = time.perf_counter()
+    await asyncio.gather(*(send(i) for i in range(sends)))
+    report("shared", sends, time.perf_counter() - start, StubHandler.connections - before)
+    await http_client.close_http_client()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sends", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--tls", action="store_true", help="Serve the stub over TLS")
+    args = parser.parse_args()
+
+    urllib3.disable_warnings()
+    base_url = start_stub_server(args.tls)
+
+    settings = get_settings()
+    settings.SMS_PROVIDER = "msg91"
+    settings.MSG91_BASE_URL = base_url
+    settings.MSG91_TEMPLATE_ID = ""
+    settings.HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS = args.concurrency
+    # The stub's certificate is self-signed
+    http_client._http_client = http_client.create_http_client(verify=False)
+
+    run_per_request(base_url, args.sends, args.concurrency)
+    asyncio.run(run_shared(args.sends, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
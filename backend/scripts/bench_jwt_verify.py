@@ -0,0 +1,50 @@
+"""
+Benchmark: JWT verifications per second with and without the token cache.
+
+Issues --users access tokens and verifies them round-robin --verifications
+times, the way a burst of authenticated requests from active users would.
+Without the cache every verification decodes the token and checks its HMAC
+signature; with it only the first verification of each token does.
+
+Usage (from the backend directory):
+    python -m scripts.bench_jwt_verify --users 1000 --verifications 200000
+"""
+import argparse
+import time
+
+from app.core.security import create_access_token, get_token_cache, verify_token
+
+
+def measure(label: str, tokens, verifications: int, use_cache: bool) -> None:
+    """Print verifications per second for one mode."""
+    count = len(tokens)
+    start = time.perf_counter()
+    for i in range(verifications):
+        if verify_token(tokens[i % count], use_cache=use_cache) is None:
+            raise RuntimeError("Token failed verification")
+    elapsed = time.perf_counter() - start
+    print(f"{label:<10} {verifications / elapsed:>12,.0f} verifications/s   {elapsed / verifications * 1e6:>6.2f} us each")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--verifications", type=int, default=200_000)
+    args = parser.parse_args()
+
+    tokens = [
+        create_access_token({"sub": f"user{i}@example.com", "email": f"user{i}@example.com", "name": f"User {i}"})
+        for i in range(args.users)
+    ]
+
+    cache = get_token_cache()
+    if cache is None:
+        raise SystemExit("JWT_VERIFY_CACHE_SIZE is 0; the token cache is disabled")
+
+    measure("uncached", tokens, args.verifications, use_cache=False)
+    measure("cached", tokens, args.verifications, use_cache=True)
+    print(f"cache: {cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark: in-memory OTP store under a signup spike with 1M outstanding OTPs.
+
+Issues --otps OTPs per expiry window for several windows on a simulated
+clock, sweeping expired OTPs between windows the way the background sweeper
+does. Memory stays flat across windows because each sweep evicts the
+previous window, and a sweep costs time proportional to the OTPs that
+expired rather than to everything pending. The old full-scan cleanup is
+timed on the same store for comparison.
+
+Usage (from the backend directory):
+    python -m scripts.bench_otp_expiry --otps 1000000 --windows 4
+"""
+import argparse
+import gc
+import resource
+import time
+
+from app.config import get_settings
+from app.models.otp import OTPRecord
+from app.services.otp_store import InMemoryOTPStore
+
+
+def rss_mb() -> float:
+    """Peak resident set size of this process in MB (Linux reports KB)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def issue_otps(store: InMemoryOTPStore, window: int, count: int, created_at: float) -> None:
+    """Store count OTPs for distinct users at a simulated time."""
+    for i in range(count):
+        key = f"user{window}-{i}@example.com"
+        store.save(key, OTPRecord(otp="123456", created_at=created_at))
+
+
+def full_scan_cleanup(store: InMemoryOTPStore, now: float) -> int:
+    """The previous cleanup: check every pending OTP."""
+    expired = [key for key, record in store._storage.items() if record.expires_at < now]
+    for key in expired:
+        del store._storage[key]
+    return len(expired)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--otps", type=int, default=1_000_000, help="OTPs issued per expiry window")
+    parser.add_argument("--windows", type=int, default=4)
+    args = parser.parse_args()
+
+    expiry = get_settings().OTP_EXPIRY_SECONDS
+    store = InMemoryOTPStore()
+    clock = time.time()
+
+    print(f"{args.otps:,} OTPs per {expiry}s expiry window, {args.windows} windows")
+    print(f"{'window':>6} {'pending':>10} {'heap':>10} {'issue s':>8} {'sweep s':>8} {'removed':>10} {'peak RSS MB':>12}")
+
+    for window in range(args.windows):
+        start = time.perf_counter()
+        issue_otps(store, window, args.otps, clock)
+        issued = time.perf_counter() - start
+        pending = len(store)
+        heap_size = len(store._expiry_heap)
+
+        # Advance past the expiry window and sweep, as the background sweeper would
+        clock += expiry + 1
+        start = time.perf_counter()
+        removed = store.cleanup_expired(now=clock)
+        swept = time.perf_counter() - start
+        gc.collect()
+
+        print(
+            f"{window:>6} {pending:>10,} {heap_size:>10,} {issued:>8.2f} "
+            f"{swept:>8.2f} {removed:>10,} {rss_mb():>12.1f}"
+        )
+
+    # Sweep cost when nothing is due, with a full window pending
+    issue_otps(store, args.windows, args.otps, clock)
+    start = time.perf_counter()
+    store.cleanup_expired(now=clock)
+    heap_idle = time.perf_counter() - start
+    start = time.perf_counter()
+    full_scan_cleanup(store, now=clock)
+    scan_idle = time.perf_counter() - start
+    print(
+        f"\nSweep with {len(store):,} pending and none expired: "
+        f"heap {heap_idle * 1000:.3f} ms, full scan {scan_idle * 1000:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
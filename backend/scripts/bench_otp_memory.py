@@ -0,0 +1,87 @@
+"""
+Benchmark: bytes per outstanding OTP in the in-memory store.
+
+Compares the previous OTPRecord (regular dataclass with a per-instance
+__dict__ and a phone_number copy of the key) with the slotted OTPRecord.
+Each row stores --otps OTPs in a dict keyed by identifier, the way
+InMemoryOTPStore does, and reports traced allocations per OTP for the whole
+store and for the records alone.
+
+Usage (from the backend directory):
+    python -m scripts.bench_otp_memory --otps 200000
+"""
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+
+from app.config import get_settings
+from app.models.otp import OTPRecord
+
+settings = get_settings()
+
+
+@dataclass
+class LegacyOTPRecord:
+    """OTPRecord as it was before it was slotted."""
+    otp: str
+    phone_number: str
+    created_at: float = field(default_factory=time.time)
+    expires_at: float = field(init=False)
+    attempts: int = 0
+
+    def __post_init__(self):
+        self.expires_at = self.created_at + settings.OTP_EXPIRY_SECONDS
+
+
+def make_legacy(otp: str, key: str):
+    return LegacyOTPRecord(otp=otp, phone_number=key)
+
+
+def make_slotted(otp: str, key: str):
+    return OTPRecord(otp=otp)
+
+
+def measure(factory, count: int):
+    """Return (store bytes per OTP, record bytes per OTP)."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    keys = [f"user{i}@example.com" for i in range(count)]
+    otps = [f"{i % 1_000_000:06d}" for i in range(count)]
+    # The key and OTP lists themselves are not part of the store
+    lists = 2 * sys.getsizeof(keys)
+    before_records = tracemalloc.get_traced_memory()[0]
+    records = [factory(otp, key) for otp, key in zip(otps, keys)]
+    after_records = tracemalloc.get_traced_memory()[0] - sys.getsizeof(records)
+    storage = dict(zip(keys, records))
+    after_store = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    record_bytes = (after_records - before_records) / count
+    store_bytes = (after_store - before - lists - sys.getsizeof(records)) / count
+    del storage, records
+    return store_bytes, record_bytes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--otps", type=int, default=200_000)
+    args = parser.parse_args()
+
+    print(f"{args.otps:,} outstanding OTPs")
+    print(f"{'record':<18} {'store B/OTP':>12} {'record B/OTP':>13}")
+    results = {}
+    for label, factory in (("dataclass", make_legacy), ("slotted", make_slotted)):
+        results[label] = measure(factory, args.otps)
+        store_bytes, record_bytes = results[label]
+        print(f"{label:<18} {store_bytes:>12.0f} {record_bytes:>13.0f}")
+
+    saved = results["dataclass"][0] - results["slotted"][0]
+    print(f"\nSaved {saved:.0f} B per OTP ({saved * 100_000 / 1024 / 1024:.1f} MB per 100k pending OTPs)")
+
+
+if __name__ == "__main__":
+    main()
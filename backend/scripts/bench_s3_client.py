@@ -0,0 +1,75 @@
+"""
+Micro-benchmark: per-request S3 client cost before and after the shared registry.
+
+Compares building a fresh boto3 S3 client (the old get_s3_client behaviour)
+with looking up the shared client from the AWS client registry. No network
+calls are made; dummy credentials are used if none are configured.
+
+Usage (from the backend directory):
+    python -m scripts.bench_s3_client --iterations 200
+"""
+import argparse
+import os
+import statistics
+import time
+
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "benchmark")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "benchmark")
+
+import boto3  # noqa: E402
+from app.config import get_settings  # noqa: E402
+from app.core.aws_clients import get_aws_client, close_aws_clients  # noqa: E402
+
+
+def time_calls(func, iterations: int) -> list:
+    """Time each call of func in microseconds."""
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1_000_000)
+    return timings
+
+
+def report(label: str, timings: list) -> None:
+    """Print summary statistics for a set of timings."""
+    timings = sorted(timings)
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    print(
+        f"{label:<28} mean {statistics.mean(timings):>10.1f} us   "
+        f"median {statistics.median(timings):>10.1f} us   p99 {p99:>10.1f} us"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    settings = get_settings()
+
+    def build_client():
+        # Previous behaviour: a new client (and connection pool) per call
+        return boto3.client(
+            's3',
+            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+            region_name=settings.AWS_REGION
+        )
+
+    # Warm up botocore's loader caches so both runs are measured steady-state
+    build_client()
+    get_aws_client('s3')
+
+    before = time_calls(build_client, args.iterations)
+    after = time_calls(lambda: get_aws_client('s3'), args.iterations)
+    close_aws_clients()
+
+    print(f"S3 client acquisition, {args.iterations} iterations")
+    report("boto3.client per request", before)
+    report("shared registry", after)
+    print(f"Speedup: {statistics.mean(before) / statistics.mean(after):.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Rebuild the catalog.json manifest in the tests bucket.
+
+Reads every test-*.json in the bucket and writes a manifest with each test's
+id, name, authorization, S3 ETag, content hash and asset references. The API
+takes unchanged tests from this single file instead of opening every test,
+so run this after uploading or changing tests (e.g., at the end of the
+upload job). Until it is rebuilt the API still picks up the changes: it
+compares the manifest against the bucket listing on every refresh and reads
+the tests whose ETag differs.
+
+Usage (from the backend directory):
+    python -m scripts.build_test_catalog
+    python -m scripts.build_test_catalog --bucket testino-tests --dry-run
+"""
+import argparse
+import json
+import sys
+
+from app.config import get_settings
+from app.core.aws_clients import get_aws_client
+from app.services.test_catalog_service import get_test_catalog_service
+
+
+def main() -> None:
+    settings = get_settings()
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--bucket", default=settings.TESTS_S3_BUCKET)
+    parser.add_argument("--key", default=settings.TEST_CATALOG_MANIFEST_KEY or "catalog.json")
+    parser.add_argument("--dry-run", action="store_true", help="Print the manifest instead of uploading it")
+    args = parser.parse_args()
+
+    if not settings.AWS_ACCESS_KEY_ID or not settings.AWS_SECRET_ACCESS_KEY:
+        sys.exit("AWS credentials not configured")
+
+    s3_client = get_aws_client('s3')
+    manifest = get_test_catalog_service().build_manifest(s3_client, args.bucket)
+    body = json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8")
+
+    if args.dry_run:
+        print(body.decode("utf-8"))
+        return
+
+    s3_client.put_object(
+        Bucket=args.bucket,
+        Key=args.key,
+        Body=body,
+        ContentType="application/json",
+        CacheControl="no-cache"
+    )
+    print(f"Wrote {args.bucket}/{args.key}: {len(manifest['tests'])} tests, {len(body):,} bytes")
+
+
+if __name__ == "__main__":
+    main()
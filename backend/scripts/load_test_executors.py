@@ -0,0 +1,116 @@
+"""
+Load test: fast endpoint throughput next to slow blocking endpoints.
+
+Serves a small FastAPI app with uvicorn in a background thread and drives it
+with --slow-clients clients hitting a slow endpoint (a blocking call of
+--slow-ms, like a database or Razorpay call) and --fast-clients clients
+hitting a fast endpoint, for --duration seconds per mode:
+
+  inline      the slow endpoint makes the blocking call on the event loop,
+              as the routes did before, so every request waits behind it
+  offloaded   the slow endpoint awaits the call on the io pool
+              (app.core.executors.run_io), so the loop stays free
+
+Usage (from the backend directory):
+    python -m scripts.load_test_executors --slow-clients 20 --fast-clients 20 --duration 5
+"""
+import argparse
+import asyncio
+import socket
+import statistics
+import threading
+import time
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+
+from app.core.executors import IO_POOL, get_executor, run_io
+
+
+def create_demo_app(slow_seconds: float) -> FastAPI:
+    """Demo app with inline and offloaded slow endpoints and a fast endpoint."""
+    app = FastAPI()
+
+    @app.get("/slow/inline")
+    async def slow_inline():
+        time.sleep(slow_seconds)
+        return {"ok": True}
+
+    @app.get("/slow/offloaded")
+    async def slow_offloaded():
+        await run_io(time.sleep, slow_seconds)
+        return {"ok": True}
+
+    @app.get("/fast")
+    async def fast():
+        return {"ok": True}
+
+    return app
+
+
+def start_server(app: FastAPI) -> str:
+    """Start uvicorn in a background thread and return its base URL."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{port}"
+
+
+async def run_mode(base_url: str, mode: str, slow_clients: int, fast_clients: int, duration: float) -> None:
+    """Drive one mode and print fast endpoint throughput and latency."""
+    slow_count = 0
+    fast_latencies = []
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=slow_clients + fast_clients)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        async def slow_client():
+            nonlocal slow_count
+            while time.perf_counter() < deadline:
+                (await client.get(f"/slow/{mode}")).raise_for_status()
+                slow_count += 1
+
+        async def fast_client():
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                (await client.get("/fast")).raise_for_status()
+                fast_latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(slow_client() for _ in range(slow_clients)),
+            *(fast_client() for _ in range(fast_clients))
+        )
+        elapsed = time.perf_counter() - start
+
+    fast_latencies.sort()
+    p99 = fast_latencies[int(len(fast_latencies) * 0.99) - 1] if fast_latencies else 0.0
+    print(
+        f"{mode:<10} fast {len(fast_latencies) / elapsed:>8,.0f} req/s   "
+        f"p50 {statistics.median(fast_latencies) * 1000:>7.1f} ms   p99 {p99 * 1000:>7.1f} ms   "
+        f"slow {slow_count / elapsed:>6,.0f} req/s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--slow-clients", type=int, default=20)
+    parser.add_argument("--fast-clients", type=int, default=20)
+    parser.add_argument("--slow-ms", type=float, default=50)
+    parser.add_argument("--duration", type=float, default=5)
+    args = parser.parse_args()
+
+    base_url = start_server(create_demo_app(args.slow_ms / 1000))
+    for mode in ("inline", "offloaded"):
+        asyncio.run(run_mode(base_url, mode, args.slow_clients, args.fast_clients, args.duration))
+    print(f"io pool: {get_executor(IO_POOL).stats()}")
+
+
+if __name__ == "__main__":
+    main()
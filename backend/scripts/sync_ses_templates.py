@@ -0,0 +1,64 @@
+"""
+Create or update the SES stored templates used for bulk email sends.
+
+With EMAIL_BATCH_ENABLED and EMAIL_PROVIDER=aws_ses, batches are sent with
+SendBulkTemplatedEmail, which renders a template stored in SES. This uploads
+every email template as <AWS_SES_TEMPLATE_PREFIX><name>, so run it whenever
+the templates or OTP_EXPIRY_SECONDS change.
+
+Usage (from the backend directory):
+    python -m scripts.sync_ses_templates --prefix testino-
+    python -m scripts.sync_ses_templates --dry-run
+"""
+import argparse
+import json
+import sys
+
+from app.config import get_settings
+from app.core.aws_clients import get_aws_client
+from app.services.email_templates import load_email_templates
+
+try:
+    from botocore.exceptions import ClientError
+except ImportError:
+    ClientError = Exception
+
+
+def main() -> None:
+    settings = get_settings()
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--prefix", default=settings.AWS_SES_TEMPLATE_PREFIX)
+    parser.add_argument("--dry-run", action="store_true", help="Print the templates instead of uploading them")
+    args = parser.parse_args()
+
+    if not args.prefix:
+        sys.exit("Set AWS_SES_TEMPLATE_PREFIX or pass --prefix")
+
+    templates = [
+        template.ses_template(f"{args.prefix}{name}")
+        for name, template in load_email_templates().items()
+    ]
+
+    if args.dry_run:
+        print(json.dumps(templates, indent=2))
+        return
+
+    if not settings.AWS_ACCESS_KEY_ID or not settings.AWS_SECRET_ACCESS_KEY:
+        sys.exit("AWS credentials not configured")
+
+    ses_client = get_aws_client('ses')
+    for template in templates:
+        try:
+            ses_client.update_template(Template=template)
+            action = "Updated"
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') != "TemplateDoesNotExist":
+                raise
+            ses_client.create_template(Template=template)
+            action = "Created"
+        print(f"{action} SES template {template['TemplateName']}")
+
+
+if __name__ == "__main__":
+    main()
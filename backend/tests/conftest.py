@@ -0,0 +1,24 @@
+"""
+Shared pytest fixtures.
+"""
+import fakeredis
+import pytest
+
+from app.services.otp_store import InMemoryOTPStore, RedisOTPStore
+
+
+@pytest.fixture
+def redis_client():
+    """An isolated fake Redis server with the client settings the app uses."""
+    client = fakeredis.FakeRedis(decode_responses=True)
+    yield client
+    client.flushall()
+    client.close()
+
+
+@pytest.fixture(params=["memory", "redis"])
+def otp_store(request):
+    """Each OTP store backend, so the same cases run against both."""
+    if request.param == "memory":
+        return InMemoryOTPStore()
+    return RedisOTPStore(request.getfixturevalue("redis_client"))
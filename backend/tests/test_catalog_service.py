@@ -0,0 +1,99 @@
+"""
+Tests for the test catalog index against a mocked S3 bucket.
+"""
+import asyncio
+import json
+
+import boto3
+import pytest
+from moto import mock_aws
+
+# Imported as a module so pytest doesn't try to collect TestCatalogService
+from app.services import test_catalog_service
+
+BUCKET = "testino-tests"
+
+
+def put_test(s3_client, test_id, name):
+    s3_client.put_object(
+        Bucket=BUCKET,
+        Key=f"test-{test_id}.json",
+        Body=json.dumps({"testName": name, "test_authorization": "free"})
+    )
+
+
+def put_manifest(s3_client, service):
+    s3_client.put_object(Bucket=BUCKET, Key="catalog.json", Body=json.dumps(service.build_manifest(s3_client, BUCKET)))
+
+
+@pytest.fixture
+def s3_client():
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        for test_id in (1, 2, 3):
+            put_test(client, test_id, f"Test {test_id}")
+        yield client
+
+
+@pytest.fixture
+def catalog(s3_client):
+    service = test_catalog_service.TestCatalogService(refresh_interval_seconds=0)
+    service.manifest_key = "catalog.json"
+    put_manifest(s3_client, service)
+    return service
+
+
+@pytest.fixture
+def test_reads(s3_client, monkeypatch):
+    """Keys of the test files downloaded, manifest excluded."""
+    keys = []
+    get_object = s3_client.get_object
+
+    def recording_get_object(**kwargs):
+        if kwargs["Key"].startswith("test-"):
+            keys.append(kwargs["Key"])
+        return get_object(**kwargs)
+
+    monkeypatch.setattr(s3_client, "get_object", recording_get_object)
+    return keys
+
+
+def refresh(catalog, s3_client):
+    entries = asyncio.run(catalog.refresh(s3_client, BUCKET, force=True))
+    return {entry.id: entry.name for entry in entries}
+
+
+def test_unchanged_bucket_is_served_from_manifest(catalog, s3_client, test_reads):
+    assert refresh(catalog, s3_client) == {1: "Test 1", 2: "Test 2", 3: "Test 3"}
+    assert refresh(catalog, s3_client) == {1: "Test 1", 2: "Test 2", 3: "Test 3"}
+
+    assert test_reads == []
+    assert catalog.get_entry(1).content_hash is not None
+
+
+def test_changes_after_manifest_are_picked_up(catalog, s3_client, test_reads):
+    changes = []
+    catalog.add_change_listener(lambda modified, removed: changes.append((modified, removed)))
+    refresh(catalog, s3_client)
+
+    # The manifest is not rebuilt, and is no older than the changes
+    put_test(s3_client, 2, "Test 2 (revised)")
+    put_test(s3_client, 4, "Test 4")
+    s3_client.delete_object(Bucket=BUCKET, Key="test-3.json")
+
+    assert refresh(catalog, s3_client) == {1: "Test 1", 2: "Test 2 (revised)", 4: "Test 4"}
+    assert sorted(test_reads) == ["test-2.json", "test-4.json"]
+    assert changes[-1] == ({2}, {3})
+
+    # Patched entries are kept until the manifest is rebuilt
+    test_reads.clear()
+    refresh(catalog, s3_client)
+    assert test_reads == []
+
+
+def test_missing_manifest_scans_bucket(catalog, s3_client, test_reads):
+    s3_client.delete_object(Bucket=BUCKET, Key="catalog.json")
+
+    assert refresh(catalog, s3_client) == {1: "Test 1", 2: "Test 2", 3: "Test 3"}
+    assert sorted(test_reads) == ["test-1.json", "test-2.json", "test-3.json"]
@@ -0,0 +1,61 @@
+"""
+Tests for settings loading.
+"""
+import pytest
+
+from app.config import DATABASE_POOL_PRESETS, Settings
+
+POOL_VARIABLES = (
+    "DEBUG",
+    "DATABASE_POOL_PRESET",
+    "DATABASE_POOL_SIZE",
+    "DATABASE_MAX_OVERFLOW",
+    "DATABASE_POOL_TIMEOUT_SECONDS",
+    "DATABASE_POOL_RECYCLE_SECONDS",
+    "DATABASE_POOL_PRE_PING",
+)
+
+
+@pytest.fixture
+def env_file(tmp_path, monkeypatch):
+    """Write a .env file, with the pool variables cleared from the environment."""
+    for name in POOL_VARIABLES:
+        monkeypatch.delenv(name, raising=False)
+
+    def write(*lines):
+        path = tmp_path / ".env"
+        path.write_text("\n".join(lines) + "\n")
+        return path
+
+    return write
+
+
+def test_pool_preset_from_env_file(env_file):
+    settings = Settings(_env_file=env_file("DATABASE_POOL_PRESET=test"))
+
+    preset = DATABASE_POOL_PRESETS["test"]
+    assert settings.DATABASE_POOL_PRESET == "test"
+    assert settings.DATABASE_POOL_SIZE == preset["pool_size"]
+    assert settings.DATABASE_MAX_OVERFLOW == preset["max_overflow"]
+    assert settings.DATABASE_POOL_TIMEOUT_SECONDS == preset["pool_timeout"]
+    assert settings.DATABASE_POOL_RECYCLE_SECONDS == preset["pool_recycle"]
+    assert settings.DATABASE_POOL_PRE_PING == preset["pool_pre_ping"]
+
+
+def test_explicit_pool_settings_override_preset(env_file, monkeypatch):
+    monkeypatch.setenv("DATABASE_POOL_PRE_PING", "true")
+    settings = Settings(_env_file=env_file("DATABASE_POOL_PRESET=test", "DATABASE_POOL_SIZE=7"))
+
+    assert settings.DATABASE_POOL_SIZE == 7
+    assert settings.DATABASE_POOL_PRE_PING is True
+    assert settings.DATABASE_MAX_OVERFLOW == DATABASE_POOL_PRESETS["test"]["max_overflow"]
+
+
+def test_pool_preset_follows_debug(env_file):
+    assert Settings(_env_file=env_file("DEBUG=true")).DATABASE_POOL_PRESET == "development"
+    assert Settings(_env_file=env_file("DEBUG=false")).DATABASE_POOL_PRESET == "production"
+
+
+def test_unknown_pool_preset(env_file):
+    with pytest.raises(ValueError):
+        Settings(_env_file=env_file("DATABASE_POOL_PRESET=staging"))
@@ -0,0 +1,91 @@
+"""
+Tests for the parsed test document cache's size accounting.
+"""
+import time
+
+import pytest
+
+from app.core.compression import BROTLI_AVAILABLE
+# TestDocumentCache is used through the module so pytest doesn't try to collect it
+from app.services import test_document_cache
+from app.services.test_document_cache import CachedTestDocument
+
+
+def make_document(test_id: int, sections: int = 200) -> CachedTestDocument:
+    data = {
+        "testName": f"Test {test_id}",
+        "test_authorization": "free",
+        "sections": [{"question": f"Question {i}", "answer": "x" * 40} for i in range(sections)],
+    }
+    return CachedTestDocument(test_id=test_id, data=data, etag=f'"etag-{test_id}"', size=1000, validated_at=time.time())
+
+
+def test_response_bodies_count_towards_size():
+    cache = test_document_cache.TestDocumentCache(max_bytes=10 ** 7, ttl_seconds=60)
+    document = make_document(1)
+    cache.put(document)
+    assert cache.stats()["bytes"] == 1000
+
+    prefix = document.get_body_prefix()
+    prepared = document.prepare_response()
+    gzipped = prepared.get_body("gzip")
+
+    expected = 1000 + len(prefix) + len(prepared.body) + len(gzipped)
+    assert document.size == expected
+    assert cache.stats()["bytes"] == expected
+
+    # Reused bodies are not counted again
+    document.prepare_response()
+    prepared.get_body("gzip")
+    assert cache.stats()["bytes"] == expected
+
+
+def test_replaced_prepared_body_is_released():
+    cache = test_document_cache.TestDocumentCache(max_bytes=10 ** 7, ttl_seconds=60)
+    document = make_document(1)
+    cache.put(document)
+
+    document.prepare_response([{"url": "https://example.com/a" * 50}]).get_body("gzip")
+    prepared = document.prepare_response([{"url": "https://example.com/b"}])
+
+    assert cache.stats()["bytes"] == 1000 + len(document.get_body_prefix()) + len(prepared.body)
+
+
+def test_attached_bodies_evict_least_recently_used():
+    reference = make_document(2)
+    reference.prepare_response()
+    first, second = make_document(1), make_document(2)
+    # Room for both documents, but not once the second has its bodies
+    cache = test_document_cache.TestDocumentCache(max_bytes=reference.size + 500, ttl_seconds=60)
+    cache.put(first)
+    cache.put(second)
+
+    second.prepare_response()
+
+    assert not cache.contains(1)
+    assert cache.contains(2)
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] == second.size
+
+
+def test_replaced_entry_is_not_counted():
+    cache = test_document_cache.TestDocumentCache(max_bytes=10 ** 7, ttl_seconds=60)
+    old = make_document(1)
+    cache.put(old)
+    cache.put(make_document(1))
+
+    old.prepare_response()
+
+    assert cache.stats()["bytes"] == 1000
+
+
+@pytest.mark.skipif(not BROTLI_AVAILABLE, reason="brotli not installed")
+def test_each_encoding_is_counted():
+    cache = test_document_cache.TestDocumentCache(max_bytes=10 ** 7, ttl_seconds=60)
+    document = make_document(1)
+    cache.put(document)
+    prepared = document.prepare_response()
+
+    encoded = len(prepared.get_body("gzip")) + len(prepared.get_body("br"))
+
+    assert cache.stats()["bytes"] == 1000 + len(document.get_body_prefix()) + len(prepared.body) + encoded
@@ -0,0 +1,92 @@
+"""
+Tests for email micro-batching against the stub provider.
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.config import get_settings
+from app.core.exceptions import SMSException
+from app.services.email_batcher import EmailBatcher
+from app.services.email_service import EmailMessage, EmailSendResult, EmailService
+from app.services.email_templates import otp_email_values
+
+settings = get_settings()
+
+
+def make_message(to: str, otp: str = "123456") -> EmailMessage:
+    template, values = otp_email_values(otp)
+    return EmailMessage(to, template, values)
+
+
+@pytest.fixture
+def stub_service(monkeypatch):
+    monkeypatch.setattr(settings, "EMAIL_STUB_LATENCY_MS", 0)
+    return EmailService("stub")
+
+
+async def send_all(batcher, messages):
+    """Send messages concurrently, returning each result or the exception raised."""
+    return await asyncio.wait_for(
+        asyncio.gather(*(batcher.send(message) for message in messages), return_exceptions=True),
+        timeout=5
+    )
+
+
+def test_each_caller_gets_its_own_result(stub_service):
+    batcher = EmailBatcher(stub_service, max_batch_size=3, max_wait_seconds=1)
+    recipients = ["a@example.com", "b@example.com", "c@example.com"]
+
+    results = asyncio.run(send_all(batcher, [make_message(to, otp=f"00000{i}") for i, to in enumerate(recipients)]))
+
+    assert stub_service.stub_calls == 1
+    assert batcher.stats()["batches"] == 1
+    delivered = {email["id"]: email for email in stub_service.stub_outbox}
+    for i, (to, result) in enumerate(zip(recipients, results)):
+        assert delivered[result.message_id]["to"] == to
+        assert f"00000{i}" in delivered[result.message_id]["text"]
+
+
+def test_rejected_recipient_fails_only_its_caller(stub_service):
+    batcher = EmailBatcher(stub_service, max_batch_size=3, max_wait_seconds=1)
+    recipients = ["a@example.com", "bounce@example.invalid", "c@example.com"]
+
+    results = asyncio.run(send_all(batcher, [make_message(to) for to in recipients]))
+
+    assert isinstance(results[1], SMSException)
+    assert isinstance(results[0], EmailSendResult) and isinstance(results[2], EmailSendResult)
+    assert [email["to"] for email in stub_service.stub_outbox] == ["a@example.com", "c@example.com"]
+
+
+def test_partial_batch_is_flushed_after_max_wait(stub_service):
+    batcher = EmailBatcher(stub_service, max_batch_size=50, max_wait_seconds=0.05)
+
+    start = time.monotonic()
+    results = asyncio.run(send_all(batcher, [make_message("a@example.com"), make_message("b@example.com")]))
+    elapsed = time.monotonic() - start
+
+    assert all(result.ok for result in results)
+    assert batcher.stats()["batches"] == 1
+    assert 0.05 <= elapsed < 1
+
+
+def test_full_batch_is_sent_without_waiting(stub_service):
+    batcher = EmailBatcher(stub_service, max_batch_size=2, max_wait_seconds=10)
+
+    results = asyncio.run(send_all(batcher, [make_message("a@example.com"), make_message("b@example.com")]))
+
+    assert all(result.ok for result in results)
+
+
+def test_short_provider_result_fails_every_caller(stub_service, monkeypatch):
+    async def send_batch_async(messages):
+        # One result too few, like a provider response missing an entry
+        return [EmailSendResult(message_id="only-one")]
+
+    monkeypatch.setattr(stub_service, "send_batch_async", send_batch_async)
+    batcher = EmailBatcher(stub_service, max_batch_size=2, max_wait_seconds=1)
+
+    results = asyncio.run(send_all(batcher, [make_message("a@example.com"), make_message("b@example.com")]))
+
+    assert all(isinstance(result, SMSException) for result in results)
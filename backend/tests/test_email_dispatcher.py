@@ -0,0 +1,123 @@
+"""
+Tests for the background OTP email dispatcher.
+"""
+import asyncio
+import json
+
+import pytest
+
+from app.config import get_settings
+from app.core.exceptions import SMSException
+from app.models.otp import OTPRecord
+from app.services import email_dispatcher as email_dispatcher_module
+from app.services.email_dispatcher import EmailDispatcher, EmailJob
+from app.services.otp_service import OTPService
+from app.services.otp_store import InMemoryOTPStore
+
+settings = get_settings()
+
+
+class FakeEmailService:
+    """Email service whose sends take `latency` seconds and raise `error` if set."""
+
+    provider = "fake"
+    batch_limit = 1
+
+    def __init__(self, latency: float = 0.0, error: Exception = None):
+        self.latency = latency
+        self.error = error
+        self.sent = []
+
+    async def send_otp_async(self, email, otp, name=None, is_signup=False):
+        await asyncio.sleep(self.latency)
+        if self.error is not None:
+            raise self.error
+        self.sent.append(email)
+        return True
+
+
+@pytest.fixture
+def email_service(monkeypatch):
+    service = FakeEmailService()
+    monkeypatch.setattr(email_dispatcher_module, "get_email_service", lambda: service)
+    monkeypatch.setattr(settings, "EMAIL_QUEUE_ENABLED", True)
+    monkeypatch.setattr(settings, "EMAIL_BATCH_ENABLED", False)
+    return service
+
+
+def test_enqueue_when_not_running():
+    async def enqueue():
+        await EmailDispatcher().enqueue(EmailJob(email="user@example.com", otp="123456"))
+
+    with pytest.raises(SMSException):
+        asyncio.run(enqueue())
+
+
+def test_queued_emails_are_sent(email_service):
+    async def run():
+        dispatcher = EmailDispatcher()
+        await dispatcher.start()
+        for i in range(5):
+            await dispatcher.enqueue(EmailJob(email=f"user{i}@example.com", otp="123456"))
+        await dispatcher.stop()
+        return dispatcher
+
+    dispatcher = asyncio.run(run())
+
+    assert sorted(email_service.sent) == [f"user{i}@example.com" for i in range(5)]
+    assert dispatcher.stats()["sent"] == 5
+
+
+def test_full_queue_spools_and_replays(email_service, tmp_path):
+    email_service.latency = 0.05
+    spool_path = tmp_path / "spool.jsonl"
+
+    async def fill():
+        dispatcher = EmailDispatcher()
+        dispatcher.worker_count = 1
+        dispatcher.max_queue_size = 1
+        dispatcher.spool_path = str(spool_path)
+        await dispatcher.start()
+        for i in range(4):
+            await dispatcher.enqueue(EmailJob(email=f"user{i}@example.com", otp="123456"))
+        spooled = [json.loads(line)["email"] for line in spool_path.read_text().splitlines()]
+        await dispatcher.stop()
+        return spooled
+
+    spooled = asyncio.run(fill())
+    assert spooled
+    delivered = list(email_service.sent)
+    assert not set(spooled) & set(delivered)
+
+    async def replay():
+        dispatcher = EmailDispatcher()
+        dispatcher.spool_path = str(spool_path)
+        await dispatcher.start()
+        await dispatcher.stop()
+
+    asyncio.run(replay())
+    assert sorted(email_service.sent) == [f"user{i}@example.com" for i in range(4)]
+    assert not spool_path.exists()
+
+
+def test_failed_send_deletes_its_otp(email_service, monkeypatch):
+    email_service.error = SMSException("provider down")
+    otp_service = OTPService(InMemoryOTPStore())
+    monkeypatch.setattr(email_dispatcher_module, "get_otp_service", lambda: otp_service)
+    otp_service._store.save("failed@example.com", OTPRecord(otp="111111"))
+    otp_service._store.save("newer@example.com", OTPRecord(otp="333333"))
+
+    async def run():
+        dispatcher = EmailDispatcher()
+        await dispatcher.start()
+        await dispatcher.enqueue(EmailJob(email="failed@example.com", otp="111111"))
+        # A newer OTP was requested after this email was queued; keep it
+        await dispatcher.enqueue(EmailJob(email="newer@example.com", otp="222222"))
+        await dispatcher.stop()
+        return dispatcher
+
+    dispatcher = asyncio.run(run())
+
+    assert dispatcher.stats()["failed"] == 2
+    assert otp_service._store.get("failed@example.com") is None
+    assert otp_service._store.get("newer@example.com").otp == "333333"
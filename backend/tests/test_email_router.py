@@ -0,0 +1,189 @@
+"""
+Tests for email provider failover and recovery.
+"""
+import time
+
+import pytest
+
+from app.config import get_settings
+from app.core.exceptions import EmailThrottledError
+from app.services import email_router
+from app.services.email_router import EmailRouter, ProviderHealth
+from app.services.email_service import EmailService
+
+settings = get_settings()
+
+RESET_SECONDS = 30
+
+
+class FakeClock:
+    """Stands in for the time module in email_router; advanced by hand."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class FakeProvider(EmailService):
+    """Stub provider taking `latency` seconds of the fake clock, failing while `failing` is set."""
+
+    def __init__(self, clock: FakeClock, latency: float):
+        super().__init__("stub")
+        self.clock = clock
+        self.latency = latency
+        self.failing = False
+
+    def _stub_call(self) -> None:
+        self.clock.advance(self.latency)
+        with self._stub_lock:
+            self.stub_calls += 1
+        if self.failing:
+            raise EmailThrottledError("Fake provider throttled the request")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(email_router, "time", clock)
+    monkeypatch.setattr(settings, "EMAIL_CIRCUIT_RESET_SECONDS", RESET_SECONDS)
+    monkeypatch.setattr(settings, "EMAIL_CIRCUIT_FAILURE_THRESHOLD", 5)
+    return clock
+
+
+@pytest.fixture
+def providers(clock):
+    return FakeProvider(clock, 0.05), FakeProvider(clock, 0.08)
+
+
+@pytest.fixture
+def router(providers):
+    primary, secondary = providers
+    return EmailRouter({"primary": primary, "secondary": secondary}, hedge_after_seconds=0)
+
+
+def send(router, count=1):
+    for i in range(count):
+        router.send_otp(f"user{i}@example.com", "123456")
+
+
+def test_fails_over_to_secondary(router, providers):
+    primary, secondary = providers
+    primary.failing = True
+
+    send(router, 3)
+
+    assert primary.stub_calls == 3
+    assert len(secondary.stub_outbox) == 3
+
+
+def test_recovered_primary_wins_traffic_back(router, providers):
+    primary, secondary = providers
+    primary.failing = True
+    send(router, 3)
+    assert router.health["primary"].stats()["error_rate"] > 0.4
+
+    primary.failing = False
+    send(router, 200)
+
+    # The old failures decay, so the faster primary ranks first again
+    delivered = len(primary.stub_outbox)
+    assert delivered > 0
+    send(router, 10)
+    assert len(primary.stub_outbox) == delivered + 10
+
+
+def test_idle_provider_is_probed(router, providers, clock):
+    primary, secondary = providers
+    # Failures that took long leave the primary with a poor latency score
+    primary.failing = True
+    primary.latency = 2.0
+    send(router, 1)
+    primary.failing = False
+    primary.latency = 0.05
+
+    send(router, 100)
+    assert primary.stub_calls == 1
+
+    clock.advance(RESET_SECONDS)
+    send(router, 1)
+    assert len(primary.stub_outbox) == 1
+    assert router.probes == 1
+
+    # One probe per reset_seconds
+    send(router, 10)
+    assert len(primary.stub_outbox) == 1
+
+
+def test_open_circuit_gets_half_open_trial(router, providers, clock):
+    primary, secondary = providers
+    router.health["primary"].failure_threshold = 3
+    primary.failing = True
+    send(router, 3)
+    assert router.health["primary"].state == ProviderHealth.OPEN
+
+    send(router, 20)
+    assert primary.stub_calls == 3
+
+    primary.failing = False
+    clock.advance(RESET_SECONDS)
+    send(router, 1)
+
+    assert router.health["primary"].state == ProviderHealth.CLOSED
+    assert len(primary.stub_outbox) == 1
+
+
+def test_ranking_does_not_claim_half_open_trials(router, providers, clock):
+    primary, secondary = providers
+    send(router, 1)
+    health = router.health["secondary"]
+    health.record(False, 0.08)
+    health.state = ProviderHealth.OPEN
+    health.opened_at = clock.now - RESET_SECONDS
+    # Not due a probe, only a half-open trial
+    health.probed_at = clock.now
+
+    # Served by the primary, so the secondary's trial is still unclaimed
+    send(router, 1)
+    assert health.state == ProviderHealth.OPEN
+
+    primary.failing = True
+    send(router, 1)
+    assert len(secondary.stub_outbox) == 1
+    assert health.state == ProviderHealth.CLOSED
+
+
+def test_error_rate_decays_without_sends(clock):
+    health = ProviderHealth(alpha=0.5, failure_threshold=10, reset_seconds=RESET_SECONDS)
+    health.record(False, 0.1)
+    assert health.stats()["error_rate"] == 0.5
+
+    clock.advance(RESET_SECONDS)
+    assert health.stats()["error_rate"] == 0.25
+
+    health.record(True, 0.1)
+    assert health.stats()["error_rate"] == 0.125
+
+
+def test_slow_provider_is_hedged_and_first_success_wins():
+    slow, fast = EmailService("stub"), EmailService("stub")
+    slow.stub_latency = 0.5
+    fast.stub_latency = 0
+    router = EmailRouter({"slow": slow, "fast": fast}, hedge_after_seconds=0.02)
+
+    try:
+        start = time.monotonic()
+        assert router.send_otp("user@example.com", "123456")
+        elapsed = time.monotonic() - start
+
+        assert router.hedged == 1
+        assert elapsed < slow.stub_latency
+        assert [email["to"] for email in fast.stub_outbox] == ["user@example.com"]
+        assert not slow.stub_outbox
+    finally:
+        router.close()
+    assert router._executor is None
@@ -0,0 +1,193 @@
+"""
+Tests for the OTP storage backends.
+"""
+import asyncio
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+from app.config import get_settings
+from app.models.otp import OTPRecord
+from app.services import otp_store as otp_store_module
+from app.services.otp_service import OTPService
+from app.services.otp_store import (
+    InMemoryOTPStore,
+    OTPVerifyStatus,
+    RedisOTPStore,
+    create_otp_store,
+)
+
+settings = get_settings()
+
+KEY = "user@example.com"
+
+
+def test_save_then_get(otp_store):
+    record = OTPRecord(otp="123456")
+    otp_store.save(KEY, record)
+
+    stored = otp_store.get(KEY)
+    assert stored.otp == "123456"
+    assert stored.attempts == 0
+    assert stored.max_attempts == settings.OTP_MAX_ATTEMPTS
+    assert stored.expires_at == pytest.approx(record.expires_at)
+
+
+def test_save_replaces_pending_otp(otp_store):
+    otp_store.save(KEY, OTPRecord(otp="111111"))
+    otp_store.verify_and_increment(KEY, "000000")
+
+    otp_store.save(KEY, OTPRecord(otp="222222"))
+
+    stored = otp_store.get(KEY)
+    assert stored.otp == "222222"
+    # The new OTP starts with a fresh attempt count
+    assert stored.attempts == 0
+    assert otp_store.verify_and_increment(KEY, "111111")[0] == OTPVerifyStatus.INVALID
+
+
+def test_wrong_otp_counts_attempt(otp_store):
+    otp_store.save(KEY, OTPRecord(otp="123456", max_attempts=3))
+
+    assert otp_store.verify_and_increment(KEY, "000000") == (OTPVerifyStatus.INVALID, 2)
+    assert otp_store.verify_and_increment(KEY, "000000") == (OTPVerifyStatus.INVALID, 1)
+    assert otp_store.get(KEY).attempts == 2
+
+
+def test_max_attempts_deletes_otp(otp_store):
+    otp_store.save(KEY, OTPRecord(otp="123456", max_attempts=2))
+    otp_store.verify_and_increment(KEY, "000000")
+    assert otp_store.verify_and_increment(KEY, "000000") == (OTPVerifyStatus.INVALID, 0)
+
+    # Even the right OTP is refused once the attempts are used up
+    assert otp_store.verify_and_increment(KEY, "123456") == (OTPVerifyStatus.MAX_ATTEMPTS, 0)
+    assert otp_store.get(KEY) is None
+
+
+def test_valid_otp_is_consumed(otp_store):
+    otp_store.save(KEY, OTPRecord(otp="123456", max_attempts=3))
+    otp_store.verify_and_increment(KEY, "000000")
+
+    assert otp_store.verify_and_increment(KEY, "123456") == (OTPVerifyStatus.VALID, 2)
+    assert otp_store.get(KEY) is None
+    assert otp_store.verify_and_increment(KEY, "123456") == (OTPVerifyStatus.NOT_FOUND, 0)
+
+
+def test_missing_otp_not_found(otp_store):
+    assert otp_store.get(KEY) is None
+    assert otp_store.verify_and_increment(KEY, "123456") == (OTPVerifyStatus.NOT_FOUND, 0)
+    assert otp_store.delete(KEY) is False
+
+
+def test_delete(otp_store):
+    otp_store.save(KEY, OTPRecord(otp="123456"))
+
+    assert otp_store.delete(KEY) is True
+    assert otp_store.get(KEY) is None
+
+
+def test_redis_key_ttl_matches_otp_expiry(redis_client):
+    store = RedisOTPStore(redis_client)
+    store.save(KEY, OTPRecord(otp="123456"))
+
+    assert redis_client.ttl(f"{RedisOTPStore.KEY_PREFIX}{KEY}") == settings.OTP_EXPIRY_SECONDS
+
+
+def test_in_memory_expired_otp_is_swept():
+    store = InMemoryOTPStore()
+    record = OTPRecord(otp="123456")
+    store.save(KEY, record)
+    assert record.expires_at - record.created_at == settings.OTP_EXPIRY_SECONDS
+
+    assert store.cleanup_expired(now=record.expires_at - 1) == 0
+    assert store.cleanup_expired(now=record.expires_at + 1) == 1
+    assert store.get(KEY) is None
+
+
+def test_in_memory_expired_otp_is_rejected():
+    store = InMemoryOTPStore()
+    store.save(KEY, OTPRecord(otp="123456", created_at=time.time() - settings.OTP_EXPIRY_SECONDS - 1))
+
+    assert store.verify_and_increment(KEY, "123456") == (OTPVerifyStatus.EXPIRED, 0)
+    assert store.get(KEY) is None
+
+
+def run_concurrently(func, count):
+    """Call func from count threads released at the same time and collect the results."""
+    barrier = threading.Barrier(count)
+    results = []
+    results_lock = threading.Lock()
+
+    def worker():
+        barrier.wait()
+        result = func()
+        with results_lock:
+            results.append(result)
+
+    threads = [threading.Thread(target=worker) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_wrong_otps_cannot_overcount(otp_store):
+    otp_store.save(KEY, OTPRecord(otp="123456", max_attempts=5))
+
+    results = run_concurrently(lambda: otp_store.verify_and_increment(KEY, "000000"), 20)
+
+    invalid = sorted(remaining for status, remaining in results if status == OTPVerifyStatus.INVALID)
+    # Exactly max_attempts guesses are counted, each seeing a different count
+    assert invalid == [0, 1, 2, 3, 4]
+    assert Counter(status for status, _ in results)[OTPVerifyStatus.MAX_ATTEMPTS] >= 1
+
+
+def test_concurrent_valid_otp_is_consumed_once(otp_store):
+    otp_store.save(KEY, OTPRecord(otp="123456"))
+
+    results = run_concurrently(lambda: otp_store.verify_and_increment(KEY, "123456"), 20)
+
+    statuses = Counter(status for status, _ in results)
+    assert statuses[OTPVerifyStatus.VALID] == 1
+    assert statuses[OTPVerifyStatus.NOT_FOUND] == 19
+
+
+def test_create_otp_store_memory(monkeypatch):
+    monkeypatch.setattr(settings, "OTP_STORAGE_BACKEND", "Memory")
+
+    assert isinstance(create_otp_store(), InMemoryOTPStore)
+
+
+def test_create_otp_store_unknown_backend(monkeypatch):
+    monkeypatch.setattr(settings, "OTP_STORAGE_BACKEND", "memcached")
+
+    with pytest.raises(ValueError):
+        create_otp_store()
+
+
+def test_create_otp_store_redis_not_installed(monkeypatch):
+    monkeypatch.setattr(settings, "OTP_STORAGE_BACKEND", "redis")
+    monkeypatch.setattr(otp_store_module, "REDIS_AVAILABLE", False)
+
+    with pytest.raises(RuntimeError):
+        create_otp_store()
+
+
+def test_expiry_sweeper_runs_off_the_event_loop(monkeypatch):
+    service = OTPService(InMemoryOTPStore())
+    sweep_threads = []
+    monkeypatch.setattr(settings, "OTP_CLEANUP_INTERVAL_SECONDS", 0.01)
+    monkeypatch.setattr(service, "cleanup_expired_otps", lambda: sweep_threads.append(threading.current_thread()))
+
+    async def run_sweeper():
+        service.start_expiry_sweeper()
+        while not sweep_threads:
+            await asyncio.sleep(0.01)
+        await service.stop_expiry_sweeper()
+
+    asyncio.run(run_sweeper())
+
+    assert sweep_threads[0] is not threading.main_thread()
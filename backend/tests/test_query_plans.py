@@ -0,0 +1,154 @@
+"""
+Query-plan regression tests: payment lookups must use their indexes.
+
+Migrates a database to head with Alembic (so the migrations are checked
+too), seeds orders and transactions in a transaction that is rolled back,
+and checks that each query's plan uses its index and, for history queries,
+needs no separate sort.
+
+Runs on a temporary SQLite database (EXPLAIN QUERY PLAN). Set
+QUERY_PLAN_DATABASE_URL to a scratch PostgreSQL database to check it too
+(EXPLAIN, with sequential scans disabled because the seeded tables are
+small); that database is migrated to head.
+"""
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.engine import Connection
+
+from app.models.order import Order, OrderStatus
+from app.models.transaction import Transaction, TransactionStatus
+from app.models.user import User
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+USER_EMAIL = "user7@example.com"
+USERS = 50
+ORDERS_PER_USER = 20
+
+# (description, statement, index the plan must use, whether the plan must avoid a sort)
+PLAN_CHECKS = [
+    (
+        "order history of a user, newest first",
+        select(Order).where(Order.user_email == USER_EMAIL).order_by(Order.created_at.desc()).limit(20),
+        "ix_orders_user_email_created_at",
+        True,
+    ),
+    (
+        "payment history of a user, newest first",
+        select(Transaction).where(Transaction.user_email == USER_EMAIL).order_by(Transaction.created_at.desc()).limit(20),
+        "ix_transactions_user_email_created_at",
+        True,
+    ),
+    (
+        "transactions of an order",
+        select(Transaction).where(Transaction.order_id == "order-7"),
+        "ix_transactions_order_id",
+        False,
+    ),
+    (
+        "transactions of a Razorpay order (refund reconciliation)",
+        select(Transaction).where(Transaction.razorpay_order_id == "order_rzp7"),
+        "ix_transactions_razorpay_order_id",
+        False,
+    ),
+]
+
+
+def migrate(database_url: str) -> None:
+    """Migrate the database to the latest Alembic revision."""
+    # Built without alembic.ini so env.py doesn't reconfigure logging for the test run
+    config = Config()
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    config.set_main_option("sqlalchemy.url", database_url)
+    command.upgrade(config, "head")
+
+
+def seed(connection: Connection, users: int, orders_per_user: int) -> None:
+    """Insert users with orders and one transaction per order."""
+    now = datetime.utcnow()
+    connection.execute(User.__table__.insert(), [
+        {"email": f"user{u}@example.com", "name": f"User {u}", "premium": False} for u in range(users)
+    ])
+    orders, transactions = [], []
+    for u in range(users):
+        for o in range(orders_per_user):
+            n = u * orders_per_user + o
+            created_at = now - timedelta(minutes=n)
+            orders.append({
+                "id": f"order-{n}", "user_email": f"user{u}@example.com", "amount": 49900, "currency": "INR",
+                "status": OrderStatus.PAID.name, "razorpay_order_id": f"order_rzp{n}",
+                "created_at": created_at, "updated_at": created_at,
+            })
+            transactions.append({
+                "id": str(uuid.uuid4()), "order_id": f"order-{n}", "user_email": f"user{u}@example.com",
+                "amount": 49900, "currency": "INR", "status": TransactionStatus.CAPTURED.name,
+                "razorpay_payment_id": f"pay_{n}", "razorpay_order_id": f"order_rzp{n}", "verified": True,
+                "created_at": created_at, "updated_at": created_at,
+            })
+    connection.execute(Order.__table__.insert(), orders)
+    connection.execute(Transaction.__table__.insert(), transactions)
+    connection.execute(text("ANALYZE"))
+
+
+def explain(connection: Connection, statement) -> List[str]:
+    """Get the query plan of a statement as lines of text."""
+    sql = str(statement.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True}))
+    if connection.dialect.name == "sqlite":
+        return [row[-1] for row in connection.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+    if connection.dialect.name == "postgresql":
+        return [row[0] for row in connection.execute(text(f"EXPLAIN {sql}"))]
+    raise ValueError(f"Unsupported database: {connection.dialect.name}")
+
+
+def uses_sort(connection: Connection, plan: List[str]) -> bool:
+    """Check if a plan sorts rows itself instead of reading them in index order."""
+    if connection.dialect.name == "sqlite":
+        return any("TEMP B-TREE" in line for line in plan)
+    return any(line.strip().lstrip("-> ").startswith(("Sort", "Incremental Sort")) for line in plan)
+
+
+DATABASE_URLS = ["sqlite"]
+if os.getenv("QUERY_PLAN_DATABASE_URL"):
+    DATABASE_URLS.append(os.environ["QUERY_PLAN_DATABASE_URL"])
+
+
+@pytest.fixture(scope="module", params=DATABASE_URLS, ids=lambda url: url.split(":")[0])
+def seeded_connection(request, tmp_path_factory):
+    """A connection to a migrated database seeded inside a transaction that is rolled back."""
+    database_url = request.param
+    if database_url == "sqlite":
+        database_url = f"sqlite:///{tmp_path_factory.mktemp('query_plans') / 'plans.db'}"
+    migrate(database_url)
+
+    engine = create_engine(database_url)
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        try:
+            seed(connection, USERS, ORDERS_PER_USER)
+            if connection.dialect.name == "postgresql":
+                connection.execute(text("SET LOCAL enable_seqscan = off"))
+            yield connection
+        finally:
+            transaction.rollback()
+    engine.dispose()
+
+
+@pytest.mark.parametrize(
+    "statement, index_name, no_sort",
+    [check[1:] for check in PLAN_CHECKS],
+    ids=[check[0] for check in PLAN_CHECKS]
+)
+def test_query_uses_index(seeded_connection, statement, index_name, no_sort):
+    plan = explain(seeded_connection, statement)
+    rendered = "\n".join(plan)
+
+    assert any(index_name in line for line in plan), f"does not use {index_name}:\n{rendered}"
+    if no_sort:
+        assert not uses_sort(seeded_connection, plan), f"sorts instead of reading in index order:\n{rendered}"
@@ -0,0 +1,102 @@
+"""
+Tests for the rate limiter backends.
+"""
+import asyncio
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.config import get_settings
+from app.core import rate_limit as rate_limit_module
+from app.core.rate_limit import InMemoryRateLimiter, RedisRateLimiter, create_rate_limiter
+from app.dependencies import rate_limit_otp_send
+
+settings = get_settings()
+
+
+@pytest.fixture(params=["memory", "redis"])
+def limiter(request):
+    """Each rate limiter backend, so the same cases run against both."""
+    if request.param == "memory":
+        return InMemoryRateLimiter()
+    return RedisRateLimiter(request.getfixturevalue("redis_client"))
+
+
+def test_burst_then_retry_after(limiter):
+    assert [limiter.acquire("key", 2, 60) for _ in range(2)] == [0.0, 0.0]
+
+    # One token refills every 30 seconds
+    assert limiter.acquire("key", 2, 60) == pytest.approx(30, abs=1)
+    assert limiter.acquire("other", 2, 60) == 0.0
+
+
+def test_acquire_async(limiter):
+    async def acquire_three():
+        return [await limiter.acquire_async("key", 2, 60) for _ in range(3)]
+
+    allowed, allowed_again, retry_after = asyncio.run(acquire_three())
+
+    assert allowed == allowed_again == 0.0
+    assert retry_after > 0
+
+
+def test_create_rate_limiter_unknown_backend(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_BACKEND", "memcached")
+
+    with pytest.raises(ValueError):
+        create_rate_limiter()
+
+
+def test_create_rate_limiter_redis_not_installed(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_BACKEND", "redis")
+    monkeypatch.setattr(rate_limit_module, "REDIS_AVAILABLE", False)
+
+    with pytest.raises(RuntimeError):
+        create_rate_limiter()
+
+
+@pytest.fixture
+def otp_send_client(monkeypatch):
+    """Client for an app with one OTP-send route, limited to 2 sends per IP."""
+    monkeypatch.setattr(rate_limit_module, "_rate_limiter", InMemoryRateLimiter())
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "RATE_LIMIT_TRUST_PROXY_HEADERS", True)
+    monkeypatch.setattr(settings, "RATE_LIMIT_TRUSTED_PROXY_HOPS", 1)
+    monkeypatch.setattr(settings, "OTP_SEND_IP_LIMIT", 2)
+
+    app = FastAPI()
+
+    @app.post("/send-otp", dependencies=[Depends(rate_limit_otp_send)])
+    async def send_otp():
+        return {"sent": True}
+
+    return TestClient(app)
+
+
+def test_spoofed_forwarded_for_is_still_limited(otp_send_client):
+    statuses = [
+        otp_send_client.post(
+            "/send-otp",
+            json={"email": f"user{i}@example.com"},
+            # The client makes up the first hop; the load balancer appends the real address
+            headers={"X-Forwarded-For": f"198.51.100.{i}, 203.0.113.7"}
+        ).status_code
+        for i in range(3)
+    ]
+
+    assert statuses == [200, 200, 429]
+
+
+def test_trusted_proxy_hops(otp_send_client, monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_TRUSTED_PROXY_HOPS", 2)
+
+    def send(client_ip):
+        return otp_send_client.post(
+            "/send-otp",
+            json={},
+            headers={"X-Forwarded-For": f"198.51.100.1, {client_ip}, 10.0.0.2"}
+        ).status_code
+
+    assert [send("203.0.113.7") for _ in range(3)] == [200, 200, 429]
+    assert send("203.0.113.8") == 200